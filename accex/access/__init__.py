@@ -0,0 +1,31 @@
+from .core import (
+    AccessFormatError,
+    PAGE_SIZE,
+    JET_VERSIONS,
+    COLUMN_TYPE_NAMES,
+    decode_text,
+    decode_datetime,
+    decode_numeric,
+    AccessColumn,
+    AccessTable,
+    AccessDatabase,
+    split_page_ranges,
+    iter_table_batches,
+    populate_arg_parser,
+)
+
+__all__ = [
+    "AccessFormatError",
+    "PAGE_SIZE",
+    "JET_VERSIONS",
+    "COLUMN_TYPE_NAMES",
+    "decode_text",
+    "decode_datetime",
+    "decode_numeric",
+    "AccessColumn",
+    "AccessTable",
+    "AccessDatabase",
+    "split_page_ranges",
+    "iter_table_batches",
+    "populate_arg_parser",
+]
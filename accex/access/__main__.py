@@ -0,0 +1,4 @@
+from .core import _main
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,768 @@
+import os
+import sys
+import mmap
+import uuid
+import struct
+import logging
+import argparse
+import datetime
+import decimal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+
+class AccessFormatError(Exception):
+    """Raised when a file cannot be read as an Access database"""
+
+
+PAGE_SIZE = 4096
+"""
+Page size of Jet4 and ACE databases. Jet3 (Access 97) databases are not supported.
+"""
+
+JET_VERSIONS = {
+    0x01: "Jet4",
+    0x02: "ACE12",
+    0x03: "ACE14",
+    0x04: "ACE15",
+    0x05: "ACE16",
+    0x06: "ACE17",
+}
+"""
+Maps the version byte in the database header to the engine version.
+"""
+
+PAGE_TYPE_DATA = 0x01
+PAGE_TYPE_TABLE_DEFINITION = 0x02
+
+COLUMN_TYPE_BOOL = 0x01
+COLUMN_TYPE_BYTE = 0x02
+COLUMN_TYPE_INT = 0x03
+COLUMN_TYPE_LONG = 0x04
+COLUMN_TYPE_MONEY = 0x05
+COLUMN_TYPE_FLOAT = 0x06
+COLUMN_TYPE_DOUBLE = 0x07
+COLUMN_TYPE_DATETIME = 0x08
+COLUMN_TYPE_BINARY = 0x09
+COLUMN_TYPE_TEXT = 0x0A
+COLUMN_TYPE_OLE = 0x0B
+COLUMN_TYPE_MEMO = 0x0C
+COLUMN_TYPE_GUID = 0x0F
+COLUMN_TYPE_NUMERIC = 0x10
+COLUMN_TYPE_COMPLEX = 0x12
+COLUMN_TYPE_BIG_INT = 0x13
+
+COLUMN_TYPE_NAMES = {
+    COLUMN_TYPE_BOOL: "boolean",
+    COLUMN_TYPE_BYTE: "byte",
+    COLUMN_TYPE_INT: "integer",
+    COLUMN_TYPE_LONG: "long",
+    COLUMN_TYPE_MONEY: "currency",
+    COLUMN_TYPE_FLOAT: "single",
+    COLUMN_TYPE_DOUBLE: "double",
+    COLUMN_TYPE_DATETIME: "datetime",
+    COLUMN_TYPE_BINARY: "binary",
+    COLUMN_TYPE_TEXT: "text",
+    COLUMN_TYPE_OLE: "ole",
+    COLUMN_TYPE_MEMO: "memo",
+    COLUMN_TYPE_GUID: "guid",
+    COLUMN_TYPE_NUMERIC: "numeric",
+    COLUMN_TYPE_COMPLEX: "complex",
+    COLUMN_TYPE_BIG_INT: "bigint",
+}
+
+# database header, encrypted with a fixed RC4 key
+_HEADER_KEY = struct.pack("<I", 0x6B39DAC7)
+_HEADER_OFFSET = 0x18
+_HEADER_SIZE = 126
+_HEADER_DB_KEY_OFFSET = 0x3E
+
+# table definition offsets
+_TDEF_NEXT_PAGE = 4
+_TDEF_ROW_COUNT = 16
+_TDEF_COLUMN_COUNT = 45
+_TDEF_REAL_INDEX_COUNT = 51
+_TDEF_COLUMNS_START = 63
+_TDEF_REAL_INDEX_SIZE = 12
+_TDEF_COLUMN_SIZE = 25
+
+# column entry offsets
+_COL_TYPE = 0
+_COL_NUMBER = 5
+_COL_VAR_INDEX = 7
+_COL_PRECISION = 11
+_COL_SCALE = 12
+_COL_FLAGS = 15
+_COL_FIXED_OFFSET = 21
+_COL_LENGTH = 23
+
+_COL_FLAG_FIXED = 0x01
+_COL_FLAG_NULLABLE = 0x02
+_COL_FLAG_AUTONUMBER = 0x04
+
+# data page offsets
+_DATA_TDEF_PAGE = 4
+_DATA_ROW_COUNT = 12
+_DATA_ROW_OFFSETS = 14
+
+_ROW_OFFSET_MASK = 0x1FFF
+_ROW_DELETED_FLAG = 0x8000
+_ROW_LOOKUP_FLAG = 0x4000
+
+_MEMO_INLINE_FLAG = 0x80000000
+_MEMO_SINGLE_PAGE_FLAG = 0x40000000
+_MEMO_LENGTH_MASK = 0x3FFFFFFF
+
+_SYSTEM_OBJECT_FLAGS = 0x80000002
+_OBJECT_TYPE_TABLE = 1
+
+_EPOCH = datetime.datetime(1899, 12, 30)
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+_FIXED_STRUCTS = {
+    COLUMN_TYPE_BYTE: struct.Struct("<B"),
+    COLUMN_TYPE_INT: struct.Struct("<h"),
+    COLUMN_TYPE_LONG: struct.Struct("<i"),
+    COLUMN_TYPE_MONEY: struct.Struct("<q"),
+    COLUMN_TYPE_FLOAT: struct.Struct("<f"),
+    COLUMN_TYPE_DOUBLE: struct.Struct("<d"),
+    COLUMN_TYPE_DATETIME: struct.Struct("<d"),
+    COLUMN_TYPE_COMPLEX: struct.Struct("<i"),
+    COLUMN_TYPE_BIG_INT: struct.Struct("<q"),
+}
+
+
+def _rc4(key: bytes, data: bytes) -> bytes:
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+    out = bytearray(len(data))
+    i = j = 0
+    for n, c in enumerate(data):
+        i = (i + 1) & 0xFF
+        j = (j + s[i]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+        out[n] = c ^ s[(s[i] + s[j]) & 0xFF]
+    return bytes(out)
+
+
+def decode_text(data: bytes) -> str:
+    """Decodes Jet4 text, which is either UCS-2 or uses the Jet4 unicode compression
+
+    :param data: raw text bytes
+    :type data: bytes
+    :return: text
+    :rtype: str
+    """
+    if data[:2] != b"\xff\xfe":
+        return data.decode("utf-16-le", errors="replace")
+    # compressed text alternates between one byte and two byte segments, split by a null byte
+    segments = data[2:].split(b"\x00")
+    return "".join(
+        (
+            segment.decode("latin-1")
+            if i % 2 == 0
+            else segment.decode("utf-16-le", errors="replace")
+        )
+        for i, segment in enumerate(segments)
+    )
+
+
+def decode_datetime(value: float) -> datetime.datetime:
+    """Decodes an Access date, which is a number of days since 1899-12-30
+
+    :param value: days, the fraction is the time of day
+    :type value: float
+    :return: datetime
+    :rtype: datetime.datetime
+    """
+    # dates before the epoch keep a positive time fraction
+    days = int(value)
+    fraction = abs(value - days)
+    return (
+        _EPOCH
+        + datetime.timedelta(days=days)
+        + datetime.timedelta(microseconds=round(fraction * 86400 * 1000) * 1000)
+    )
+
+
+def decode_numeric(data: bytes, scale: int) -> decimal.Decimal:
+    """Decodes a numeric (decimal) column, a sign byte followed by four 32 bit words in big endian word order
+
+    :param data: 17 bytes
+    :type data: bytes
+    :param scale: column scale
+    :type scale: int
+    :return: value
+    :rtype: decimal.Decimal
+    """
+    value = 0
+    for i in range(4):
+        value = (value << 32) | _U32.unpack_from(data, 1 + i * 4)[0]
+    if data[0] & 0x80:
+        value = -value
+    return decimal.Decimal(value).scaleb(-scale)
+
+
+class AccessColumn:
+    """Represents a column in an Access table definition"""
+
+    def __init__(
+        self,
+        name: str,
+        type: int,
+        number: int,
+        var_index: int,
+        fixed_offset: int,
+        length: int,
+        flags: int,
+        precision: int = 0,
+        scale: int = 0,
+    ) -> None:
+        self.name = name
+        self.type = type
+        self.number = number
+        self.var_index = var_index
+        self.fixed_offset = fixed_offset
+        self.length = length
+        self.flags = flags
+        self.precision = precision
+        self.scale = scale
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, {self.type_name})"
+
+    @property
+    def type_name(self) -> str:
+        return COLUMN_TYPE_NAMES.get(self.type, f"unknown 0x{self.type:02x}")
+
+    @property
+    def is_fixed(self) -> bool:
+        return bool(self.flags & _COL_FLAG_FIXED)
+
+    @property
+    def nullable(self) -> bool:
+        return bool(self.flags & _COL_FLAG_NULLABLE)
+
+    @property
+    def is_autonumber(self) -> bool:
+        return bool(self.flags & _COL_FLAG_AUTONUMBER)
+
+
+class AccessTable:
+    """Represents an Access table definition.
+    ``row_count`` is the count stored in the table definition, which is only an estimate,
+    use ``AccessDatabase.count_rows()`` for an exact count.
+    """
+
+    def __init__(
+        self, name: str, tdef_page: int, row_count: int, columns: list[AccessColumn]
+    ) -> None:
+        self.name = name
+        self.tdef_page = tdef_page
+        self.row_count = row_count
+        self.columns = columns
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, page={self.tdef_page}, rows={self.row_count})"
+
+    def get_column(self, name: str) -> AccessColumn:
+        """Gets a column by name, ignoring case like Access does
+
+        :param name: column name
+        :type name: str
+        :raises KeyError: if the column does not exist
+        :return: column
+        :rtype: AccessColumn
+        """
+        for column in self.columns:
+            if column.name.lower() == name.lower():
+                return column
+        raise KeyError(f"table [{self.name}] has no column named [{name}]")
+
+
+class AccessDatabase:
+    """Reads an Access (.accdb/.mdb) database file directly, without ODBC.
+
+    The file is memory mapped and table definition and data pages are decoded in python.
+    Only plain tables are supported, attachments and multi-value (complex) columns are read as their ids.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise AccessFormatError(f"[{path}] is empty")
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+        self._tables: dict[str, int] | None = None
+
+    def __enter__(self) -> "AccessDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def _read_header(self) -> None:
+        mm = self._mm
+        if (
+            len(mm) < PAGE_SIZE
+            or mm[0] != 0x00
+            or mm[4:15]
+            not in (
+                b"Standard Je",
+                b"Standard AC",
+            )
+        ):
+            raise AccessFormatError(f"[{self.path}] is not an Access database")
+        version = mm[0x14]
+        if version not in JET_VERSIONS:
+            raise AccessFormatError(
+                f"[{self.path}] has unsupported version 0x{version:02x}, only Jet4 and ACE are supported"
+            )
+        self.version = JET_VERSIONS[version]
+        header = _rc4(_HEADER_KEY, mm[_HEADER_OFFSET : _HEADER_OFFSET + _HEADER_SIZE])
+        db_key = _U32.unpack_from(header, _HEADER_DB_KEY_OFFSET - _HEADER_OFFSET)[0]
+        if db_key:
+            raise AccessFormatError(f"[{self.path}] is encrypted")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._mm) // PAGE_SIZE
+
+    def _find_row(self, page: int, row: int) -> tuple[int, int]:
+        base = page * PAGE_SIZE
+        start = _U16.unpack_from(self._mm, base + _DATA_ROW_OFFSETS + row * 2)[0]
+        end = (
+            PAGE_SIZE
+            if row == 0
+            else _U16.unpack_from(self._mm, base + _DATA_ROW_OFFSETS + (row - 1) * 2)[0]
+            & _ROW_OFFSET_MASK
+        )
+        return base + (start & _ROW_OFFSET_MASK), base + end
+
+    def _read_table_definition_buffer(self, tdef_page: int) -> bytes:
+        mm = self._mm
+        base = tdef_page * PAGE_SIZE
+        if mm[base] != PAGE_TYPE_TABLE_DEFINITION:
+            raise AccessFormatError(f"page {tdef_page} is not a table definition")
+        buffer = bytearray(mm[base : base + PAGE_SIZE])
+        next_page = _U32.unpack_from(mm, base + _TDEF_NEXT_PAGE)[0]
+        while next_page:
+            base = next_page * PAGE_SIZE
+            buffer += mm[base + 8 : base + PAGE_SIZE]
+            next_page = _U32.unpack_from(mm, base + _TDEF_NEXT_PAGE)[0]
+        return bytes(buffer)
+
+    def read_table_definition(self, tdef_page: int, name: str = "") -> AccessTable:
+        """Reads a table definition
+
+        :param tdef_page: page number of the table definition
+        :type tdef_page: int
+        :param name: table name, defaults to ""
+        :type name: str, optional
+        :return: table
+        :rtype: AccessTable
+        """
+        buffer = self._read_table_definition_buffer(tdef_page)
+        row_count = _U32.unpack_from(buffer, _TDEF_ROW_COUNT)[0]
+        column_count = _U16.unpack_from(buffer, _TDEF_COLUMN_COUNT)[0]
+        real_index_count = _U32.unpack_from(buffer, _TDEF_REAL_INDEX_COUNT)[0]
+        offset = _TDEF_COLUMNS_START + real_index_count * _TDEF_REAL_INDEX_SIZE
+        entries = []
+        for _ in range(column_count):
+            entries.append(offset)
+            offset += _TDEF_COLUMN_SIZE
+        columns = []
+        for entry in entries:
+            name_length = _U16.unpack_from(buffer, offset)[0]
+            column_name = buffer[offset + 2 : offset + 2 + name_length].decode(
+                "utf-16-le"
+            )
+            offset += 2 + name_length
+            columns.append(
+                AccessColumn(
+                    name=column_name,
+                    type=buffer[entry + _COL_TYPE],
+                    number=_U16.unpack_from(buffer, entry + _COL_NUMBER)[0],
+                    var_index=_U16.unpack_from(buffer, entry + _COL_VAR_INDEX)[0],
+                    fixed_offset=_U16.unpack_from(buffer, entry + _COL_FIXED_OFFSET)[0],
+                    length=_U16.unpack_from(buffer, entry + _COL_LENGTH)[0],
+                    flags=buffer[entry + _COL_FLAGS],
+                    precision=buffer[entry + _COL_PRECISION],
+                    scale=buffer[entry + _COL_SCALE],
+                )
+            )
+        columns.sort(key=lambda c: c.number)
+        return AccessTable(name, tdef_page, row_count, columns)
+
+    def _get_table_pages(self) -> dict[str, int]:
+        if self._tables is None:
+            catalog = self.read_table_definition(2, "MSysObjects")
+            tables = dict()
+            for row in self.iter_table_rows(catalog, ["Id", "Name", "Type", "Flags"]):
+                object_id, name, object_type, flags = row
+                if object_type == _OBJECT_TYPE_TABLE and name:
+                    tables[name] = (
+                        object_id & 0x00FFFFFF,
+                        (flags or 0) & _SYSTEM_OBJECT_FLAGS,
+                    )
+            self._tables = tables
+        return self._tables
+
+    def table_names(self, system: bool = False) -> list[str]:
+        """Lists tables in the database
+
+        :param system: include system tables, defaults to False
+        :type system: bool, optional
+        :return: table names
+        :rtype: list[str]
+        """
+        return [
+            name
+            for name, (_, system_flags) in self._get_table_pages().items()
+            if system or not system_flags
+        ]
+
+    def get_table(self, name: str) -> AccessTable:
+        """Gets a table definition by name, ignoring case like Access does
+
+        :param name: table name
+        :type name: str
+        :raises KeyError: if the table does not exist
+        :return: table
+        :rtype: AccessTable
+        """
+        for table_name, (tdef_page, _) in self._get_table_pages().items():
+            if table_name.lower() == name.lower():
+                return self.read_table_definition(tdef_page, table_name)
+        raise KeyError(f"[{self.path}] has no table named [{name}]")
+
+    def _read_long_value(self, data: bytes) -> bytes:
+        mm = self._mm
+        memo_length = _U32.unpack_from(data, 0)[0]
+        length = memo_length & _MEMO_LENGTH_MASK
+        if memo_length & _MEMO_INLINE_FLAG:
+            return data[12 : 12 + length]
+        pointer = _U32.unpack_from(data, 4)[0]
+        if memo_length & _MEMO_SINGLE_PAGE_FLAG:
+            start, end = self._find_row(pointer >> 8, pointer & 0xFF)
+            return mm[start : min(end, start + length)]
+        out = bytearray()
+        while pointer and len(out) < length:
+            start, end = self._find_row(pointer >> 8, pointer & 0xFF)
+            pointer = _U32.unpack_from(mm, start)[0]
+            out += mm[start + 4 : end]
+        return bytes(out[:length])
+
+    def _create_decoders(self, table: AccessTable, columns: list[str] | None) -> list:
+        selected = (
+            table.columns
+            if columns is None
+            else [table.get_column(name) for name in columns]
+        )
+        decoders = []
+        for column in selected:
+            t = column.type
+            if t == COLUMN_TYPE_BOOL:
+                decode = None
+            elif t in _FIXED_STRUCTS:
+                s = _FIXED_STRUCTS[t]
+                if t == COLUMN_TYPE_MONEY:
+                    decode = lambda data, s=s: decimal.Decimal(
+                        s.unpack(data)[0]
+                    ).scaleb(-4)
+                elif t == COLUMN_TYPE_DATETIME:
+                    decode = lambda data, s=s: decode_datetime(s.unpack(data)[0])
+                else:
+                    decode = lambda data, s=s: s.unpack(data)[0]
+            elif t == COLUMN_TYPE_TEXT:
+                decode = decode_text
+            elif t == COLUMN_TYPE_MEMO:
+                decode = lambda data: decode_text(self._read_long_value(data))
+            elif t == COLUMN_TYPE_OLE:
+                decode = self._read_long_value
+            elif t == COLUMN_TYPE_GUID:
+                decode = lambda data: "{" + str(uuid.UUID(bytes_le=data)).upper() + "}"
+            elif t == COLUMN_TYPE_NUMERIC:
+                decode = lambda data, scale=column.scale: decode_numeric(data, scale)
+            else:
+                decode = bytes
+            decoders.append((column, decode))
+        return decoders
+
+    def _decode_row(self, start: int, end: int, decoders: list) -> list:
+        mm = self._mm
+        row_column_count = _U16.unpack_from(mm, start)[0]
+        null_mask_size = (row_column_count + 7) // 8
+        null_mask_start = end - null_mask_size
+        null_mask = mm[null_mask_start:end]
+        row_var_count = _U16.unpack_from(mm, null_mask_start - 2)[0]
+        row = []
+        for column, decode in decoders:
+            number = column.number
+            present = number < row_column_count and bool(
+                null_mask[number // 8] & (1 << (number % 8))
+            )
+            if decode is None:
+                # boolean values are stored in the null mask
+                row.append(present)
+            elif not present:
+                row.append(None)
+            elif column.is_fixed:
+                data_start = start + 2 + column.fixed_offset
+                row.append(decode(mm[data_start : data_start + column.length]))
+            elif column.var_index < row_var_count:
+                # variable column offsets are stored backwards before the var count
+                offset_pos = null_mask_start - 4 - column.var_index * 2
+                data_start = _U16.unpack_from(mm, offset_pos)[0]
+                data_end = _U16.unpack_from(mm, offset_pos - 2)[0]
+                row.append(decode(mm[start + data_start : start + data_end]))
+            else:
+                row.append(None)
+        return row
+
+    def _iter_page_rows(self, page: int, decoders: list) -> Iterator[list]:
+        mm = self._mm
+        base = page * PAGE_SIZE
+        row_count = _U16.unpack_from(mm, base + _DATA_ROW_COUNT)[0]
+        end = base + PAGE_SIZE
+        for i in range(row_count):
+            raw_offset = _U16.unpack_from(mm, base + _DATA_ROW_OFFSETS + i * 2)[0]
+            start = base + (raw_offset & _ROW_OFFSET_MASK)
+            row_end = end
+            end = start
+            # overflow rows are stored elsewhere and flagged as deleted,
+            # so they are only read through the row pointing to them
+            if raw_offset & _ROW_DELETED_FLAG:
+                continue
+            if raw_offset & _ROW_LOOKUP_FLAG:
+                pointer = _U32.unpack_from(mm, start)[0]
+                start, row_end = self._find_row(pointer >> 8, pointer & 0xFF)
+            yield self._decode_row(start, row_end, decoders)
+
+    def count_rows(
+        self, table: AccessTable, page_range: tuple[int, int] | None = None
+    ) -> int:
+        """Counts rows of a table from the data pages without decoding them.
+        The row count in the table definition can be stale, this count is exact.
+
+        :param table: table
+        :type table: AccessTable
+        :param page_range: range of pages to scan as ``(start, stop)``, defaults to all pages
+        :type page_range: tuple[int, int] | None, optional
+        :return: row count
+        :rtype: int
+        """
+        mm = self._mm
+        count = 0
+        for page in self.iter_data_pages(table, page_range):
+            base = page * PAGE_SIZE
+            row_count = _U16.unpack_from(mm, base + _DATA_ROW_COUNT)[0]
+            for i in range(row_count):
+                raw_offset = _U16.unpack_from(mm, base + _DATA_ROW_OFFSETS + i * 2)[0]
+                if not raw_offset & _ROW_DELETED_FLAG:
+                    count += 1
+        return count
+
+    def iter_data_pages(
+        self, table: AccessTable, page_range: tuple[int, int] | None = None
+    ) -> Iterator[int]:
+        """Iterates data pages that belong to a table
+
+        :param table: table
+        :type table: AccessTable
+        :param page_range: range of pages to scan as ``(start, stop)``, defaults to all pages
+        :type page_range: tuple[int, int] | None, optional
+        """
+        mm = self._mm
+        start, stop = page_range or (0, self.page_count)
+        for page in range(start, min(stop, self.page_count)):
+            base = page * PAGE_SIZE
+            if (
+                mm[base] == PAGE_TYPE_DATA
+                and _U32.unpack_from(mm, base + _DATA_TDEF_PAGE)[0] == table.tdef_page
+            ):
+                yield page
+
+    def iter_table_rows(
+        self,
+        table: AccessTable,
+        columns: list[str] | None = None,
+        page_range: tuple[int, int] | None = None,
+    ) -> Iterator[list]:
+        """Iterates rows of a table
+
+        :param table: table
+        :type table: AccessTable
+        :param columns: column names to read, defaults to all columns
+        :type columns: list[str] | None, optional
+        :param page_range: range of pages to scan as ``(start, stop)``, defaults to all pages
+        :type page_range: tuple[int, int] | None, optional
+        """
+        decoders = self._create_decoders(table, columns)
+        for page in self.iter_data_pages(table, page_range):
+            yield from self._iter_page_rows(page, decoders)
+
+    def iter_batches(
+        self,
+        table_name: str,
+        columns: list[str] | None = None,
+        batch_size: int = 1000,
+        page_range: tuple[int, int] | None = None,
+    ) -> Iterator[list[list]]:
+        """Iterates rows of a table in batches
+
+        :param table_name: table name
+        :type table_name: str
+        :param columns: column names to read, defaults to all columns
+        :type columns: list[str] | None, optional
+        :param batch_size: rows per batch, defaults to 1000
+        :type batch_size: int, optional
+        :param page_range: range of pages to scan as ``(start, stop)``, defaults to all pages
+        :type page_range: tuple[int, int] | None, optional
+        """
+        batch = []
+        for row in self.iter_table_rows(
+            self.get_table(table_name), columns, page_range
+        ):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _read_page_range(
+    path: str, table_name: str, columns: list[str] | None, page_range: tuple[int, int]
+) -> list[list]:
+    with AccessDatabase(path) as db:
+        return list(db.iter_table_rows(db.get_table(table_name), columns, page_range))
+
+
+def split_page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """Splits pages into disjoint ranges
+
+    :param page_count: number of pages
+    :type page_count: int
+    :param parts: number of ranges
+    :type parts: int
+    :return: list of ``(start, stop)`` ranges
+    :rtype: list[tuple[int, int]]
+    """
+    parts = max(1, min(parts, page_count))
+    size = -(-page_count // parts)
+    return [
+        (start, min(start + size, page_count)) for start in range(0, page_count, size)
+    ]
+
+
+def iter_table_batches(
+    path: str,
+    table_name: str,
+    columns: list[str] | None = None,
+    batch_size: int = 1000,
+    workers: int = 0,
+) -> Iterator[list[list]]:
+    """Reads a table from an Access database file in batches.
+    If ``workers`` is more than 1, disjoint page ranges are decoded in parallel worker processes,
+    and batches are still yielded in page order.
+
+    :param path: database file path
+    :type path: str
+    :param table_name: table name
+    :type table_name: str
+    :param columns: column names to read, defaults to all columns
+    :type columns: list[str] | None, optional
+    :param batch_size: rows per batch, defaults to 1000
+    :type batch_size: int, optional
+    :param workers: number of worker processes, 0 or 1 reads in this process, defaults to 0
+    :type workers: int, optional
+    """
+    if workers <= 1:
+        with AccessDatabase(path) as db:
+            yield from db.iter_batches(table_name, columns, batch_size)
+        return
+
+    with AccessDatabase(path) as db:
+        # validate names before starting workers
+        table = db.get_table(table_name)
+        for name in columns or []:
+            table.get_column(name)
+        page_count = db.page_count
+
+    # more ranges than workers, so results can be yielded while other ranges are decoded
+    page_ranges = split_page_ranges(page_count, workers * 4)
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(
+            _read_page_range,
+            [path] * len(page_ranges),
+            [table_name] * len(page_ranges),
+            [columns] * len(page_ranges),
+            page_ranges,
+        ):
+            batch.extend(rows)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def populate_arg_parser(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("path", type=str, help="path to an Access database file")
+    parser.add_argument(
+        "table_name", type=str, nargs="?", help="table to read, lists tables if not set"
+    )
+    parser.add_argument(
+        "--columns", action="store_true", help="list the columns of the table"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=10, help="max rows to print, defaults to 10"
+    )
+    parser.add_argument(
+        "--log-level", type=str, default="INFO", help="log level for logging"
+    )
+    return parser
+
+
+def _main():
+    arg_parser = argparse.ArgumentParser(prog="accex.access")
+    populate_arg_parser(arg_parser)
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.getLevelNamesMapping()[args.log_level])
+
+    if not os.path.exists(args.path):
+        logging.getLogger("access").error(f"[{args.path}] does not exist")
+        sys.exit(1)
+
+    with AccessDatabase(args.path) as db:
+        if not args.table_name:
+            print("\n".join(db.table_names()))
+            return
+        table = db.get_table(args.table_name)
+        if args.columns:
+            print("\n".join(f"{c.name}: {c.type_name}" for c in table.columns))
+            return
+        print(",".join(c.name for c in table.columns))
+        for i, row in enumerate(db.iter_table_rows(table)):
+            if i >= args.limit:
+                break
+            print(",".join(str(v) for v in row))
@@ -2,9 +2,17 @@ from .core import (
     ValidationError,
     ConstructionError,
     source_default_catalog,
+    source_backends,
+    source_default_backend,
+    lookup_strategies,
+    lookup_default_strategy,
+    source_count_modes,
+    source_default_count_mode,
+    loop_default_stall_threshold,
     target_default_schema,
     get_target_default_schema,
     Serializeable,
+    to_serial_obj,
     SourceTablePointer,
     TargetTablePointer,
     TargetColumnPointer,
@@ -33,10 +41,14 @@ from .core import (
     target_column_pointer_parse_action,
     parse_target_table_pointer,
     parse_source_column_function,
+    ColumnConstraint,
+    ColumnDefinition,
+    parse_column_definition,
     parse_config,
     parse_config_file,
     create_dumper,
     write_config,
+    write_config_json,
     write_config_file,
     find_config_path,
     resolve_config_path,
@@ -47,9 +59,17 @@ __all__ = [
     "ValidationError",
     "ConstructionError",
     "source_default_catalog",
+    "source_backends",
+    "source_default_backend",
+    "lookup_strategies",
+    "lookup_default_strategy",
+    "source_count_modes",
+    "source_default_count_mode",
+    "loop_default_stall_threshold",
     "target_default_schema",
     "get_target_default_schema",
     "Serializeable",
+    "to_serial_obj",
     "SourceTablePointer",
     "TargetTablePointer",
     "TargetColumnPointer",
@@ -78,10 +98,14 @@ __all__ = [
     "target_column_pointer_parse_action",
     "parse_target_table_pointer",
     "parse_source_column_function",
+    "ColumnConstraint",
+    "ColumnDefinition",
+    "parse_column_definition",
     "parse_config",
     "parse_config_file",
     "create_dumper",
     "write_config",
+    "write_config_json",
     "write_config_file",
     "find_config_path",
     "resolve_config_path",
@@ -1,7 +1,10 @@
 import os
+import re
 import sys
+import json
 import argparse
 import logging
+import functools
 import pyparsing as pp
 from typing import Any, TypeVar, Generic, Self
 import dotenv
@@ -24,6 +27,34 @@ _TConfig = TypeVar("_TConfig", bound="Config")
 
 source_default_catalog = ""
 
+source_backends = ("odbc", "native")
+"""
+Ways a source table can be read, ``odbc`` uses the ODBC driver, ``native`` decodes the Access file directly.
+"""
+
+source_default_backend = "odbc"
+
+lookup_strategies = ("client", "join")
+"""
+Ways map function columns are resolved, ``client`` matches lookup rows in python,
+``join`` stages chunks in a temporary table on the target and joins the lookup tables in one ``INSERT ... SELECT``.
+"""
+
+lookup_default_strategy = "client"
+
+source_count_modes = ("concurrent", "exact", "estimate", "none")
+"""
+Ways the rows of a source table are counted for progress, ``concurrent`` counts on a second connection while rows are
+fetched, ``exact`` counts before fetching, ``estimate`` uses the row count in the table statistics and ``none`` does not count.
+"""
+
+source_default_count_mode = "concurrent"
+
+loop_default_stall_threshold = 0.1
+"""
+Default seconds the event loop may be blocked before a stall is reported, when ``LOOP_WATCHDOG`` is true.
+"""
+
 target_default_schema = "public"
 
 
@@ -46,6 +77,52 @@ class Serializeable(Generic[_TSerializeableContext]):
         return dumper.represent_str(f"unhandled {self.__class__.__name__}")
         # raise TypeError(f"{self.__class__} is not Serializeable")
 
+    def __serial_obj__(self, context: _TSerializeableContext) -> object:
+        if isinstance(self, dict):
+            return dict((k, to_serial_obj(v, context)) for k, v in self.items())
+        elif isinstance(self, list):
+            return [to_serial_obj(v, context) for v in self]
+        return f"unhandled {self.__class__.__name__}"
+
+    def to_dict(self, context: _TSerializeableContext = None) -> object:
+        """Converts to plain python objects, matching what would be loaded from the written YAML
+
+        :param context: serialization context, defaults to None
+        :type context: _TSerializeableContext, optional
+        :return: plain ``dict``, ``list`` or ``str`` depending on the class
+        :rtype: object
+        """
+        return self.__serial_obj__(context)
+
+    def to_json(self, context: _TSerializeableContext = None, **kwargs) -> str:
+        """Converts to a JSON string without going through YAML
+
+        :param context: serialization context, defaults to None
+        :type context: _TSerializeableContext, optional
+        :return: JSON string, ``kwargs`` are passed to ``json.dumps``
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(context), **kwargs)
+
+
+def to_serial_obj(obj: object, context: object = None) -> object:
+    """Converts an object to plain python objects that can be written as JSON or YAML
+
+    :param obj: object, which may contain ``Serializeable`` objects
+    :type obj: object
+    :param context: serialization context, defaults to None
+    :type context: object, optional
+    :return: the converted object
+    :rtype: object
+    """
+    if isinstance(obj, Serializeable):
+        return obj.__serial_obj__(context)
+    if isinstance(obj, dict):
+        return dict((k, to_serial_obj(v, context)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return [to_serial_obj(v, context) for v in obj]
+    return obj
+
 
 class SourceTablePointer(Serializeable[_TConfig]):
     """Represents a pointer to a source table"""
@@ -107,6 +184,9 @@ class SourceTablePointer(Serializeable[_TConfig]):
     def __serial_repr__(self, dumper, context) -> object:
         return dumper.represent_str(self.__str__())
 
+    def __serial_obj__(self, context) -> object:
+        return self.__str__()
+
     def set_from_pointer(self, p: Self) -> None:
         self.catalog_name = p.catalog_name
         self.table_name = p.table_name
@@ -190,6 +270,9 @@ class TargetTablePointer(Serializeable[_TConfig]):
     def __serial_repr__(self, dumper, context: _TConfig) -> object:
         return dumper.represent_str(self.to_sql_str())
 
+    def __serial_obj__(self, context: _TConfig) -> object:
+        return self.to_sql_str()
+
     def to_sql_str(self, with_schema: bool = True) -> str:
         return ((with_schema and self.schema_name and f"{self.schema_name}.") or "") + (
             self.table_name or "?"
@@ -222,7 +305,10 @@ class TargetColumnPointer(Serializeable[_TConfig]):
     """Represents a pointer to a target table column"""
 
     def __init__(
-        self, column_name: str, target_table_pointer: TargetTablePointer
+        self,
+        column_name: str,
+        target_table_pointer: TargetTablePointer,
+        transforms: list[str] | None = None,
     ) -> None:
         f"""Construct a new target column pointer
 
@@ -230,17 +316,21 @@ class TargetColumnPointer(Serializeable[_TConfig]):
         :type column_name: str
         :param target_table_pointer: target table the column belongs to
         :type target_table_pointer: {TargetTablePointer.__name__}
+        :param transforms: names of transforms applied to the source values in order, from ``USING``, defaults to None
+        :type transforms: list[str] | None, optional
         """
         if not isinstance(target_table_pointer, TargetTablePointer):
             target_table_pointer = TargetTablePointer(target_table_pointer)
         self.table = target_table_pointer
         self.column_name = column_name
+        self.transforms: list[str] = transforms or []
 
     def __eq__(self, __value: object) -> bool:
         return (
             isinstance(__value, TargetColumnPointer)
             and self.table == __value.table
             and self.column_name == __value.column_name
+            and self.transforms == __value.transforms
         )
 
     def __str__(self) -> str:
@@ -251,7 +341,12 @@ class TargetColumnPointer(Serializeable[_TConfig]):
 
     def __serial_repr__(self, dumper, context) -> object:
         # return dumper.represent_str(self.__str__())
-        return dumper.represent_str(self.column_name)
+        return dumper.represent_str(self.__serial_obj__(context))
+
+    def __serial_obj__(self, context) -> object:
+        if self.transforms:
+            return f"{self.column_name} USING {', '.join(self.transforms)}"
+        return self.column_name
 
     @property
     def schema_name(self) -> str:
@@ -312,6 +407,9 @@ class TargetRowPointer(Serializeable[_TConfig]):
     def __serial_repr__(self, dumper, context) -> object:
         return dumper.represent_str(self.__str__())
 
+    def __serial_obj__(self, context) -> object:
+        return self.__str__()
+
     def validate(self, config: _TConfig):
         self.select_column.validate(config)
         if self.match_directive not in TargetRowPointer.match_directives:
@@ -359,6 +457,9 @@ class SourceColumnMapFunction(Serializeable[_TConfig]):
     def __serial_repr__(self, dumper, context) -> object:
         return dumper.represent_str(self.__str__())
 
+    def __serial_obj__(self, context) -> object:
+        return self.__str__()
+
     @property
     def table(self) -> TargetTablePointer:
         return self.to_column.table
@@ -506,6 +607,14 @@ class SourceTableBlock(dict[str, object], Serializeable[_TConfig]):
             )
         )
 
+    def __serial_obj__(self, context: _TConfig) -> object:
+        return to_serial_obj(
+            sort_dict_with_list(
+                self, ["TABLE", "TARGET_TABLE", "DSN_PARAMS", "COLUMNS"]
+            ),
+            context,
+        )
+
     @property
     def table_pointer(self) -> SourceTablePointer:
         return self["TABLE"]
@@ -522,6 +631,28 @@ class SourceTableBlock(dict[str, object], Serializeable[_TConfig]):
     def dsn_params(self) -> dict[str, str]:
         return self.get("DSN_PARAMS") or dict()
 
+    @property
+    def backend(self) -> str | None:
+        return self.get("BACKEND")
+
+    @property
+    def encoding(self) -> str | dict | None:
+        return self.get("ENCODING")
+
+    @property
+    def lookup_strategy(self) -> str | None:
+        return self.get("LOOKUP_STRATEGY")
+
+    @property
+    def commit_every_chunks(self) -> int | None:
+        value = self.get("COMMIT_EVERY_CHUNKS")
+        return None if value is None else int(value)
+
+    @property
+    def commit_every_seconds(self) -> float | None:
+        value = self.get("COMMIT_EVERY_SECONDS")
+        return None if value is None else float(value)
+
     @property
     def target_table_deps(self) -> set[TargetTablePointer]:
         return self.columns.target_table_deps
@@ -542,6 +673,17 @@ class SourceTableBlock(dict[str, object], Serializeable[_TConfig]):
                 raise ValidationError(
                     f"Column should be a TargetColumnPointer or Function, got {column}"
                 )
+        if self.backend is not None and self.backend not in source_backends:
+            raise ValidationError(
+                f"Invalid BACKEND {self.backend}, must be one of [{', '.join(source_backends)}]"
+            )
+        if (
+            self.lookup_strategy is not None
+            and self.lookup_strategy not in lookup_strategies
+        ):
+            raise ValidationError(
+                f"Invalid LOOKUP_STRATEGY {self.lookup_strategy}, must be one of [{', '.join(lookup_strategies)}]"
+            )
         if "TARGET_TABLE" in self:
             r = self["TARGET_TABLE"]
             if not isinstance(r, TargetTablePointer):
@@ -602,12 +744,24 @@ class TargetTableBlockColumns(dict[str, str], Serializeable[_TConfig]):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    @property
+    def definitions(self) -> dict[str, "ColumnDefinition"]:
+        """Column definitions split into data types and constraints"""
+        return {name: parse_column_definition(ddl) for name, ddl in self.items()}
+
 
 class TargetTableBlock(dict[str, str | dict], Serializeable[_TConfig]):
     Columns = TargetTableBlockColumns
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        for k, v in self.items():
+            self[k] = v
+
+    def __setitem__(self, __key: Any, __value: Any) -> None:
+        if __key == "COLUMNS" and not isinstance(__value, TargetTableBlockColumns):
+            __value = TargetTableBlockColumns(__value)
+        super().__setitem__(__key, __value)
 
     def __hash__(self) -> int:
         return hash(TargetTablePointer.from_str(self.name))
@@ -627,11 +781,20 @@ class TargetTableBlock(dict[str, str | dict], Serializeable[_TConfig]):
     def dsn_params(self) -> dict[str, str]:
         return self.get("DSN_PARAMS") or dict()
 
+    @property
+    def encoding(self) -> str | dict | None:
+        return self.get("ENCODING")
+
     def validate(self, config: _TConfig):
         if "TABLE" not in self:
             raise ValidationError("Missing TABLE")
         if "COLUMNS" not in self:
             raise ValidationError("Missing COLUMNS")
+        if config.bulk_load:
+            try:
+                self.columns.definitions
+            except ValueError as e:
+                raise ValidationError(f"Invalid column in target {self.name} - {e}")
 
 
 class TargetsBlock(dict[TargetTablePointer, TargetTableBlock], Serializeable[_TConfig]):
@@ -682,6 +845,9 @@ class TargetsBlock(dict[TargetTablePointer, TargetTableBlock], Serializeable[_TC
     def __serial_repr__(self, dumper, context: _TConfig) -> object:
         return dumper.represent_list(list(self.values()))
 
+    def __serial_obj__(self, context: _TConfig) -> object:
+        return to_serial_obj(list(self.values()), context)
+
     def add(self, __element: object) -> None:
         self.__setitem__("", __element)
 
@@ -772,6 +938,190 @@ class Config(dict, Serializeable[_TConfig]):
     def source_dsn_params(self, value) -> None:
         self["SOURCE_DSN_PARAMS"] = value
 
+    @property
+    def source_encoding(self) -> str | dict | None:
+        """Text decoding and encoding of source connections, a preset name or settings"""
+        return self.get("SOURCE_ENCODING")
+
+    @property
+    def target_encoding(self) -> str | dict | None:
+        """Text decoding and encoding of target connections, a preset name or settings"""
+        return self.get("TARGET_ENCODING")
+
+    @property
+    def source_backend(self) -> str:
+        """How source tables are read by default, one of ``source_backends``"""
+        return self.get("SOURCE_BACKEND") or source_default_backend
+
+    @property
+    def lookup_strategy(self) -> str:
+        """How map function columns are resolved by default, one of ``lookup_strategies``"""
+        return self.get("LOOKUP_STRATEGY") or lookup_default_strategy
+
+    @property
+    def lookup_indexes(self) -> str | None:
+        """How indexes on map function lookup columns are handled, ``drop`` (default) drops them after the
+        tables that use them are loaded, ``keep`` keeps them, None if they are not created
+        """
+        value = self.get("LOOKUP_INDEXES", True)
+        if value is True:
+            return "drop"
+        return value or None
+
+    @property
+    def source_workers(self) -> int:
+        """Worker processes used by the ``native`` backend to decode a table in parallel"""
+        return int(self.get("SOURCE_WORKERS") or 0)
+
+    @property
+    def source_snapshot(self) -> bool:
+        """Whether source database files are copied locally before they are read"""
+        return bool(self.get("SOURCE_SNAPSHOT"))
+
+    @property
+    def snapshot_dir(self) -> str | None:
+        """Directory for local copies of source database files"""
+        return self.get("SNAPSHOT_DIR")
+
+    @property
+    def commit_every_chunks(self) -> int:
+        """Commit after this many inserted chunks, 0 disables the chunk interval"""
+        return int(self.get("COMMIT_EVERY_CHUNKS") or 0)
+
+    @property
+    def commit_every_seconds(self) -> float:
+        """Commit after this many seconds of inserting, 0 disables the time interval"""
+        return float(self.get("COMMIT_EVERY_SECONDS") or 0)
+
+    @property
+    def chunk_retries(self) -> int:
+        """Times a chunk is retried on a new target connection after a transient error, such as a lost connection"""
+        value = self.get("CHUNK_RETRIES")
+        return 3 if value is None else int(value)
+
+    @property
+    def chunk_retry_backoff(self) -> float:
+        """Seconds waited before the first retry of a chunk, doubled for each further retry"""
+        value = self.get("CHUNK_RETRY_BACKOFF")
+        return 1.0 if value is None else float(value)
+
+    @property
+    def source_count(self) -> str:
+        """How source rows are counted for progress, one of ``source_count_modes``"""
+        return self.get("SOURCE_COUNT") or source_default_count_mode
+
+    @property
+    def verify_counts(self) -> bool:
+        """Count the rows of each target table after loading it and compare them with the inserted rows"""
+        return bool(self.get("VERIFY_COUNTS"))
+
+    @property
+    def loop_watchdog(self) -> float | None:
+        """Seconds the event loop may be blocked before the stall is reported, ``true`` uses the default threshold,
+        None if the loop is not watched
+        """
+        value = self.get("LOOP_WATCHDOG")
+        if value is None or value is False:
+            return None
+        if value is True:
+            return loop_default_stall_threshold
+        return float(value)
+
+    @property
+    def slow_log_path(self) -> str | None:
+        """Path of the JSON lines file that fetches, lookups and inserts slower than the threshold are written to"""
+        return self.get("SLOW_LOG_PATH")
+
+    @property
+    def slow_log_threshold(self) -> float | None:
+        """Seconds an operation may take before it is written to the slow log"""
+        value = self.get("SLOW_LOG_THRESHOLD")
+        return None if value is None else float(value)
+
+    @property
+    def prevalidate(self) -> bool:
+        """Check each chunk against the target column definitions before inserting it"""
+        return bool(self.get("PREVALIDATE"))
+
+    @property
+    def skip_unchanged(self) -> bool:
+        """Skip target tables whose source tables are unchanged since their last successful load"""
+        return bool(self.get("SKIP_UNCHANGED"))
+
+    @property
+    def manifest_path(self) -> str | None:
+        """Path of the run manifest holding the fingerprints of the last successful load of each target table"""
+        return self.get("MANIFEST_PATH")
+
+    @property
+    def record_history(self) -> bool:
+        """Whether the stats of each run are appended to the run history"""
+        return bool(self.get("RECORD_HISTORY"))
+
+    @property
+    def history_path(self) -> str | None:
+        """Path of the SQLite run history database, read by ``accex report``"""
+        return self.get("HISTORY_PATH")
+
+    @property
+    def dead_letter_path(self) -> str | None:
+        """JSON lines file that rows rejected by the target database are written to.
+        When set, a chunk that fails with a data error is split until the rejected rows are found, and only they are skipped.
+        """
+        return self.get("DEAD_LETTER_PATH")
+
+    @property
+    def target_session_profile(self) -> str | None:
+        """Name of the session profile applied to target connections, such as ``bulk``"""
+        return self.get("TARGET_SESSION_PROFILE")
+
+    @property
+    def transform_modules(self) -> list[str]:
+        """Modules imported before transferring, so the transforms they register can be used with ``USING``"""
+        return self.get("TRANSFORM_MODULES") or []
+
+    @property
+    def transform_workers(self) -> int:
+        """Worker processes for heavy column transforms, 0 uses one per CPU"""
+        return int(self.get("TRANSFORM_WORKERS") or 0)
+
+    @property
+    def coercion(self) -> dict | None:
+        """Options of the type coercion stage, which is enabled when set.
+        ``TRIM`` strips whitespace from strings and ``EMPTY_AS_NULL`` inserts empty strings as NULL.
+        """
+        coercion = self.get("COERCION")
+        if coercion is None or coercion is False:
+            return None
+        if coercion is True:
+            return dict()
+        return coercion
+
+    @property
+    def bulk_load(self) -> bool:
+        """Whether target tables are created without constraints, which are added after all tables are loaded"""
+        return bool(self.get("BULK_LOAD"))
+
+    @property
+    def shadow_load(self) -> bool:
+        """Load target tables into shadow tables and swap them in once all tables are loaded"""
+        return bool(self.get("SHADOW_LOAD"))
+
+    @property
+    def bulk_load_workers(self) -> int:
+        """Amount of connections used to add constraints after a bulk load"""
+        return int(self.get("BULK_LOAD_WORKERS") or 4)
+
+    @property
+    def staging_dir(self) -> str | None:
+        """Directory for staging files used by ``accex extract`` and ``accex load``"""
+        return self.get("STAGING_DIR")
+
+    @property
+    def inspection_path(self) -> str | None:
+        """Path of the source inspection snapshot written by ``accex inspect``"""
+        return self.get("INSPECTION_PATH")
+
     def get_source_dsn_params_with_catalog(self, catalog_name: str) -> dict[str, str]:
         # SOURCE_DSN_PARAMS + defined source database DSN_PARAMS + ( FIXME: source table DSN_PARAMS)
         return {
@@ -792,6 +1142,29 @@ class Config(dict, Serializeable[_TConfig]):
         self.targets.validate(self)
         # if "SOURCE_DATABASES" not in self: raise ValidationError("Missing SOURCE_DATABASES")
         self.source_databases.validate(self)
+        if self.source_backend not in source_backends:
+            raise ValidationError(
+                f"Invalid SOURCE_BACKEND {self.source_backend}, must be one of [{', '.join(source_backends)}]"
+            )
+        if self.source_count not in source_count_modes:
+            raise ValidationError(
+                f"Invalid SOURCE_COUNT {self.source_count}, must be one of [{', '.join(source_count_modes)}]"
+            )
+        if self.lookup_indexes not in (None, "drop", "keep"):
+            raise ValidationError(
+                f"Invalid LOOKUP_INDEXES {self.lookup_indexes}, must be true, false, drop or keep"
+            )
+        loop_watchdog = self.get("LOOP_WATCHDOG")
+        if loop_watchdog not in (None, True, False) and (
+            not isinstance(loop_watchdog, (int, float)) or loop_watchdog <= 0
+        ):
+            raise ValidationError(
+                f"Invalid LOOP_WATCHDOG {loop_watchdog}, must be true, false or a positive number of seconds"
+            )
+        if self.lookup_strategy not in lookup_strategies:
+            raise ValidationError(
+                f"Invalid LOOKUP_STRATEGY {self.lookup_strategy}, must be one of [{', '.join(lookup_strategies)}]"
+            )
         if "SOURCES" not in self:
             raise ValidationError("Missing SOURCES")
         self.sources.validate(self)
@@ -959,7 +1332,25 @@ def _create_source_column_function_parser() -> pp.ParserElement:
 
     map_function.add_condition(map_function_condition)
 
-    return (map_function | target_column_pointer) + (pp.StringEnd() | pp.LineEnd())
+    # transforms are registered python functions, or a module path to one
+    transform_name = pp.Word(id_chars + ".:").set_name("transform_name")
+
+    transformed_column = (
+        target_column_pointer
+        + pp.Suppress(pp.Keyword("USING"))
+        + pp.DelimitedList(transform_name)
+    ).set_name("transformed_column")
+
+    def transformed_column_parse_action(toks: pp.ParseResults):
+        tc: TargetColumnPointer = toks[0]
+        tc.transforms = list(toks[1:])
+        return tc
+
+    transformed_column.add_parse_action(transformed_column_parse_action)
+
+    return (map_function | transformed_column | target_column_pointer) + (
+        pp.StringEnd() | pp.LineEnd()
+    )
 
 
 _source_column_function_parser: pp.ParserElement = (
@@ -972,6 +1363,200 @@ def parse_source_column_function(s: str):
     return _source_column_function_parser.parse_string(s)[0]
 
 
+_ddl_token = re.compile(r'"(?:[^"]|"")*"|\'(?:[^\']|\'\')*\'|[(),]|[^\s(),"\']+')
+
+_column_constraint_keywords = {
+    "NOT": "NOT NULL",
+    "NULL": "NULL",
+    "CHECK": "CHECK",
+    "DEFAULT": "DEFAULT",
+    "GENERATED": "GENERATED",
+    "COLLATE": "COLLATE",
+    "UNIQUE": "UNIQUE",
+    "PRIMARY": "PRIMARY KEY",
+    "REFERENCES": "REFERENCES",
+}
+
+
+def _tokenize_ddl(s: str) -> list[str]:
+    """Splits DDL into words, quoted names and strings, and balanced parenthesized groups"""
+    tokens = []
+    depth = 0
+    for token in _ddl_token.findall(s):
+        if depth > 0:
+            tokens[-1] += (
+                token if tokens[-1][-1] in "(." or token in ").," else " " + token
+            )
+        else:
+            tokens.append(token)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+    if depth != 0:
+        raise ValueError(f"unbalanced parentheses in [{s}]")
+    # attach groups to the word before them, such as varchar (10) or customers (id)
+    joined = []
+    for token in tokens:
+        if (
+            token.startswith("(")
+            and joined
+            and joined[-1].upper() not in _column_constraint_keywords
+        ):
+            joined[-1] += token
+        else:
+            joined.append(token)
+    return joined
+
+
+class ColumnConstraint:
+    """A constraint clause of a target column definition, such as ``PRIMARY KEY`` or ``REFERENCES customers(id)``"""
+
+    deferrable_kinds = ("PRIMARY KEY", "UNIQUE", "REFERENCES")
+    """
+    Constraints that are backed by an index or a lookup, and can be added after a bulk load.
+    """
+
+    def __init__(self, kind: str, sql: str, name: str | None = None) -> None:
+        self.kind = kind
+        self.sql = sql
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_sql_str()!r})"
+
+    def __eq__(self, __value: object) -> bool:
+        if not isinstance(__value, ColumnConstraint):
+            return False
+        return (self.kind, self.sql, self.name) == (
+            __value.kind,
+            __value.sql,
+            __value.name,
+        )
+
+    @property
+    def deferrable(self) -> bool:
+        return self.kind in self.deferrable_kinds
+
+    @property
+    def references(self) -> TargetTablePointer | None:
+        """Table referenced by a ``REFERENCES`` constraint"""
+        if self.kind != "REFERENCES":
+            return None
+        table = _tokenize_ddl(self.sql)[1].split("(", 1)[0]
+        try:
+            return parse_target_table_pointer(table)
+        except pp.ParseException:
+            return None
+
+    def to_sql_str(self) -> str:
+        if self.name:
+            return f"CONSTRAINT {self.name} {self.sql}"
+        return self.sql
+
+    def to_table_constraint_sql_str(self, column_name: str) -> str:
+        """Gets the constraint as a table constraint, which can be used with ``ALTER TABLE ... ADD``
+
+        :param column_name: name of the constrained column
+        :type column_name: str
+        :return: table constraint
+        :rtype: str
+        """
+        if self.kind == "REFERENCES":
+            sql = f"FOREIGN KEY ({column_name}) {self.sql}"
+        elif self.kind in ("PRIMARY KEY", "UNIQUE"):
+            sql = f"{self.sql} ({column_name})"
+        else:
+            raise ValueError(f"{self.kind} cannot be a table constraint")
+        if self.name:
+            return f"CONSTRAINT {self.name} {sql}"
+        return sql
+
+
+class ColumnDefinition:
+    """A target column definition split into its data type and constraint clauses"""
+
+    def __init__(self, data_type: str, constraints: list[ColumnConstraint]) -> None:
+        self.data_type = data_type
+        self.constraints = constraints
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_sql_str()!r})"
+
+    @property
+    def deferred_constraints(self) -> list[ColumnConstraint]:
+        return [c for c in self.constraints if c.deferrable]
+
+    def to_sql_str(self, deferred: bool = True) -> str:
+        """Gets the column definition
+
+        :param deferred: include constraints that can be added after a bulk load, defaults to True
+        :type deferred: bool, optional
+        :return: column definition
+        :rtype: str
+        """
+        return " ".join(
+            [self.data_type]
+            + [c.to_sql_str() for c in self.constraints if deferred or not c.deferrable]
+        )
+
+
+def parse_column_definition(s: str) -> ColumnDefinition:
+    """Parses a target column definition, such as ``int references customers(id)``
+
+    :param s: column definition
+    :type s: str
+    :raises ValueError: if the definition has no data type or a malformed constraint
+    :return: column definition
+    :rtype: ColumnDefinition
+    """
+    tokens = _tokenize_ddl(s)
+    upper = [t.upper() for t in tokens]
+
+    def is_constraint_start(i: int) -> bool:
+        if upper[i] == "CONSTRAINT":
+            return True
+        if upper[i] == "NOT":
+            return i + 1 < len(upper) and upper[i + 1] == "NULL"
+        return upper[i] in _column_constraint_keywords
+
+    i = 0
+    while i < len(tokens) and not is_constraint_start(i):
+        i += 1
+    if i == 0:
+        raise ValueError(f"missing data type in column definition [{s}]")
+    data_type = " ".join(tokens[:i])
+
+    constraints = []
+    while i < len(tokens):
+        name = None
+        if upper[i] == "CONSTRAINT":
+            if i + 2 >= len(tokens):
+                raise ValueError(f"incomplete constraint in column definition [{s}]")
+            name = tokens[i + 1]
+            i += 2
+        if not is_constraint_start(i) or upper[i] == "CONSTRAINT":
+            raise ValueError(f"unexpected [{tokens[i]}] in column definition [{s}]")
+        kind = _column_constraint_keywords[upper[i]]
+        start = i
+        i += 2 if kind in ("NOT NULL", "PRIMARY KEY") else 1
+        while i < len(tokens) and not is_constraint_start(i):
+            if upper[i] == "ON" and i + 1 < len(tokens):
+                # referential actions, such as ON DELETE SET NULL
+                i += 2
+                if i < len(tokens) and upper[i] in ("SET", "NO"):
+                    i += 1
+            elif (
+                upper[i] == "NOT"
+                and i + 1 < len(tokens)
+                and upper[i + 1] == "DEFERRABLE"
+            ):
+                i += 1
+            i += 1
+        constraints.append(ColumnConstraint(kind, " ".join(tokens[start:i]), name))
+    return ColumnDefinition(data_type, constraints)
+
+
 def parse_config(config_text: str) -> Config:
     config_text = _remove_comments(config_text)
 
@@ -991,34 +1576,43 @@ def parse_config_file(config_file_path: str) -> Config:
     return parsed_config
 
 
-def create_dumper(config: Config):
-    import inspect
+class _SerialDumper(yaml.Dumper):
+    """Dumper that represents every ``Serializeable`` through ``__serial_repr__``"""
 
-    class CustomDumper(yaml.Dumper):
-        pass
+    def __init__(self, *args, serial_context: object = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.serial_context = serial_context
 
-    serializeable_classes = inspect.getmembers(
-        inspect.getmodule(Serializeable),
-        lambda member: inspect.isclass(member) and issubclass(member, Serializeable),
-    )
-    for _, c in serializeable_classes:
-        if issubclass(c, Serializeable):
-            CustomDumper.add_representer(
-                c, lambda dumper, data: data.__serial_repr__(dumper, config)
-            )
-    return CustomDumper
+
+_SerialDumper.add_multi_representer(
+    Serializeable,
+    lambda dumper, data: data.__serial_repr__(dumper, dumper.serial_context),
+)
 
 
-def write_config(config: Config) -> str:
-    """Writes config to a string
+def create_dumper(config: Config):
+    """Creates a YAML dumper factory for a config.
+    The dumper class is only built once, the config is bound as the serialization context.
+
+    :param config: config used as the serialization context
+    :type config: Config
+    :return: callable that can be passed as ``Dumper`` to ``yaml.dump``
+    """
+    return functools.partial(_SerialDumper, serial_context=config)
+
+
+def write_config(config: Config, stream=None) -> str | None:
+    """Writes config to a string, or to a stream if one is given
 
     :param config: config
     :type config: Config
-    :return: the config as a string
-    :rtype: str
+    :param stream: text stream to write to instead of building a string, defaults to None
+    :return: the config as a string, or None if written to a stream
+    :rtype: str | None
     """
     config_str = yaml.dump(
         config,
+        stream,
         default_flow_style=False,
         width=float("inf"),
         sort_keys=False,
@@ -1027,18 +1621,35 @@ def write_config(config: Config) -> str:
     return config_str
 
 
+def write_config_json(
+    config: Config, stream=None, indent: int | None = None
+) -> str | None:
+    """Writes config as JSON directly from the config objects, without a YAML round trip
+
+    :param config: config
+    :type config: Config
+    :param stream: text stream to write to instead of building a string, defaults to None
+    :param indent: JSON indent, defaults to None
+    :type indent: int | None, optional
+    :return: the config as a JSON string, or None if written to a stream
+    :rtype: str | None
+    """
+    if stream is None:
+        return config.to_json(config, indent=indent)
+    json.dump(config.to_dict(config), stream, indent=indent)
+    return None
+
+
 def write_config_file(config: Config, config_file_path: str):
-    """Writes config to a file
+    """Writes config to a file, streaming the output instead of building a string
 
     :param config: config
     :type config: Config
     :param config_file_path: file path
     :type config_file_path: str
     """
-    config_str = write_config(config)
-
     with open(config_file_path, "w") as file:
-        file.write(config_str)
+        write_config(config, file)
 
 
 def find_config_path() -> str | None:
@@ -1094,8 +1705,6 @@ def populate_arg_parser(
 
 
 def _main():
-    import json
-
     logger = logging.getLogger("config")
 
     arg_parser = argparse.ArgumentParser(prog="accex")
@@ -1108,23 +1717,19 @@ def _main():
         sys.exit(1)
     config = parse_config_file(config_path)
     config.validate()
-    out = ""
-    if args.json:
-        if args.json_format:
-            out = json.dumps(
-                yaml.load(write_config(config), Loader=yaml.Loader), indent=2
-            )
-            # out = json.dumps(config, indent=4)
-        else:
-            out = json.dumps(yaml.load(write_config(config), Loader=yaml.Loader))
-    else:
-        out = write_config(config)
 
+    indent = 2 if args.json_format else None
     if args.out_file:
         with open(args.out_file, "w") as file:
-            file.write(out)
+            if args.json:
+                write_config_json(config, file, indent)
+            else:
+                write_config(config, file)
     else:
-        print(out)
+        if args.json:
+            print(write_config_json(config, indent=indent))
+        else:
+            print(write_config(config))
 
     if args.validate:
         config.validate()
@@ -6,10 +6,15 @@ from .core import (
     close_connections,
     get_table_name_dict,
     get_column_name_dict,
+    get_src_catalog,
+    get_tgt_catalog,
+    get_metrics,
     create_conn_str,
     transfer_table,
     transfer
 )
+from .catalog import CatalogCache
+from .metrics import Metrics
 __all__ = [
     "open_src_connection",
     "open_tgt_connection",
@@ -18,6 +23,11 @@ __all__ = [
     "close_connections",
     "get_table_name_dict",
     "get_column_name_dict",
+    "get_src_catalog",
+    "get_tgt_catalog",
+    "CatalogCache",
+    "get_metrics",
+    "Metrics",
     "create_conn_str",
     "transfer_table",
     "transfer"
@@ -0,0 +1,289 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+import aioodbc
+from ..config import core as ac
+from .recovery import RetryPolicy, is_data_error, is_transient_error
+
+
+class CommitPolicy:
+    """Decides when inserted chunks are committed.
+    A commit happens after ``chunks`` chunks or ``seconds`` seconds, whichever comes first.
+    When neither is set, every chunk is committed on its own through autocommit.
+    """
+
+    def __init__(self, chunks: int = 0, seconds: float = 0) -> None:
+        self.chunks = chunks
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(chunks={self.chunks}, seconds={self.seconds})"
+        )
+
+    @classmethod
+    def from_config(
+        cls, config: ac.Config, src_table: ac.SourceTableBlock | None = None
+    ) -> "CommitPolicy":
+        """Creates the policy for a source table, the table's settings override the config's
+
+        :param config: config
+        :type config: ac.Config
+        :param src_table: source table, defaults to None
+        :type src_table: ac.SourceTableBlock | None, optional
+        :return: policy
+        :rtype: CommitPolicy
+        """
+        chunks = config.commit_every_chunks
+        seconds = config.commit_every_seconds
+        if src_table is not None:
+            if src_table.commit_every_chunks is not None:
+                chunks = src_table.commit_every_chunks
+            if src_table.commit_every_seconds is not None:
+                seconds = src_table.commit_every_seconds
+        return cls(chunks, seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return self.chunks > 0 or self.seconds > 0
+
+    def is_due(self, pending_chunks: int, elapsed: float) -> bool:
+        """Checks if pending chunks should be committed
+
+        :param pending_chunks: amount of uncommitted chunks
+        :type pending_chunks: int
+        :param elapsed: seconds since the last commit
+        :type elapsed: float
+        :return: whether to commit
+        :rtype: bool
+        """
+        if pending_chunks == 0:
+            return False
+        if self.chunks > 0 and pending_chunks >= self.chunks:
+            return True
+        return self.seconds > 0 and elapsed >= self.seconds
+
+
+class CommitBatcher:
+    """Groups insert chunks into transactions on a target connection.
+
+    Each chunk runs inside a savepoint, so a failing chunk is rolled back on its own
+    and the chunks before it in the same transaction are still committed.
+
+    With ``reconnect`` set, a chunk that fails with a transient error is retried on a new connection,
+    after the uncommitted chunks of the transaction are inserted again.
+    """
+
+    SAVEPOINT_NAME = "accex_chunk"
+
+    def __init__(
+        self,
+        conn: aioodbc.Connection,
+        cur: aioodbc.Cursor,
+        policy: CommitPolicy,
+        on_commit: Callable[[int], None] | None = None,
+        reconnect: (
+            Callable[[], Awaitable[tuple[aioodbc.Connection, aioodbc.Cursor]]] | None
+        ) = None,
+        retry_policy: RetryPolicy | None = None,
+        on_execute: Callable[[str, list, float], Any] | None = None,
+    ) -> None:
+        """Constructs a new batcher
+
+        :param conn: target connection
+        :type conn: aioodbc.Connection
+        :param cur: cursor of the target connection
+        :type cur: aioodbc.Cursor
+        :param policy: commit policy
+        :type policy: CommitPolicy
+        :param on_commit: called with the total committed row count after each commit, defaults to None
+        :type on_commit: Callable[[int], None] | None, optional
+        :param reconnect: opens a new target connection and returns it with its cursor, defaults to None
+        :type reconnect: Callable[[], Awaitable[tuple[aioodbc.Connection, aioodbc.Cursor]]] | None, optional
+        :param retry_policy: retries of chunks that failed with a transient error, defaults to None
+        :type retry_policy: RetryPolicy | None, optional
+        :param on_execute: called with each executed statement, its parameters and the seconds it took, defaults to None
+        :type on_execute: Callable[[str, list, float], Any] | None, optional
+        """
+        self.conn = conn
+        self.cur = cur
+        self.policy = policy
+        self.on_commit = on_commit
+        self.reconnect = reconnect
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.on_execute = on_execute
+        self.committed_rows = 0
+        self.reconnects = 0
+        self.pending_rows = 0
+        self.pending_chunks = 0
+        self._last_commit_time = time.monotonic()
+        self._active = False
+        # statements of the uncommitted chunks, inserted again after reconnecting
+        self._pending_statements: list[list[tuple[str, list]]] = []
+        self._logger = logging.getLogger("process.batching")
+
+    async def begin(self) -> None:
+        if self.policy.enabled and not self._active:
+            self.conn.autocommit = False
+            self._active = True
+            self._last_commit_time = time.monotonic()
+
+    async def execute_chunk(self, sql: str, params: list, row_count: int) -> None:
+        """Executes the insert of one chunk, committing if the policy is due
+
+        :param sql: insert statement
+        :type sql: str
+        :param params: statement parameters
+        :type params: list
+        :param row_count: amount of rows in the chunk
+        :type row_count: int
+        """
+        await self.execute_chunk_statements([(sql, params)], row_count)
+
+    async def execute_chunk_statements(
+        self, statements: list[tuple[str, list]], row_count: int
+    ) -> None:
+        """Executes the statements that insert one chunk as a unit, committing if the policy is due
+
+        :param statements: statements and their parameters
+        :type statements: list[tuple[str, list]]
+        :param row_count: amount of rows in the chunk
+        :type row_count: int
+        """
+        attempt = 0
+        while True:
+            try:
+                if attempt > 0:
+                    await self._reconnect()
+                await self._execute_chunk_statements(statements, row_count)
+                return
+            except Exception as e:
+                if (
+                    self.reconnect is None
+                    or not is_transient_error(e)
+                    or attempt >= self.retry_policy.retries
+                ):
+                    raise
+                attempt += 1
+                delay = self.retry_policy.get_delay(attempt)
+                self._logger.warning(
+                    f"chunk failed with a transient error, retrying in {delay:.1f}s "
+                    f"({attempt}/{self.retry_policy.retries}) - {e}"
+                )
+                await asyncio.sleep(delay)
+
+    async def execute_chunk_rows(
+        self,
+        rows: list[list],
+        get_statements: Callable[[list[list]], list[tuple[str, list]]],
+        on_rejected: Callable[[list, Exception], Any] | None = None,
+    ) -> int:
+        """Executes the insert of one chunk. If the chunk fails with a data error and ``on_rejected`` is set,
+        the chunk is split in halves which are inserted on their own, until the rows the target database rejects
+        are found. Rejected rows are passed to ``on_rejected`` and skipped.
+
+        :param rows: chunk rows
+        :type rows: list[list]
+        :param get_statements: gets the statements that insert rows
+        :type get_statements: Callable[[list[list]], list[tuple[str, list]]]
+        :param on_rejected: called with each rejected row and its error, defaults to None
+        :type on_rejected: Callable[[list, Exception], Any] | None, optional
+        :return: amount of inserted rows
+        :rtype: int
+        """
+        try:
+            await self.execute_chunk_statements(get_statements(rows), len(rows))
+            return len(rows)
+        except Exception as e:
+            if on_rejected is None or not is_data_error(e):
+                raise
+            if len(rows) == 1:
+                on_rejected(rows[0], e)
+                return 0
+            self._logger.debug("splitting chunk of %d rows - %s", len(rows), e)
+        middle = len(rows) // 2
+        inserted = await self.execute_chunk_rows(
+            rows[:middle], get_statements, on_rejected
+        )
+        return inserted + await self.execute_chunk_rows(
+            rows[middle:], get_statements, on_rejected
+        )
+
+    async def _execute_chunk_statements(
+        self, statements: list[tuple[str, list]], row_count: int
+    ) -> None:
+        if not self._active:
+            await self._execute(statements)
+            self.committed_rows += row_count
+            if self.on_commit is not None:
+                self.on_commit(self.committed_rows)
+            return
+
+        await self.cur.execute(f"SAVEPOINT {self.SAVEPOINT_NAME}")
+        try:
+            await self._execute(statements)
+        except Exception as e:
+            if is_transient_error(e):
+                # the transaction is lost with the connection
+                raise
+            await self.cur.execute(f"ROLLBACK TO SAVEPOINT {self.SAVEPOINT_NAME}")
+            # keep the chunks that succeeded before this one
+            await self.commit()
+            raise
+        await self.cur.execute(f"RELEASE SAVEPOINT {self.SAVEPOINT_NAME}")
+        if self.reconnect is not None:
+            self._pending_statements.append(statements)
+        self.pending_rows += row_count
+        self.pending_chunks += 1
+        if self.policy.is_due(
+            self.pending_chunks, time.monotonic() - self._last_commit_time
+        ):
+            await self.commit()
+
+    async def _execute(self, statements: list[tuple[str, list]]) -> None:
+        for sql, params in statements:
+            start_time = time.perf_counter()
+            if params:
+                await self.cur.execute(sql, params)
+            else:
+                await self.cur.execute(sql)
+            if self.on_execute is not None:
+                self.on_execute(sql, params, time.perf_counter() - start_time)
+
+    async def _reconnect(self) -> None:
+        self.conn, self.cur = await self.reconnect()
+        self.reconnects += 1
+        if not self._active:
+            return
+        self.conn.autocommit = False
+        for statements in self._pending_statements:
+            await self._execute(statements)
+        self._logger.info(
+            f"reconnected and inserted {self.pending_chunks} uncommitted chunks again"
+        )
+
+    async def commit(self) -> None:
+        if not self._active:
+            return
+        await self.conn.commit()
+        self._pending_statements = []
+        self._logger.debug(
+            "committed %d chunks, %d rows", self.pending_chunks, self.pending_rows
+        )
+        self.committed_rows += self.pending_rows
+        self.pending_rows = 0
+        self.pending_chunks = 0
+        self._last_commit_time = time.monotonic()
+        if self.on_commit is not None:
+            self.on_commit(self.committed_rows)
+
+    async def close(self) -> None:
+        """Commits pending chunks and restores autocommit"""
+        if not self._active:
+            return
+        try:
+            await self.commit()
+        finally:
+            self.conn.autocommit = True
+            self._active = False
@@ -0,0 +1,165 @@
+import asyncio
+import aioodbc
+import pyodbc
+
+_SQL_TABLE_STAT = 0
+"""
+``SQLStatistics`` row type of the row holding table statistics instead of an index column.
+"""
+
+
+class CatalogCache:
+    """Catalog metadata of one connection.
+    Tables, columns, primary keys, unique indexes and row count estimates are queried once, when first needed,
+    and kept until invalidated by DDL issued on the connection.
+    """
+
+    def __init__(self, cur: aioodbc.Cursor) -> None:
+        """Constructs a new catalog cache
+
+        :param cur: cursor used for catalog queries
+        :type cur: aioodbc.Cursor
+        """
+        self.cur = cur
+        self._tables: dict[str, dict] = {}
+        self._columns: dict[tuple, dict] = {}
+        self._primary_keys: dict[tuple, list[str]] = {}
+        self._statistics: dict[tuple, list] = {}
+        # catalog queries share the cursor, so they must not interleave
+        self._lock = asyncio.Lock()
+
+    async def get_tables(self, table_type: str = "TABLE") -> dict:
+        """Gets the tables of the connection
+
+        :param table_type: type of table to list, defaults to "TABLE"
+        :type table_type: str, optional
+        :return: catalog rows by table name
+        :rtype: dict
+        """
+        async with self._lock:
+            if table_type not in self._tables:
+                await self.cur.tables(tableType=table_type)
+                self._tables[table_type] = dict(
+                    (row.table_name, row) for row in await self.cur.fetchall()
+                )
+            return self._tables[table_type]
+
+    async def has_table(self, table: str, table_type: str = "TABLE") -> bool:
+        return table in await self.get_tables(table_type)
+
+    async def get_columns(self, table: str, schema: str | None = None) -> dict:
+        """Gets the columns of a table, including their ``data_type`` and ``type_name``
+
+        :param table: table name
+        :type table: str
+        :param schema: schema name, defaults to None
+        :type schema: str | None, optional
+        :return: catalog rows by column name
+        :rtype: dict
+        """
+        key = (schema, table)
+        async with self._lock:
+            if key not in self._columns:
+                await self.cur.columns(table=table, schema=schema)
+                self._columns[key] = dict(
+                    (row.column_name, row) for row in await self.cur.fetchall()
+                )
+            return self._columns[key]
+
+    async def get_primary_keys(
+        self, table: str, schema: str | None = None
+    ) -> list[str]:
+        """Gets the primary key columns of a table
+
+        :param table: table name
+        :type table: str
+        :param schema: schema name, defaults to None
+        :type schema: str | None, optional
+        :return: column names in key order, empty if the table has no primary key or the driver does not report it
+        :rtype: list[str]
+        """
+        key = (schema, table)
+        async with self._lock:
+            if key not in self._primary_keys:
+                try:
+                    await self.cur.primaryKeys(table=table, schema=schema)
+                    rows = sorted(await self.cur.fetchall(), key=lambda r: r.key_seq)
+                    self._primary_keys[key] = [row.column_name for row in rows]
+                except pyodbc.Error:
+                    self._primary_keys[key] = []
+            return self._primary_keys[key]
+
+    async def _get_statistics(self, table: str, schema: str | None = None) -> list:
+        # one statistics query holds both the table row count and the unique indexes
+        key = (schema, table)
+        async with self._lock:
+            if key not in self._statistics:
+                try:
+                    await self.cur.statistics(
+                        table=table, schema=schema, unique=True, quick=True
+                    )
+                    self._statistics[key] = await self.cur.fetchall()
+                except pyodbc.Error:
+                    self._statistics[key] = []
+            return self._statistics[key]
+
+    async def get_row_count_estimate(
+        self, table: str, schema: str | None = None
+    ) -> int | None:
+        """Gets the row count the driver reports in the table statistics, without counting the rows
+
+        :param table: table name
+        :type table: str
+        :param schema: schema name, defaults to None
+        :type schema: str | None, optional
+        :return: estimated row count, or None if the driver does not report it
+        :rtype: int | None
+        """
+        for row in await self._get_statistics(table, schema):
+            if row.type == _SQL_TABLE_STAT:
+                return row.cardinality
+        return None
+
+    async def get_unique_indexes(
+        self, table: str, schema: str | None = None
+    ) -> dict[str, list[str]]:
+        """Gets the unique indexes of a table
+
+        :param table: table name
+        :type table: str
+        :param schema: schema name, defaults to None
+        :type schema: str | None, optional
+        :return: column names in index order by index name
+        :rtype: dict[str, list[str]]
+        """
+        indexes: dict[str, list] = {}
+        for row in await self._get_statistics(table, schema):
+            if row.type == _SQL_TABLE_STAT or row.index_name is None:
+                continue
+            indexes.setdefault(row.index_name, []).append(
+                (row.ordinal_position, row.column_name)
+            )
+        return dict(
+            (name, [column for _, column in sorted(columns)])
+            for name, columns in indexes.items()
+        )
+
+    def invalidate(self, table: str | None = None, schema: str | None = None) -> None:
+        """Forgets cached metadata after DDL.
+        The table listing is always forgotten, since tables may have been created or dropped.
+
+        :param table: table whose metadata changed, defaults to None for all tables
+        :type table: str | None, optional
+        :param schema: schema name, defaults to None
+        :type schema: str | None, optional
+        """
+        self._tables.clear()
+        if table is None:
+            self._columns.clear()
+            self._primary_keys.clear()
+            self._statistics.clear()
+            return
+        key = (schema, table)
+        self._columns.pop(key, None)
+        self._primary_keys.pop(key, None)
+        self._statistics.pop(key, None)
@@ -0,0 +1,289 @@
+import datetime
+import decimal
+from typing import Callable
+import pyodbc
+from ..config import core as ac
+
+COERCION_KINDS = {
+    "int": (
+        "smallint",
+        "integer",
+        "int",
+        "int2",
+        "int4",
+        "int8",
+        "bigint",
+        "serial",
+        "smallserial",
+        "bigserial",
+        "serial2",
+        "serial4",
+        "serial8",
+    ),
+    "float": ("real", "float", "float4", "float8", "double precision"),
+    "numeric": ("numeric", "decimal", "money"),
+    "text": (
+        "text",
+        "varchar",
+        "character varying",
+        "char",
+        "character",
+        "bpchar",
+        "citext",
+    ),
+    "date": ("date",),
+    "time": ("time", "time without time zone", "time with time zone", "timetz"),
+    "timestamp": (
+        "timestamp",
+        "timestamp without time zone",
+        "timestamp with time zone",
+        "timestamptz",
+    ),
+    "bool": ("boolean", "bool"),
+}
+"""
+Maps a coercion kind to the target data types it handles.
+"""
+
+_DATA_TYPE_KINDS = dict(
+    (data_type, kind)
+    for kind, data_types in COERCION_KINDS.items()
+    for data_type in data_types
+)
+
+
+def get_coercion_kind(data_type: str) -> str | None:
+    """Gets the coercion kind of a target data type, ignoring its length, precision and array brackets
+
+    :param data_type: target data type, such as ``numeric(10, 2)``
+    :type data_type: str
+    :return: kind, or None if the type is not handled
+    :rtype: str | None
+    """
+    data_type = " ".join(data_type.lower().split("(", 1)[0].split())
+    if data_type.endswith("[]"):
+        return None
+    kind = _DATA_TYPE_KINDS.get(data_type)
+    if kind is None and data_type.startswith("timestamp"):
+        return "timestamp"
+    if kind is None and data_type.startswith("time"):
+        return "time"
+    return kind
+
+
+def _to_int(v):
+    # fractional values are left for the database to round
+    if isinstance(v, (decimal.Decimal, float)):
+        try:
+            if v == int(v):
+                return int(v)
+        except (ValueError, OverflowError):
+            pass
+    return v
+
+
+def _to_float(v):
+    if isinstance(v, (decimal.Decimal, int)) and not isinstance(v, bool):
+        return float(v)
+    return v
+
+
+def _to_text(v):
+    if isinstance(v, str):
+        return v
+    if isinstance(v, datetime.datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, (datetime.date, datetime.time)):
+        return v.isoformat()
+    if isinstance(v, (decimal.Decimal, int, float)) and not isinstance(v, bool):
+        return str(v)
+    return v
+
+
+def _to_date(v):
+    if isinstance(v, datetime.datetime):
+        return v.date()
+    return v
+
+
+def _to_time(v):
+    if isinstance(v, datetime.datetime):
+        return v.time()
+    return v
+
+
+def _to_bool(v):
+    if isinstance(v, int):
+        return bool(v)
+    return v
+
+
+_KIND_CONVERTERS: dict[str, Callable] = {
+    "int": _to_int,
+    "float": _to_float,
+    "text": _to_text,
+    "date": _to_date,
+    "time": _to_time,
+    "bool": _to_bool,
+}
+
+
+def create_column_coercer(
+    kind: str | None, trim: bool = False, empty_as_null: bool = False
+) -> Callable[[list], list] | None:
+    """Creates a function that coerces all values of one column of a chunk
+
+    :param kind: coercion kind of the target column
+    :type kind: str | None
+    :param trim: strip surrounding whitespace from strings, defaults to False
+    :type trim: bool, optional
+    :param empty_as_null: convert empty strings to NULL, defaults to False
+    :type empty_as_null: bool, optional
+    :return: coercer, or None if the column does not need to be coerced
+    :rtype: Callable[[list], list] | None
+    """
+    convert = _KIND_CONVERTERS.get(kind)
+    if convert is None and not trim and not empty_as_null:
+        return None
+
+    def coerce(values: list) -> list:
+        # a column from one source has one type, so the converter is picked once from a sample
+        sample = next((v for v in values if v is not None), None)
+        if sample is None:
+            return values
+        if isinstance(sample, str):
+            if trim:
+                values = [None if v is None else v.strip() for v in values]
+            if empty_as_null:
+                values = [None if v == "" else v for v in values]
+            return values
+        if convert is None or convert(sample) is sample:
+            return values
+        return [None if v is None else convert(v) for v in values]
+
+    return coerce
+
+
+class ChunkCoercer:
+    """Coerces the columns of inserted chunks to cheaper representations based on the target column types"""
+
+    def __init__(self, coercers: list[tuple[int, Callable[[list], list]]]) -> None:
+        self.coercers = coercers
+
+    def __bool__(self) -> bool:
+        return len(self.coercers) > 0
+
+    @classmethod
+    def from_tables(
+        cls,
+        src_table: ac.SourceTableBlock,
+        tgt_table: ac.TargetTableBlock,
+        trim: bool = False,
+        empty_as_null: bool = False,
+    ) -> "ChunkCoercer":
+        """Creates the coercer for a source table.
+        Columns filled by map functions are left alone, their values come from the target.
+
+        :param src_table: source table
+        :type src_table: ac.SourceTableBlock
+        :param tgt_table: target table
+        :type tgt_table: ac.TargetTableBlock
+        :param trim: strip surrounding whitespace from strings, defaults to False
+        :type trim: bool, optional
+        :param empty_as_null: convert empty strings to NULL, defaults to False
+        :type empty_as_null: bool, optional
+        :return: coercer
+        :rtype: ChunkCoercer
+        """
+        coercers = []
+        for col_index, kind in enumerate(get_column_kinds(src_table, tgt_table)):
+            if kind is False:
+                continue
+            coercer = create_column_coercer(kind, trim, empty_as_null)
+            if coercer is not None:
+                coercers.append((col_index, coercer))
+        return cls(coercers)
+
+    def apply(self, rows: list[list]) -> None:
+        """Coerces a chunk of rows in place
+
+        :param rows: rows
+        :type rows: list[list]
+        """
+        for col_index, coerce in self.coercers:
+            values = [row[col_index] for row in rows]
+            coerced = coerce(values)
+            if coerced is values:
+                continue
+            for row, value in zip(rows, coerced):
+                row[col_index] = value
+
+
+def get_column_kinds(
+    src_table: ac.SourceTableBlock, tgt_table: ac.TargetTableBlock
+) -> list[str | None | bool]:
+    """Gets the coercion kind of each source column from its target column.
+    Columns filled by map functions are ``False``.
+
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :return: kinds in source column order
+    :rtype: list[str | None | bool]
+    """
+    definitions = tgt_table.columns.definitions
+    kinds = []
+    for v in src_table.columns.values():
+        if isinstance(v, ac.TargetColumnPointer) and v.column_name in definitions:
+            kinds.append(get_coercion_kind(definitions[v.column_name].data_type))
+        else:
+            kinds.append(False)
+    return kinds
+
+
+_DECIMAL_SQL_TYPES = (pyodbc.SQL_DECIMAL, pyodbc.SQL_NUMERIC)
+
+
+def _decimal_text_to_float(v: bytes | str | None) -> float | None:
+    return None if v is None else float(v)
+
+
+def _decimal_text_to_str(v: bytes | str | None) -> str | None:
+    if v is None:
+        return None
+    return v.decode() if isinstance(v, bytes) else v
+
+
+_DECIMAL_OUTPUT_CONVERTERS = {
+    "float": _decimal_text_to_float,
+    "text": _decimal_text_to_str,
+}
+
+
+def get_output_converters(
+    column_kinds: list[str | None | bool], column_sql_types: list[int | None]
+) -> dict[int, Callable]:
+    """Gets output converters that read source decimals straight into their target representation,
+    skipping ``decimal.Decimal``. Converters apply to every column of a SQL type on a connection,
+    so one is only used when all columns of that type want the same representation.
+
+    :param column_kinds: coercion kind of each source column
+    :type column_kinds: list[str | None | bool]
+    :param column_sql_types: ODBC SQL type of each source column
+    :type column_sql_types: list[int | None]
+    :return: converters by SQL type
+    :rtype: dict[int, Callable]
+    """
+    converters = {}
+    for sql_type in _DECIMAL_SQL_TYPES:
+        kinds = set(
+            kind
+            for kind, column_sql_type in zip(column_kinds, column_sql_types)
+            if column_sql_type == sql_type
+        )
+        if len(kinds) == 1:
+            converter = _DECIMAL_OUTPUT_CONVERTERS.get(kinds.pop())
+            if converter is not None:
+                converters[sql_type] = converter
+    return converters
@@ -1,11 +1,42 @@
+import os
+import sys
 import argparse
 import time
 import asyncio
 import logging
+import functools
+import sqlite3
+import threading
 from functools import cmp_to_key
 import pyodbc
 import aioodbc
+import yaml
 from ..config import core as ac
+from . import staging
+from . import snapshot
+from .batching import CommitPolicy, CommitBatcher
+from .session import SessionProfile, get_session_profile, apply_session_profile
+from .encoding import ConnectionEncoding, EncodingError, parse_connection_encoding
+from .coercion import ChunkCoercer, get_column_kinds, get_output_converters
+from .catalog import CatalogCache
+from . import inspection
+from . import preflight
+from . import shadow
+from . import lookup
+from .lookup import JoinLookupPlan
+from .metrics import Metrics
+from .recovery import DeadLetterWriter, RetryPolicy
+from .prevalidation import ChunkValidator
+from .progress import ProgressTracker, ProgressRenderer
+from .logqueue import setup_queue_logging
+from .watchdog import LoopWatchdog
+from .slowlog import SLOW_LOG_THRESHOLD_DEFAULT, SlowLog
+from . import history
+from . import manifest
+from . import transforms
+from concurrent.futures import ProcessPoolExecutor
+from .. import access
+from .util import get_dsn_param
 
 
 class TransferError(Exception):
@@ -41,87 +72,241 @@ def get_max_param_count(driver_name: str) -> int:
     return MAX_PARAM_COUNTS.get(driver_name) or MAX_PARAM_COUNT_DEFAULT
 
 
-async def _conn_attributes(conn: pyodbc.Connection) -> None:
+async def _conn_attributes(
+    conn: pyodbc.Connection,
+    session_profile: SessionProfile | None = None,
+    connection_encoding: ConnectionEncoding | None = None,
+) -> None:
     """Applies settings to connection based on specific driver.
 
     :param conn: connection
     :type conn: pyodbc.Connection
+    :param session_profile: session profile to apply, defaults to None
+    :type session_profile: SessionProfile | None, optional
+    :param connection_encoding: text decoding and encoding settings, defaults to None
+    :type connection_encoding: ConnectionEncoding | None, optional
     """
-    pass
-    # postgres settings
-    # conn.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
-    # conn.setencoding(encoding='utf-8')
+    if connection_encoding is not None:
+        connection_encoding.apply(conn)
+    if session_profile is not None:
+        apply_session_profile(conn, session_profile)
 
 
 _src_conn_str: str = ""
 _src_conn: aioodbc.Connection | None = None
 _src_cur: aioodbc.Cursor | None = None
+_src_encoding: ConnectionEncoding | None = None
+_src_catalog: CatalogCache | None = None
 _tgt_conn_str: str = ""
 _tgt_conn: aioodbc.Connection | None = None
 _tgt_cur: aioodbc.Cursor | None = None
+_tgt_session_profile: SessionProfile | None = None
+_tgt_encoding: ConnectionEncoding | None = None
+_tgt_catalog: CatalogCache | None = None
 
 _transfer_context = {}
 
 
-def reset_transfer_context():
+def reset_transfer_context(config: ac.Config | None = None):
     global _transfer_context
-    _transfer_context = {"created_tables": {}}
+    _transfer_context = {
+        "created_tables": {},
+        "committed_rows": {},
+        "rejected_rows": {},
+        "snapshots": None,
+        "inspection": None,
+        "metrics": Metrics(),
+        "lookup_indexes": {},
+        "dead_letter": None,
+        "slow_log": None,
+        "run_history": None,
+        "progress": ProgressTracker(),
+    }
+    if config is not None and config.dead_letter_path:
+        _transfer_context["dead_letter"] = DeadLetterWriter(config.dead_letter_path)
+    if config is not None and config.slow_log_path:
+        _transfer_context["slow_log"] = SlowLog(
+            config.slow_log_path,
+            (
+                SLOW_LOG_THRESHOLD_DEFAULT
+                if config.slow_log_threshold is None
+                else config.slow_log_threshold
+            ),
+        )
+    if config is not None and config.source_snapshot:
+        _transfer_context["snapshots"] = snapshot.SnapshotManager(
+            config.snapshot_dir or snapshot.SNAPSHOT_DIR_DEFAULT
+        )
+    if config is not None and config.inspection_path:
+        try:
+            _transfer_context["inspection"] = inspection.SourceInspection.load(
+                config.inspection_path
+            )
+        except inspection.InspectionError as e:
+            logging.getLogger("process").warning(
+                "not using inspection snapshot - %s", e
+            )
     return _transfer_context
 
 
+def _get_transform_executor(config: ac.Config) -> ProcessPoolExecutor:
+    executor = _transfer_context.get("transform_executor")
+    if executor is None:
+        executor = ProcessPoolExecutor(config.transform_workers or None)
+        _transfer_context["transform_executor"] = executor
+    return executor
+
+
+def _shutdown_transform_executor() -> None:
+    executor = _transfer_context.pop("transform_executor", None)
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def get_column_transforms(
+    config: ac.Config, src_table: ac.SourceTableBlock
+) -> list[tuple[int, list[transforms.Transform]]]:
+    """Gets the transforms of each source column that uses ``USING``
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :raises ac.ValidationError: if a transform does not exist
+    :return: column index and transforms of each transformed column
+    :rtype: list[tuple[int, list[transforms.Transform]]]
+    """
+    try:
+        transforms.import_transform_modules(config.transform_modules)
+        return [
+            (col_index, [transforms.get_transform(name) for name in v.transforms])
+            for col_index, v in enumerate(src_table.columns.values())
+            if isinstance(v, ac.TargetColumnPointer) and v.transforms
+        ]
+    except transforms.TransformError as e:
+        raise ac.ValidationError(str(e))
+
+
 def get_transfer_context():
     global _transfer_context
     return _transfer_context
 
 
-async def open_src_connection(new_src_conn_str: str) -> aioodbc.Cursor:
+def get_metrics() -> Metrics:
+    """Gets the metrics of the current transfer
+
+    :return: metrics
+    :rtype: Metrics
+    """
+    metrics = _transfer_context.get("metrics")
+    if metrics is None:
+        metrics = _transfer_context["metrics"] = Metrics()
+    return metrics
+
+
+def get_progress_tracker() -> ProgressTracker:
+    """Gets the progress of the tables being transferred
+
+    :return: progress tracker
+    :rtype: ProgressTracker
+    """
+    tracker = _transfer_context.get("progress")
+    if tracker is None:
+        tracker = _transfer_context["progress"] = ProgressTracker()
+    return tracker
+
+
+async def open_src_connection(
+    new_src_conn_str: str, connection_encoding: ConnectionEncoding | None = None
+) -> aioodbc.Cursor:
     """Creates connection to source database using connection string.
     If the connection is the same as the previous connection, the connection is kept open.
 
     :param new_src_conn_str: source connection string
     :type new_src_conn_str: str
+    :param connection_encoding: text decoding and encoding settings, defaults to None
+    :type connection_encoding: ConnectionEncoding | None, optional
     :return: cursor to the source connection
     :rtype: aioodbc.Cursor
     """
     global _src_conn_str
     global _src_conn
     global _src_cur
+    global _src_encoding
+    global _src_catalog
 
     logger = logging.getLogger("process")
 
-    if _src_conn is None or new_src_conn_str != _src_conn_str:
+    if (
+        _src_conn is None
+        or new_src_conn_str != _src_conn_str
+        or connection_encoding != _src_encoding
+    ):
         _src_conn_str = new_src_conn_str
+        _src_encoding = connection_encoding
         await close_src_connection()
         logger.info(f'connecting to source via connection string "{_src_conn_str}"')
-        _src_conn = await aioodbc.connect(dsn=_src_conn_str)
+        _src_conn = await aioodbc.connect(
+            dsn=_src_conn_str,
+            after_created=functools.partial(
+                _conn_attributes, connection_encoding=connection_encoding
+            ),
+        )
         _src_cur = await _src_conn.cursor()
+        # catalog queries get their own cursor so they do not discard pending results
+        _src_catalog = CatalogCache(await _src_conn.cursor())
         logger.info("connected to source")
     return _src_cur
 
 
-async def open_tgt_connection(new_tgt_conn_str: str) -> aioodbc.Cursor:
+async def open_tgt_connection(
+    new_tgt_conn_str: str,
+    session_profile: SessionProfile | None = None,
+    connection_encoding: ConnectionEncoding | None = None,
+) -> aioodbc.Cursor:
     """Creates connection to target database using connection string.
     If the connection is the same as the previous connection, the connection is kept open.
 
     :param new_tgt_conn_str: target connection string
     :type new_tgt_conn_str: str
+    :param session_profile: session profile applied when the connection is created, defaults to None
+    :type session_profile: SessionProfile | None, optional
+    :param connection_encoding: text decoding and encoding settings, defaults to None
+    :type connection_encoding: ConnectionEncoding | None, optional
     :return: cursor to the target connection
     :rtype: aioodbc.Cursor
     """
     global _tgt_conn_str
     global _tgt_conn
     global _tgt_cur
+    global _tgt_session_profile
+    global _tgt_encoding
+    global _tgt_catalog
 
     logger = logging.getLogger("process")
 
-    if _tgt_conn is None or new_tgt_conn_str != _tgt_conn_str:
-        _tgt_conn_str = new_tgt_conn_str
+    if (
+        _tgt_conn is None
+        or new_tgt_conn_str != _tgt_conn_str
+        or session_profile is not _tgt_session_profile
+        or connection_encoding != _tgt_encoding
+    ):
         await close_tgt_connection()
+        _tgt_conn_str = new_tgt_conn_str
+        _tgt_session_profile = session_profile
+        _tgt_encoding = connection_encoding
         logger.info(f'connecting to target via connection string "{_tgt_conn_str}"')
         _tgt_conn = await aioodbc.connect(
-            dsn=_tgt_conn_str, after_created=_conn_attributes, autocommit=True
+            dsn=_tgt_conn_str,
+            after_created=functools.partial(
+                _conn_attributes,
+                session_profile=session_profile,
+                connection_encoding=connection_encoding,
+            ),
+            autocommit=True,
         )
         _tgt_cur = await _tgt_conn.cursor()
+        _tgt_catalog = CatalogCache(await _tgt_conn.cursor())
         logger.info("connected to target")
     return _tgt_cur
 
@@ -129,7 +314,11 @@ async def open_tgt_connection(new_tgt_conn_str: str) -> aioodbc.Cursor:
 async def close_src_connection():
     global _src_conn
     global _src_cur
+    global _src_catalog
 
+    if _src_catalog:
+        await _src_catalog.cur.close()
+    _src_catalog = None
     if _src_cur:
         await _src_cur.close()
     if _src_conn:
@@ -141,7 +330,22 @@ async def close_src_connection():
 async def close_tgt_connection():
     global _tgt_conn
     global _tgt_cur
-
+    global _tgt_session_profile
+    global _tgt_catalog
+
+    if _tgt_cur and _tgt_session_profile is not None:
+        # restore the session in case the driver pools the connection
+        try:
+            for statement in _tgt_session_profile.get_restore_statements():
+                await _tgt_cur.execute(statement)
+        except pyodbc.Error as e:
+            logging.getLogger("process").warning(
+                "failed to restore target session - %s", e
+            )
+    _tgt_session_profile = None
+    if _tgt_catalog:
+        await _tgt_catalog.cur.close()
+    _tgt_catalog = None
     if _tgt_cur:
         await _tgt_cur.close()
     if _tgt_conn:
@@ -150,6 +354,32 @@ async def close_tgt_connection():
     _tgt_conn = None
 
 
+async def reconnect_tgt_connection() -> tuple[aioodbc.Connection, aioodbc.Cursor]:
+    """Replaces the target connection with a new connection to the same database, after the connection failed
+
+    :return: new target connection and its cursor
+    :rtype: tuple[aioodbc.Connection, aioodbc.Cursor]
+    """
+    global _tgt_conn
+    global _tgt_cur
+    global _tgt_catalog
+
+    conn_str = _tgt_conn_str
+    session_profile = _tgt_session_profile
+    connection_encoding = _tgt_encoding
+    try:
+        await close_tgt_connection()
+    except Exception as e:
+        logging.getLogger("process").warning(
+            "failed to close target connection - %s", e
+        )
+        _tgt_conn = None
+        _tgt_cur = None
+        _tgt_catalog = None
+    await open_tgt_connection(conn_str, session_profile, connection_encoding)
+    return _tgt_conn, _tgt_cur
+
+
 async def close_connections():
     await asyncio.gather(close_src_connection(), close_tgt_connection())
 
@@ -166,6 +396,24 @@ async def get_column_name_dict(
     return dict([(row.column_name, row) for row in await cur.fetchall()])
 
 
+def get_src_catalog() -> CatalogCache | None:
+    """Gets the catalog cache of the open source connection
+
+    :return: catalog cache, or None if no source connection is open
+    :rtype: CatalogCache | None
+    """
+    return _src_catalog
+
+
+def get_tgt_catalog() -> CatalogCache | None:
+    """Gets the catalog cache of the open target connection
+
+    :return: catalog cache, or None if no target connection is open
+    :rtype: CatalogCache | None
+    """
+    return _tgt_catalog
+
+
 def create_conn_str(*args: list[dict]) -> str:
     params = {}
     for p in args:
@@ -200,16 +448,383 @@ def get_tgt_conn_str(
     )
 
 
+def get_src_dsn_params(config: ac.Config, src_table: ac.SourceTableBlock) -> dict:
+    return {
+        **config.get_source_dsn_params_with_catalog(
+            src_table.table_pointer.catalog_name
+        ),
+        **src_table.dsn_params,
+    }
+
+
+def get_tgt_dsn_params(config: ac.Config, tgt_table: ac.TargetTableBlock) -> dict:
+    return {**config.target_dsn_params, **tgt_table.dsn_params}
+
+
+def _parse_connection_encoding(value: str | dict | None) -> ConnectionEncoding | None:
+    try:
+        return parse_connection_encoding(value)
+    except EncodingError as e:
+        raise ac.ValidationError(str(e))
+
+
+def get_src_encoding(
+    config: ac.Config, src_table: ac.SourceTableBlock
+) -> ConnectionEncoding | None:
+    if src_table.encoding is not None:
+        return _parse_connection_encoding(src_table.encoding)
+    return _parse_connection_encoding(config.source_encoding)
+
+
+def get_tgt_encoding(
+    config: ac.Config, tgt_table: ac.TargetTableBlock
+) -> ConnectionEncoding | None:
+    if tgt_table.encoding is not None:
+        return _parse_connection_encoding(tgt_table.encoding)
+    return _parse_connection_encoding(config.target_encoding)
+
+
+def get_tgt_session_profile(
+    config: ac.Config, tgt_dsn_params: dict
+) -> SessionProfile | None:
+    return get_session_profile(
+        get_dsn_param(tgt_dsn_params, "driver"), config.target_session_profile
+    )
+
+
+async def _snapshot_src_dsn_params(dsn_params: dict) -> dict:
+    snapshots: snapshot.SnapshotManager | None = _transfer_context.get("snapshots")
+    if snapshots is None:
+        return dsn_params
+    return await snapshots.apply(dsn_params)
+
+
+async def _fetch_src_chunks(
+    chunk_size: int, src_table_columns: list[str], src_table_name: str
+):
+    global _src_cur
+
+    await _src_cur.execute(
+        f'SELECT {",".join(c for c in src_table_columns)} FROM {src_table_name}'
+    )
+    while True:
+        src_rows = await _src_cur.fetchmany(chunk_size)
+        if len(src_rows) == 0:
+            break
+        yield src_rows
+
+
+class _OdbcSource:
+    """Reads a source table through the ODBC driver"""
+
+    def __init__(
+        self,
+        src_table: ac.SourceTableBlock,
+        dsn_params: dict,
+        connection_encoding: ConnectionEncoding | None = None,
+    ) -> None:
+        self.src_table = src_table
+        self.dsn_params = dsn_params
+        self.connection_encoding = connection_encoding
+        self.table_name = src_table.table_pointer.table_name
+        self.columns = list(src_table.columns.keys())
+
+    async def open(self) -> None:
+        self.dsn_params = await _snapshot_src_dsn_params(self.dsn_params)
+        await open_src_connection(
+            create_conn_str(self.dsn_params), self.connection_encoding
+        )
+
+    async def validate(self) -> None:
+        if not await _src_catalog.has_table(self.table_name):
+            raise ac.ValidationError(
+                f"Source database deos not have a table named [{self.table_name}]"
+            )
+
+    async def count(self) -> int:
+        return (
+            await (
+                await _src_cur.execute(f"SELECT COUNT(*) FROM {self.table_name}")
+            ).fetchone()
+        )[0]
+
+    async def count_concurrently(self) -> int:
+        # the shared cursor is busy fetching rows
+        async with aioodbc.connect(dsn=create_conn_str(self.dsn_params)) as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(f"SELECT COUNT(*) FROM {self.table_name}")
+                return (await cur.fetchone())[0]
+
+    async def estimate_count(self) -> int | None:
+        return await _src_catalog.get_row_count_estimate(self.table_name)
+
+    async def set_output_converters(self, column_kinds: list) -> None:
+        await _src_conn.clear_output_converters()
+        column_name_dict = dict(
+            (name.lower(), row)
+            for name, row in (await _src_catalog.get_columns(self.table_name)).items()
+        )
+        column_sql_types = [
+            getattr(column_name_dict.get(c.lower()), "data_type", None)
+            for c in self.columns
+        ]
+        for sql_type, converter in get_output_converters(
+            column_kinds, column_sql_types
+        ).items():
+            await _src_conn.add_output_converter(sql_type, converter)
+
+    def chunks(self, chunk_size: int):
+        return _fetch_src_chunks(chunk_size, self.columns, self.table_name)
+
+    async def close(self) -> None:
+        pass
+
+
+class _NativeSource:
+    """Reads a source table by decoding the Access database file directly"""
+
+    def __init__(
+        self, src_table: ac.SourceTableBlock, dsn_params: dict, workers: int = 0
+    ) -> None:
+        self.src_table = src_table
+        self.table_name = src_table.table_pointer.table_name
+        self.columns = list(src_table.columns.keys())
+        self.dsn_params = dsn_params
+        self.path = ""
+        self.workers = workers
+        self.db: access.AccessDatabase | None = None
+        self._batches = None
+        # a batch may still be decoding in a thread when the transfer stops, so it is closed after that batch
+        self._batches_lock = threading.Lock()
+
+    async def open(self) -> None:
+        self.dsn_params = await _snapshot_src_dsn_params(self.dsn_params)
+        self.path = str(get_dsn_param(self.dsn_params, "DBQ"))
+        if not self.path:
+            raise ac.ValidationError(
+                f"native source [{self.src_table.table_pointer}] requires a DBQ param"
+            )
+        self.db = await asyncio.to_thread(access.AccessDatabase, self.path)
+
+    async def validate(self) -> None:
+        try:
+            table = await asyncio.to_thread(self.db.get_table, self.table_name)
+            for column in self.columns:
+                table.get_column(column)
+        except KeyError as e:
+            raise ac.ValidationError(str(e))
+
+    async def count(self) -> int:
+        table = await asyncio.to_thread(self.db.get_table, self.table_name)
+        return await asyncio.to_thread(self.db.count_rows, table)
+
+    async def count_concurrently(self) -> int:
+        # batches are read through their own file handles
+        return await self.count()
+
+    async def estimate_count(self) -> int | None:
+        table = await asyncio.to_thread(self.db.get_table, self.table_name)
+        return table.row_count
+
+    async def set_output_converters(self, column_kinds: list) -> None:
+        pass
+
+    def _next_batch(self) -> list[list] | None:
+        with self._batches_lock:
+            return next(self._batches, None)
+
+    def _close_batches(self) -> None:
+        with self._batches_lock:
+            self._batches.close()
+
+    async def chunks(self, chunk_size: int):
+        self._batches = access.iter_table_batches(
+            self.path, self.table_name, self.columns, chunk_size, self.workers
+        )
+        while True:
+            # decoding is blocking, keep it off the event loop
+            rows = await asyncio.to_thread(self._next_batch)
+            if rows is None:
+                break
+            yield rows
+
+    async def close(self) -> None:
+        if self._batches is not None:
+            # stops the worker processes of a table that was not read to the end,
+            # waiting for them would block the event loop
+            await asyncio.to_thread(self._close_batches)
+        if self.db is not None:
+            self.db.close()
+
+
+class _StagedSource:
+    """Reads a source table from a staging file created by ``extract``"""
+
+    def __init__(self, src_table: ac.SourceTableBlock, staging_dir: str) -> None:
+        self.src_table = src_table
+        self.staging_dir = staging_dir
+        self.reader: staging.StagingReader | None = None
+
+    async def open(self) -> None:
+        staging_path = staging.get_staging_path(
+            self.staging_dir, self.src_table.table_pointer
+        )
+        if not os.path.exists(staging_path):
+            raise ac.ValidationError(
+                f"no staging file for [{self.src_table.table_pointer}] at {staging_path}, run extract first"
+            )
+        self.reader = staging.StagingReader(staging_path)
+
+    async def validate(self) -> None:
+        if self.reader.columns != list(self.src_table.columns.keys()):
+            raise ac.ValidationError(
+                f"staging file {self.reader.path} columns {self.reader.columns} do not match config, run extract again"
+            )
+
+    async def count(self) -> int:
+        return self.reader.row_count
+
+    async def count_concurrently(self) -> int:
+        return self.reader.row_count
+
+    async def estimate_count(self) -> int | None:
+        return self.reader.row_count
+
+    async def set_output_converters(self, column_kinds: list) -> None:
+        pass
+
+    async def chunks(self, chunk_size: int):
+        for rows in self.reader.iter_rows(chunk_size):
+            yield rows
+            # decompressing is synchronous, let other tasks run between chunks
+            await asyncio.sleep(0)
+
+    async def close(self) -> None:
+        if self.reader is not None:
+            self.reader.close()
+
+
+def get_load_table_sql_str(
+    config: ac.Config, tgt_table_pointer: ac.TargetTablePointer
+) -> str:
+    """Gets the table that holds the rows of a target table during the transfer,
+    which is the shadow table if it was loaded into one
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_table_pointer: target table
+    :type tgt_table_pointer: ac.TargetTablePointer
+    :return: table name
+    :rtype: str
+    """
+    if tgt_table_pointer in config.targets:
+        load_table_name = _transfer_context.get("created_tables", {}).get(
+            config.targets[tgt_table_pointer].name
+        )
+        if load_table_name is not None:
+            return load_table_name
+    return tgt_table_pointer.to_sql_str()
+
+
+def get_src_backend(config: ac.Config, src_table: ac.SourceTableBlock) -> str:
+    return src_table.backend or config.source_backend
+
+
+def get_inspected_table(
+    config: ac.Config, src_table: ac.SourceTableBlock
+) -> dict | None:
+    """Gets a source table from the inspection snapshot loaded for the transfer
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :return: inspected table info, or None if there is no current inspection of the table
+    :rtype: dict | None
+    """
+    source_inspection: inspection.SourceInspection | None = _transfer_context.get(
+        "inspection"
+    )
+    if source_inspection is None:
+        return None
+    return source_inspection.get_table(
+        get_src_dsn_params(config, src_table), src_table.table_pointer.table_name
+    )
+
+
+def validate_inspected_table(src_table: ac.SourceTableBlock, table: dict) -> None:
+    """Checks that the columns of a source table exist in its inspected table
+
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param table: inspected table info
+    :type table: dict
+    :raises ac.ValidationError: if columns are missing
+    """
+    column_names = set(c["name"].lower() for c in table["columns"])
+    missing = [c for c in src_table.columns.keys() if c.lower() not in column_names]
+    if missing:
+        raise ac.ValidationError(
+            f"source table [{src_table.table_pointer.table_name}] has no columns named [{', '.join(missing)}]"
+        )
+
+
+def _create_source(
+    config: ac.Config, src_table: ac.SourceTableBlock, staging_dir: str | None = None
+) -> _OdbcSource | _NativeSource | _StagedSource:
+    if staging_dir is not None:
+        return _StagedSource(src_table, staging_dir)
+    src_dsn_params = get_src_dsn_params(config, src_table)
+    if get_src_backend(config, src_table) == "native":
+        return _NativeSource(src_table, src_dsn_params, config.source_workers)
+    return _OdbcSource(src_table, src_dsn_params, get_src_encoding(config, src_table))
+
+
 async def transfer_table(
-    config: ac.Config, src_table: ac.SourceTableBlock, tgt_table: ac.TargetTableBlock
+    config: ac.Config,
+    src_table: ac.SourceTableBlock,
+    tgt_table: ac.TargetTableBlock,
+    staging_dir: str | None = None,
 ) -> bool:
+    """Transfers one source table to its target table.
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :param staging_dir: if set, rows are loaded from staging files in this directory instead of the source database, defaults to None
+    :type staging_dir: str | None, optional
+    :return: whether the transfer succeeded
+    :rtype: bool
+    """
     global _src_cur
     global _tgt_cur
 
     logger = logging.getLogger("process.transfer_table")
     start_time = time.time()
 
+    source = None
+    batcher: CommitBatcher | None = None
+    count_task: asyncio.Task | None = None
+    run_history: history.RunHistory | None = _transfer_context.get("run_history")
+    table_stats = history.TableStats(src_table.table_pointer.table_name, tgt_table.name)
+    total_rejected = 0
+    progress_key = str(src_table.table_pointer)
+    table_progress = get_progress_tracker().start_table(
+        progress_key, f"{src_table.table_pointer.table_name} -> {tgt_table.name}"
+    )
+
+    def get_count_result() -> int | None:
+        try:
+            return count_task.result()
+        except Exception as e:
+            logger.warning("could not count source rows - %s", e)
+            return None
+
     try:
+        source = _create_source(config, src_table, staging_dir)
         src_table_name = src_table.table_pointer.table_name
         tgt_table_name = tgt_table.name
 
@@ -217,52 +832,63 @@ async def transfer_table(
 
         true_tgt_table_columns = tgt_table.columns
 
-        src_dsn_params = {
-            **config.get_source_dsn_params_with_catalog(
-                src_table.table_pointer.catalog_name
-            ),
-            **src_table.dsn_params,
-        }
-        new_src_conn_str = create_conn_str(src_dsn_params)
-        logger.info("connecting to source database")
-        await open_src_connection(new_src_conn_str)
+        logger.info("opening source table [%s]", src_table_name)
+        await source.open()
 
-        tgt_dsn_params = {**config.target_dsn_params, **tgt_table.dsn_params}
+        tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
         new_tgt_conn_str = create_conn_str(tgt_dsn_params)
+        session_profile = get_tgt_session_profile(config, tgt_dsn_params)
         logger.info("connecting to target database")
-        await open_tgt_connection(new_tgt_conn_str)
+        await open_tgt_connection(
+            new_tgt_conn_str, session_profile, get_tgt_encoding(config, tgt_table)
+        )
 
-        logger.info(f"validating source table [{src_table_name}]")
-        # check if table exists in source
-        source_table_name_dict = await get_table_name_dict(_src_cur)
-        if src_table_name not in source_table_name_dict:
-            raise ac.ValidationError(
-                f"Source database deos not have a table named [{src_table_name}]"
-            )
+        inspected_table = (
+            None if staging_dir is not None else get_inspected_table(config, src_table)
+        )
+        logger.info("validating source table [%s]", src_table_name)
+        if inspected_table is not None:
+            validate_inspected_table(src_table, inspected_table)
+        else:
+            await source.validate()
 
         # FIXME: support catalog and schema
         if tgt_table_name not in _transfer_context["created_tables"]:
             # once validation is finished, create tables in the target
-            # drop original table if that is in the settings
-            await _tgt_cur.execute(f"DROP TABLE IF EXISTS {tgt_table_name} CASCADE")
-            logger.info(f'creating target table "{tgt_table_name}"')
+            if config.shadow_load:
+                # the live table is left alone until the shadow table is swapped in
+                load_table_name = shadow.get_shadow_table_name(tgt_table_name)
+                await _tgt_cur.execute(f"DROP TABLE IF EXISTS {load_table_name}")
+            else:
+                # drop original table if that is in the settings
+                load_table_name = tgt_table_name
+                await _tgt_cur.execute(f"DROP TABLE IF EXISTS {tgt_table_name} CASCADE")
+            logger.info('creating target table "%s"', load_table_name)
             await _tgt_cur.execute(
-                f'CREATE TABLE IF NOT EXISTS {tgt_table_name} ({",".join([f"{cname} {ctype}" for cname, ctype in true_tgt_table_columns.items()])})'
+                get_create_table_sql(
+                    tgt_table,
+                    config.bulk_load or config.shadow_load,
+                    session_profile is not None and session_profile.unlogged_tables,
+                    load_table_name,
+                )
             )
-            logger.info(f'created table "{tgt_table_name}"')
-            _transfer_context["created_tables"][tgt_table_name] = tgt_table_name
-
-        driver_name = ""
-        for k, v in tgt_dsn_params.items():
-            if k.lower() == "driver":
-                driver_name = v
-
-        total_src_row_count: int = (
-            await (
-                await _src_cur.execute(f"SELECT COUNT(*) FROM {src_table_name}")
-            ).fetchone()
-        )[0]
-        total_src_row_count_strlen = len(str(total_src_row_count))
+            _tgt_catalog.invalidate(load_table_name)
+            logger.info('created table "%s"', load_table_name)
+            _transfer_context["created_tables"][tgt_table_name] = load_table_name
+        load_table_name = _transfer_context["created_tables"][tgt_table_name]
+
+        driver_name = get_dsn_param(tgt_dsn_params, "driver")
+
+        total_src_row_count: int | None = None
+        if inspected_table is not None:
+            total_src_row_count = inspected_table["row_count"]
+        elif config.source_count == "exact":
+            total_src_row_count = await source.count()
+        elif config.source_count == "estimate":
+            total_src_row_count = await source.estimate_count()
+        elif config.source_count == "concurrent":
+            count_task = asyncio.create_task(source.count_concurrently())
+        table_progress.total = total_src_row_count
 
         max_param_count = 0
         if driver_name not in MAX_PARAM_COUNTS:
@@ -278,42 +904,142 @@ async def transfer_table(
             max_param_count = get_max_param_count(driver_name)
         row_size = len(src_table_columns)
         chunk_size = int(max_param_count / row_size)
+        table_stats.chunk_size = chunk_size
+        table_stats.source_backend = (
+            "staging" if staging_dir is not None else get_src_backend(config, src_table)
+        )
+        table_stats.load_mode = (
+            "shadow" if config.shadow_load else "bulk" if config.bulk_load else "direct"
+        )
 
         if logger.isEnabledFor(logging.INFO):
-            print(
-                _LOG_DIVIDER + "\n"
+            logger.info(
+                "\n" + _LOG_DIVIDER + "\n"
                 f"source:         {src_table_name}\n"
                 f"target:         {tgt_table_name}\n"
                 f"max params:     {max_param_count}\n"
                 f"col count:      {row_size}\n"
                 f"chunk size:     {chunk_size}\n"
-                f"row count:      {total_src_row_count}\n" + _LOG_DIVIDER
+                f"row count:      {'counting' if count_task else total_src_row_count}\n"
+                + _LOG_DIVIDER
             )
 
         total_inserted = 0
 
         # once table is created, get rows form source to insert
-        logger.info(
-            f'fetching rows from source table [{src_table_name}] with columns [{", ".join([c for c in src_table_columns.keys()])}]'
-        )
-        await _src_cur.execute(
-            f'SELECT {",".join(c for c in src_table_columns.keys())} FROM {src_table_name}'
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "fetching rows from source table [%s] with columns [%s]",
+                src_table_name,
+                ", ".join(src_table_columns.keys()),
+            )
+        src_chunks = source.chunks(chunk_size)
+        slow_log: SlowLog | None = _transfer_context.get("slow_log")
+        if slow_log is not None:
+            src_chunks = slow_log.time_chunks(src_chunks, src_table_name)
+        chunk_index = 0
 
         logger.debug("selected source rows")
 
-        if logger.isEnabledFor(logging.INFO):
-            print(_LOG_DIVIDER)
+        column_transforms = get_column_transforms(config, src_table)
+        transform_executor = None
+        if any(t.heavy for _, ts in column_transforms for t in ts):
+            transform_executor = _get_transform_executor(config)
+
+        coercer: ChunkCoercer | None = None
+        if config.coercion is not None:
+            # decimals are converted by the driver where possible, the rest is coerced per chunk
+            await source.set_output_converters(get_column_kinds(src_table, tgt_table))
+            coercer = ChunkCoercer.from_tables(
+                src_table,
+                tgt_table,
+                bool(config.coercion.get("TRIM")),
+                bool(config.coercion.get("EMPTY_AS_NULL")),
+            )
 
-        while True:
-            src_rows = await _src_cur.fetchmany(chunk_size)
+        committed_rows = _transfer_context.setdefault("committed_rows", {})
+        committed_key = str(src_table.table_pointer)
 
-            src_row_count = len(src_rows)
+        def on_commit(row_count: int) -> None:
+            # only committed rows are counted, so the count is safe to resume from
+            committed_rows[committed_key] = row_count
 
-            if src_row_count == 0:
-                print("")
-                logger.debug("no more source rows to fetch, breaking")
-                break
+        join_plan: JoinLookupPlan | None = None
+
+        def on_execute(sql: str, params: list, elapsed: float) -> None:
+            slow_log.record(
+                "insert",
+                src_table_name,
+                elapsed,
+                chunk_index,
+                sql,
+                params,
+                len(params) // row_size if params else None,
+            )
+
+        async def reconnect() -> tuple[aioodbc.Connection, aioodbc.Cursor]:
+            conn, cur = await reconnect_tgt_connection()
+            if join_plan is not None:
+                # temporary tables end with the session
+                await cur.execute(join_plan.create_sql)
+            return conn, cur
+
+        batcher = CommitBatcher(
+            _tgt_conn,
+            _tgt_cur,
+            CommitPolicy.from_config(config, src_table),
+            on_commit,
+            reconnect,
+            RetryPolicy(config.chunk_retries, config.chunk_retry_backoff),
+            on_execute if slow_log is not None else None,
+        )
+
+        dead_letter: DeadLetterWriter | None = _transfer_context.get("dead_letter")
+
+        def on_rejected(row: list, e: Exception) -> None:
+            nonlocal total_rejected
+            total_rejected += 1
+            table_progress.rejected += 1
+            logger.warning("skipping row rejected by the target - %s", e)
+            dead_letter.write(
+                src_table_name,
+                tgt_table_name,
+                dict(zip(src_table_columns.keys(), row)),
+                e,
+            )
+
+        if (src_table.lookup_strategy or config.lookup_strategy) == "join" and any(
+            isinstance(v, ac.SourceColumnMapFunction)
+            for v in src_table_columns.values()
+        ):
+            join_plan = JoinLookupPlan(
+                config,
+                src_table,
+                load_table_name,
+                functools.partial(get_load_table_sql_str, config),
+            )
+            # created outside of the batched transactions so it lasts for the session
+            await _tgt_cur.execute(join_plan.drop_sql)
+            await _tgt_cur.execute(join_plan.create_sql)
+            table_stats.lookup_strategy = "join"
+        elif any(
+            isinstance(v, ac.SourceColumnMapFunction)
+            for v in src_table_columns.values()
+        ):
+            table_stats.lookup_strategy = "client"
+
+        validator: ChunkValidator | None = None
+        if config.prevalidate:
+            validator = ChunkValidator.from_tables(
+                src_table, tgt_table, check_map_functions=join_plan is None
+            )
+
+        await batcher.begin()
+
+        async for src_rows in src_chunks:
+            src_row_count = len(src_rows)
+            chunk_index += 1
+            table_stats.chunk_count = chunk_index
 
             tgt_table_column_names = []
 
@@ -323,16 +1049,36 @@ async def transfer_table(
                 try:
                     if isinstance(v, ac.TargetColumnPointer):
                         tgt_table_column_names.append(v.column_name)
-                    elif isinstance(v, ac.SourceColumnMapFunction):
+                    elif (
+                        isinstance(v, ac.SourceColumnMapFunction) and join_plan is None
+                    ):
+                        # with a join plan, lookups are resolved when the chunk is inserted
                         f = v
                         tgt_table_column_names.append(f.to_column.column_name)
-                        await _tgt_cur.execute(
+                        lookup_sql = (
                             f"SELECT {f.from_row.select_column.column_name}, {f.with_column.column_name} "
-                            + f"FROM {f.with_column.table.to_sql_str()} "
-                            + f"WHERE {f.from_row.select_column.column_name} IN ({','.join('?' * src_row_count)})",
-                            [row[col_index] for row in src_rows],
+                            + f"FROM {get_load_table_sql_str(config, f.with_column.table)} "
+                            + f"WHERE {f.from_row.select_column.column_name} IN ({','.join('?' * src_row_count)})"
                         )
+                        lookup_params = [row[col_index] for row in src_rows]
+                        lookup_start_time = time.perf_counter()
+                        await _tgt_cur.execute(lookup_sql, lookup_params)
                         with_rows = await _tgt_cur.fetchall()
+                        lookup_elapsed = time.perf_counter() - lookup_start_time
+                        get_metrics().record(
+                            f"lookup.{f.from_row.select_column.table}.{f.from_row.select_column.column_name}",
+                            lookup_elapsed,
+                        )
+                        if slow_log is not None:
+                            slow_log.record(
+                                "lookup",
+                                src_table_name,
+                                lookup_elapsed,
+                                chunk_index,
+                                lookup_sql,
+                                lookup_params,
+                                len(with_rows),
+                            )
                         match_dict = dict(with_rows)
                         for row_index in range(src_row_count):
                             # replace column in source row with a match using the source column value as key
@@ -344,7 +1090,41 @@ async def transfer_table(
                     raise TransferError(f"source column read failed for {k} - {e}")
                 col_index += 1
 
+            if column_transforms:
+                # each column runs its transforms on the whole chunk, heavy ones in worker processes
+                transformed_columns = await asyncio.gather(
+                    *(
+                        transforms.run_transforms(
+                            column_transform_list,
+                            [row[col_index] for row in src_rows],
+                            transform_executor,
+                        )
+                        for col_index, column_transform_list in column_transforms
+                    )
+                )
+                for (col_index, _), values in zip(
+                    column_transforms, transformed_columns
+                ):
+                    for row, value in zip(src_rows, values):
+                        row[col_index] = value
+
+            if coercer:
+                coercer.apply(src_rows)
+
+            if validator:
+                src_rows, violations = validator.split(src_rows)
+                for row, e in violations:
+                    if dead_letter is None:
+                        raise ValueError(
+                            f"row violates target column rules, set DEAD_LETTER_PATH to skip such rows - {e}"
+                        )
+                    on_rejected(row, e)
+                if not src_rows:
+                    continue
+
             logger.debug("finished src col check, beginning insert")
+            if run_history is not None:
+                table_stats.bytes += history.get_rows_size(src_rows)
 
             # # pyodbc fast executemany method buggy
             # try:
@@ -362,56 +1142,527 @@ async def transfer_table(
             #         src_rows
             #     )
 
-            await _tgt_cur.execute(
-                f"INSERT INTO {tgt_table_name} ({','.join(c for c in tgt_table_column_names)}) VALUES "
-                + ",".join(
-                    f"({','.join('?' * row_size)})" for _ in range(src_row_count)
-                ),
-                [value for row in src_rows for value in row],
+            def get_chunk_statements(rows: list[list]) -> list[tuple[str, list]]:
+                if join_plan is not None:
+                    return join_plan.get_chunk_statements(rows)
+                return [
+                    (
+                        f"INSERT INTO {load_table_name} ({','.join(c for c in tgt_table_column_names)}) VALUES "
+                        + ",".join(
+                            f"({','.join('?' * row_size)})" for _ in range(len(rows))
+                        ),
+                        [value for row in rows for value in row],
+                    )
+                ]
+
+            # rows rejected by the target are only skipped when they can be written somewhere
+            total_inserted += await batcher.execute_chunk_rows(
+                src_rows,
+                get_chunk_statements,
+                on_rejected if dead_letter is not None else None,
+            )
+            # progress is drawn by the renderer, the transfer only updates the counters
+            table_progress.inserted = total_inserted
+            if count_task is not None and count_task.done():
+                total_src_row_count = table_progress.total = get_count_result()
+                count_task = None
+            logger.debug("inserted [%d] %d rows", src_row_count, total_inserted)
+
+        logger.debug("no more source rows to fetch")
+        _transfer_context["rejected_rows"][committed_key] = total_rejected
+        if total_rejected:
+            logger.warning(
+                "skipped %d rows of [%s] rejected by the target, see %s",
+                total_rejected,
+                src_table_name,
+                dead_letter.path,
             )
 
-            total_inserted += src_row_count
-            total_percent = total_inserted / total_src_row_count
-            if logger.isEnabledFor(logging.INFO):
-                if logger.level != logging.DEBUG:
-                    print(
-                        f"    inserted {total_inserted:>{total_src_row_count_strlen}} / {total_src_row_count} "
-                        + f"{'█' * int(total_percent * 20):<{20}} {int(100 * total_percent):3}%",
-                        end="\r",
-                    )
-                else:
-                    logger.debug(
-                        f"inserted [{src_row_count:<{total_src_row_count_strlen}}] {total_inserted:>{total_src_row_count_strlen}} / {total_src_row_count}"
-                    )
+        await batcher.close()
+        if join_plan is not None:
+            await _tgt_cur.execute(join_plan.drop_sql)
 
-        tgt_count = (
-            await (
-                await _tgt_cur.execute(f"SELECT COUNT(*) FROM {tgt_table_name}")
-            ).fetchone()
-        )[0]
+        if count_task is not None:
+            # usually finished long before the last chunk
+            await asyncio.wait([count_task])
+            total_src_row_count = get_count_result()
+            count_task = None
+
+        # the rows committed by the batcher, instead of counting the target table
+        loaded_rows = _transfer_context.setdefault("loaded_rows", {})
+        loaded_rows[tgt_table_name] = (
+            loaded_rows.get(tgt_table_name, 0) + batcher.committed_rows
+        )
+        tgt_count = None
+        if config.verify_counts:
+            tgt_count = (
+                await (
+                    await _tgt_cur.execute(f"SELECT COUNT(*) FROM {load_table_name}")
+                ).fetchone()
+            )[0]
+            if tgt_count != loaded_rows[tgt_table_name]:
+                raise ValueError(
+                    f'target table "{load_table_name}" has {tgt_count} rows, expected {loaded_rows[tgt_table_name]}'
+                )
 
         if logger.isEnabledFor(logging.INFO):
-            print(
-                _LOG_DIVIDER + "\n"
+            logger.info(
+                "\n" + _LOG_DIVIDER + "\n"
                 f"finished transfer from [{src_table_name}] to [{tgt_table_name}]\n"
-                f"source count:   {total_src_row_count}\n"
-                f"target count:   {tgt_count}\n"
-                f"duration:       {time.time() - start_time:.2f}s\n" + _LOG_DIVIDER
+                f"source count:   {'unknown' if total_src_row_count is None else total_src_row_count}\n"
+                f"inserted rows:  {batcher.committed_rows}\n"
+                + (f"rejected rows:  {total_rejected}\n" if total_rejected else "")
+                + (f"target count:   {tgt_count}\n" if tgt_count is not None else "")
+                + f"duration:       {time.time() - start_time:.2f}s\n"
+                + _LOG_DIVIDER
             )
 
+        table_stats.status = "ok"
         return True
     except ValueError as e:
         logger.error("transfer failed - %s", e)
+        table_stats.error = str(e)
         return False
     except ac.ValidationError as e:
         logger.error("validation failed - %s", e)
+        table_stats.error = str(e)
         return False
     except Exception as e:
         logger.error("unhandled exception - %s", e)
+        table_stats.error = str(e)
         return False
+    finally:
+        get_progress_tracker().finish_table(progress_key)
+        if count_task is not None:
+            count_task.cancel()
+        if source is not None:
+            await source.close()
+        if batcher is not None:
+            try:
+                # commit the chunks that were inserted before a failure
+                await batcher.close()
+            except Exception as e:
+                logger.error("failed to commit inserted rows - %s", e)
+        if run_history is not None:
+            table_stats.duration = time.time() - start_time
+            table_stats.rejected = total_rejected
+            if batcher is not None:
+                table_stats.rows = batcher.committed_rows
+                table_stats.reconnects = batcher.reconnects
+            try:
+                run_history.add_table(table_stats)
+            except sqlite3.Error as e:
+                logger.warning("could not record run history - %s", e)
+
+
+def get_create_table_sql(
+    tgt_table: ac.TargetTableBlock,
+    bulk_load: bool = False,
+    unlogged: bool = False,
+    table_name: str | None = None,
+) -> str:
+    """Gets the ``CREATE TABLE`` statement of a target table
+
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :param bulk_load: leave out constraints that are added after loading, defaults to False
+    :type bulk_load: bool, optional
+    :param unlogged: create an ``UNLOGGED`` table, defaults to False
+    :type unlogged: bool, optional
+    :param table_name: name of the created table, defaults to the target table name
+    :type table_name: str | None, optional
+    :return: statement
+    :rtype: str
+    """
+    if bulk_load:
+        columns = [
+            f"{cname} {cdef.to_sql_str(deferred=False)}"
+            for cname, cdef in tgt_table.columns.definitions.items()
+        ]
+    else:
+        columns = [f"{cname} {ctype}" for cname, ctype in tgt_table.columns.items()]
+    return f'CREATE {"UNLOGGED " if unlogged else ""}TABLE IF NOT EXISTS {table_name or tgt_table.name} ({",".join(columns)})'
+
+
+def get_deferred_constraint_sql(
+    tgt_table: ac.TargetTableBlock, table_name: str | None = None
+) -> tuple[list[str], list[str], set[ac.TargetTablePointer]]:
+    """Gets the statements that add the constraints left out of a bulk loaded target table
+
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :param table_name: name of the altered table, defaults to the target table name
+    :type table_name: str | None, optional
+    :return: key statements (primary keys and unique constraints), foreign key statements, and the tables the foreign keys reference
+    :rtype: tuple[list[str], list[str], set[ac.TargetTablePointer]]
+    """
+    key_statements = []
+    foreign_key_statements = []
+    references = set()
+    for cname, cdef in tgt_table.columns.definitions.items():
+        for constraint in cdef.deferred_constraints:
+            statement = f"ALTER TABLE {table_name or tgt_table.name} ADD {constraint.to_table_constraint_sql_str(cname)}"
+            if constraint.kind == "REFERENCES":
+                foreign_key_statements.append(statement)
+                if constraint.references is not None:
+                    references.add(constraint.references)
+            else:
+                key_statements.append(statement)
+    return key_statements, foreign_key_statements, references
+
+
+async def _execute_statements(
+    conn_str: str,
+    statements: list[str],
+    session_profile: SessionProfile | None = None,
+) -> bool:
+    logger = logging.getLogger("process.bulk_load")
+    success = True
+    async with aioodbc.connect(
+        dsn=conn_str,
+        after_created=functools.partial(
+            _conn_attributes, session_profile=session_profile
+        ),
+        autocommit=True,
+    ) as conn:
+        async with conn.cursor() as cur:
+            for statement in statements:
+                statement_start_time = time.time()
+                try:
+                    await cur.execute(statement)
+                    logger.info(
+                        f"{statement} ({time.time() - statement_start_time:.2f}s)"
+                    )
+                except pyodbc.Error as e:
+                    logger.error(f"{statement} failed - {e}")
+                    success = False
+    return success
+
+
+async def finish_bulk_load(
+    config: ac.Config, tgt_tables: list[ac.TargetTableBlock]
+) -> bool:
+    """Adds the primary keys, unique constraints and foreign keys of bulk loaded target tables, then analyzes them.
+    Tables are handled concurrently on separate connections, and foreign keys wait until the keys of the tables they reference exist.
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_tables: loaded target tables
+    :type tgt_tables: list[ac.TargetTableBlock]
+    :return: whether every statement succeeded
+    :rtype: bool
+    """
+    logger = logging.getLogger("process.bulk_load")
+    start_time = time.time()
+
+    keys_added = {
+        config.targets.create_key(tgt_table): asyncio.Event()
+        for tgt_table in tgt_tables
+    }
+    semaphore = asyncio.Semaphore(max(config.bulk_load_workers, 1))
+
+    async def finish_table(tgt_table: ac.TargetTableBlock) -> bool:
+        pointer = config.targets.create_key(tgt_table)
+        tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
+        conn_str = create_conn_str(tgt_dsn_params)
+        session_profile = get_tgt_session_profile(config, tgt_dsn_params)
+        key_statements, foreign_key_statements, references = (
+            get_deferred_constraint_sql(tgt_table)
+        )
+        try:
+            async with semaphore:
+                success = await _execute_statements(
+                    conn_str, key_statements, session_profile
+                )
+        finally:
+            keys_added[pointer].set()
+        for reference in references:
+            if reference != pointer and reference in keys_added:
+                await keys_added[reference].wait()
+        async with semaphore:
+            return (
+                await _execute_statements(
+                    conn_str,
+                    foreign_key_statements + [f"ANALYZE {tgt_table.name}"],
+                    session_profile,
+                )
+                and success
+            )
+
+    logger.info(f"adding constraints to {len(tgt_tables)} tables")
+    results = await asyncio.gather(
+        *(finish_table(tgt_table) for tgt_table in tgt_tables)
+    )
+    logger.info(f"added constraints in {time.time() - start_time:.2f}s")
+    return all(results)
+
+
+async def finish_shadow_load(
+    config: ac.Config,
+    tgt_tables: list[ac.TargetTableBlock],
+    failed_tgt_tables: list[ac.TargetTableBlock] | None = None,
+) -> bool:
+    """Adds the primary keys and unique constraints of loaded shadow tables and analyzes them,
+    then swaps the shadow tables in, one transaction per target connection, and validates the foreign keys.
+    The shadow tables of failed target tables only hold part of their rows, they are dropped and the live tables are kept.
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_tables: loaded target tables
+    :type tgt_tables: list[ac.TargetTableBlock]
+    :param failed_tgt_tables: loaded target tables a source table failed to load into, defaults to None
+    :type failed_tgt_tables: list[ac.TargetTableBlock] | None, optional
+    :return: whether the tables were swapped in and every statement succeeded
+    :rtype: bool
+    """
+    logger = logging.getLogger("process.shadow")
+    start_time = time.time()
+    failed_tgt_tables = failed_tgt_tables or []
+    shadow_tgt_tables = [
+        t
+        for t in tgt_tables
+        if _transfer_context["created_tables"].get(t.name)
+        == shadow.get_shadow_table_name(t.name)
+    ]
+    tgt_tables = [t for t in shadow_tgt_tables if t not in failed_tgt_tables]
+
+    success = True
+    for tgt_table in shadow_tgt_tables:
+        if tgt_table in tgt_tables:
+            continue
+        logger.warning(f"keeping the current {tgt_table.name}, its load failed")
+        tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
+        if not await _execute_statements(
+            create_conn_str(tgt_dsn_params),
+            [f"DROP TABLE IF EXISTS {shadow.get_shadow_table_name(tgt_table.name)}"],
+        ):
+            success = False
+
+    semaphore = asyncio.Semaphore(max(config.bulk_load_workers, 1))
+
+    async def build_table(tgt_table: ac.TargetTableBlock) -> bool:
+        tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
+        shadow_table_name = shadow.get_shadow_table_name(tgt_table.name)
+        key_statements, _, _ = get_deferred_constraint_sql(tgt_table, shadow_table_name)
+        async with semaphore:
+            return await _execute_statements(
+                create_conn_str(tgt_dsn_params),
+                key_statements + [f"ANALYZE {shadow_table_name}"],
+                get_tgt_session_profile(config, tgt_dsn_params),
+            )
+
+    logger.info(f"building keys of {len(tgt_tables)} shadow tables")
+    if not all(await asyncio.gather(*(build_table(t) for t in tgt_tables))):
+        logger.error("keys could not be built, keeping the current tables")
+        return False
+    logger.info(f"built keys in {time.time() - start_time:.2f}s")
+
+    tgt_connections: dict[str, list[ac.TargetTableBlock]] = {}
+    for tgt_table in tgt_tables:
+        conn_str = create_conn_str(get_tgt_dsn_params(config, tgt_table))
+        tgt_connections.setdefault(conn_str, []).append(tgt_table)
+
+    for conn_str, conn_tgt_tables in tgt_connections.items():
+        foreign_key_statements = []
+        for tgt_table in conn_tgt_tables:
+            foreign_key_statements += get_deferred_constraint_sql(tgt_table)[1]
+        try:
+            async with aioodbc.connect(dsn=conn_str, autocommit=False) as conn:
+                validate_statements = await shadow.swap_shadow_tables(
+                    conn, [t.name for t in conn_tgt_tables], foreign_key_statements
+                )
+        except shadow.SwapError as e:
+            logger.error(e)
+            success = False
+            continue
+        # validating only takes a lock that lets readers and writers continue
+        if not await _execute_statements(conn_str, validate_statements):
+            success = False
+    logger.info(f"finished shadow load in {time.time() - start_time:.2f}s")
+    return success
+
+
+async def _open_tgt_table_connection(
+    config: ac.Config, tgt_table: ac.TargetTableBlock
+) -> SessionProfile | None:
+    tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
+    session_profile = get_tgt_session_profile(config, tgt_dsn_params)
+    await open_tgt_connection(
+        create_conn_str(tgt_dsn_params),
+        session_profile,
+        get_tgt_encoding(config, tgt_table),
+    )
+    return session_profile
+
+
+async def create_lookup_indexes(
+    config: ac.Config, tgt_table: ac.TargetTableBlock, column_names: list[str]
+) -> None:
+    """Creates indexes on the columns of a loaded target table that map functions look up.
+    Columns that are already indexed by a key constraint are skipped.
+    A sample of lookups is timed before and after each index is built, and recorded in the metrics.
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_table: loaded target table
+    :type tgt_table: ac.TargetTableBlock
+    :param column_names: lookup column names
+    :type column_names: list[str]
+    """
+    logger = logging.getLogger("process.transfer")
+    load_table_name = _transfer_context["created_tables"].get(tgt_table.name)
+    if load_table_name is None:
+        return
+    metrics = get_metrics()
+    deferred = config.bulk_load or config.shadow_load
+    await _open_tgt_table_connection(config, tgt_table)
+    for column_name in column_names:
+        if lookup.is_column_indexed(tgt_table, column_name, deferred):
+            continue
+        index_name = lookup.get_lookup_index_name(load_table_name, column_name)
+        metric_name = f"{tgt_table.name}.{column_name}"
+        try:
+            await _tgt_cur.execute(
+                f"SELECT {column_name} FROM {load_table_name} WHERE {column_name} IS NOT NULL "
+                f"LIMIT {lookup.LOOKUP_INDEX_PROBE_SIZE}"
+            )
+            sample = [row[0] for row in await _tgt_cur.fetchall()]
+            probe_sql = (
+                f"SELECT {column_name} FROM {load_table_name} "
+                f"WHERE {column_name} IN ({','.join('?' * len(sample))})"
+            )
+            if sample:
+                with metrics.timer(f"lookup_index.probe_before.{metric_name}"):
+                    await _tgt_cur.execute(probe_sql, sample)
+                    await _tgt_cur.fetchall()
+            with metrics.timer(f"lookup_index.build.{metric_name}"):
+                await _tgt_cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name.rsplit('.', 1)[-1]} "
+                    f"ON {load_table_name} ({column_name})"
+                )
+                # the planner needs statistics of the freshly loaded table to use the index
+                await _tgt_cur.execute(f"ANALYZE {load_table_name} ({column_name})")
+            if sample:
+                with metrics.timer(f"lookup_index.probe_after.{metric_name}"):
+                    await _tgt_cur.execute(probe_sql, sample)
+                    await _tgt_cur.fetchall()
+        except Exception as e:
+            logger.warning(f'could not create lookup index "{index_name}" - {e}')
+            continue
+        _transfer_context["lookup_indexes"][index_name] = tgt_table.name
+        build_time = metrics.get(f"lookup_index.build.{metric_name}").total
+        logger.info(f'created lookup index "{index_name}" in {build_time:.2f}s')
+
+
+async def drop_lookup_indexes(
+    config: ac.Config, tgt_table: ac.TargetTableBlock
+) -> None:
+    """Drops the lookup indexes created on a target table
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    """
+    logger = logging.getLogger("process.transfer")
+    lookup_indexes: dict = _transfer_context["lookup_indexes"]
+    index_names = [
+        index_name
+        for index_name, tgt_table_name in lookup_indexes.items()
+        if tgt_table_name == tgt_table.name
+    ]
+    if not index_names:
+        return
+    await _open_tgt_table_connection(config, tgt_table)
+    for index_name in index_names:
+        try:
+            await _tgt_cur.execute(f"DROP INDEX IF EXISTS {index_name}")
+            logger.info(f'dropped lookup index "{index_name}"')
+        except Exception as e:
+            logger.warning(f'could not drop lookup index "{index_name}" - {e}')
+        del lookup_indexes[index_name]
+
+
+async def _set_tables_logged(
+    config: ac.Config, tgt_tables: list[ac.TargetTableBlock]
+) -> None:
+    """Makes tables created as ``UNLOGGED`` by the session profile durable.
+    Tables are handled in load order, so referenced tables become ``LOGGED`` before the tables that reference them.
+    """
+    logger = logging.getLogger("process.transfer")
+    for tgt_table in tgt_tables:
+        tgt_dsn_params = get_tgt_dsn_params(config, tgt_table)
+        session_profile = get_tgt_session_profile(config, tgt_dsn_params)
+        if session_profile is None or not session_profile.unlogged_tables:
+            continue
+        load_table_name = _transfer_context["created_tables"].get(tgt_table.name)
+        if load_table_name is None:
+            continue
+        await _open_tgt_table_connection(config, tgt_table)
+        logger.info(f'setting table "{load_table_name}" logged')
+        await _tgt_cur.execute(f"ALTER TABLE {load_table_name} SET LOGGED")
+        _tgt_catalog.invalidate(load_table_name)
+
+
+def get_load_fingerprint(
+    config: ac.Config, src_table: ac.SourceTableBlock, staging_dir: str | None = None
+) -> str | None:
+    """Gets the fingerprint of loading a source table, which is unchanged while the config blocks of the table,
+    the target database and the source database file, or the staging file, are unchanged
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param staging_dir: staging directory if the table is loaded from a staging file, defaults to None
+    :type staging_dir: str | None, optional
+    :return: fingerprint, or None if the source has no file to fingerprint
+    :rtype: str | None
+    """
+    if staging_dir is not None:
+        source_fingerprint = staging.get_file_fingerprint(
+            staging.get_staging_path(staging_dir, src_table.table_pointer)
+        )
+    else:
+        source_fingerprint = staging.get_source_fingerprint(
+            get_src_dsn_params(config, src_table)
+        )
+    return manifest.get_table_fingerprint(
+        config,
+        src_table,
+        source_fingerprint,
+        get_tgt_dsn_params(config, config.targets[src_table.target_pointer]),
+    )
+
+
+def _record_skipped_table(
+    src_table: ac.SourceTableBlock, tgt_table: ac.TargetTableBlock
+) -> None:
+    run_history: history.RunHistory | None = _transfer_context.get("run_history")
+    if run_history is None:
+        return
+    table_stats = history.TableStats(src_table.table_pointer.table_name, tgt_table.name)
+    table_stats.status = "skipped"
+    try:
+        run_history.add_table(table_stats)
+    except sqlite3.Error as e:
+        logging.getLogger("process.transfer").warning(
+            "could not record run history - %s", e
+        )
+
 
+async def transfer(
+    config: ac.Config, allow_prompts: bool = False, staging_dir: str | None = None
+):
+    """Transfers all source tables in the config to their target tables
 
-async def transfer(config: ac.Config, allow_prompts: bool = False):
+    :param config: config
+    :type config: ac.Config
+    :param allow_prompts: prompt to skip failed tables, defaults to False
+    :type allow_prompts: bool, optional
+    :param staging_dir: if set, load from staging files created by ``extract`` instead of the source databases, defaults to None
+    :type staging_dir: str | None, optional
+    """
     logger = logging.getLogger("process.transfer")
 
     try:
@@ -434,46 +1685,800 @@ async def transfer(config: ac.Config, allow_prompts: bool = False):
     # sort source tables based on their dependencies
     source_tables = sorted(config.sources, key=cmp_to_key(source_table_order_compare))
 
+    renderer: ProgressRenderer | None = None
+    watchdog: LoopWatchdog | None = None
+    run_status = "error"
     try:
-        reset_transfer_context()
+        reset_transfer_context(config)
+        loaded_tgt_tables: list[ac.TargetTableBlock] = []
+        # target tables a source table failed to load into, which are not swapped in
+        failed_tgt_tables: list[ac.TargetTableBlock] = []
+        cancelled = False
+
+        if config.record_history:
+            _transfer_context["run_history"] = history.open_run_history(
+                config.history_path or history.HISTORY_PATH_DEFAULT,
+                "load" if staging_dir is not None else "transfer",
+            )
+
+        run_manifest: manifest.RunManifest | None = None
+        manifest_path = config.manifest_path or manifest.MANIFEST_PATH_DEFAULT
+        skipped_targets: set[ac.TargetTablePointer] = set()
+        table_fingerprints: dict[ac.TargetTablePointer, dict] = {}
+        if config.skip_unchanged:
+            try:
+                run_manifest = manifest.RunManifest.load(manifest_path)
+            except manifest.ManifestError as e:
+                logger.warning("transferring every table - %s", e)
+                run_manifest = manifest.RunManifest()
+            skipped_targets, table_fingerprints = run_manifest.get_unchanged_targets(
+                config,
+                source_tables,
+                functools.partial(
+                    get_load_fingerprint, config, staging_dir=staging_dir
+                ),
+            )
+            # tables are only current again once they are loaded, also if the transfer is interrupted
+            for pointer in table_fingerprints:
+                if pointer not in skipped_targets:
+                    run_manifest.remove_table(config.targets[pointer].name)
+            run_manifest.save(manifest_path)
+        skipped_tgt_tables = [config.targets[p] for p in skipped_targets]
+        # source tables loaded without failing or skipping rows rejected by the target, by target table
+        complete_loads: dict[ac.TargetTablePointer, int] = {}
+
+        if logging.getLogger("process.transfer_table").isEnabledFor(logging.INFO):
+            renderer = ProgressRenderer(get_progress_tracker())
+            renderer.start()
+        if config.loop_watchdog is not None:
+            watchdog = LoopWatchdog(config.loop_watchdog, metrics=get_metrics())
+            watchdog.start()
+
+        lookup_indexes = config.lookup_indexes
+        lookup_columns = lookup.get_lookup_columns(config) if lookup_indexes else {}
+        # sources left to load into each target table, and sources left to look up each target table
+        pending_loads: dict[ac.TargetTablePointer, int] = {}
+        pending_lookups: dict[ac.TargetTablePointer, int] = {}
+        for src_table in source_tables:
+            pointer = src_table.target_pointer
+            if pointer in skipped_targets:
+                continue
+            pending_loads[pointer] = pending_loads.get(pointer, 0) + 1
+            for lookup_pointer in lookup.get_lookup_tables(src_table):
+                pending_lookups[lookup_pointer] = (
+                    pending_lookups.get(lookup_pointer, 0) + 1
+                )
+        for pointer in skipped_targets:
+            if pending_lookups.get(pointer) and pointer in lookup_columns:
+                # skipped tables are already loaded, and looked up by tables that are loaded again
+                await create_lookup_indexes(
+                    config, config.targets[pointer], lookup_columns[pointer]
+                )
 
         for src_table in source_tables:
             tgt_table = config.targets[src_table.target_pointer]
-            success = await transfer_table(config, src_table, tgt_table)
+            if src_table.target_pointer in skipped_targets:
+                logger.info("skipping [%s], unchanged since its last load", src_table)
+                _record_skipped_table(src_table, tgt_table)
+                continue
+            if tgt_table not in loaded_tgt_tables:
+                loaded_tgt_tables.append(tgt_table)
+            success = await transfer_table(
+                config, src_table, tgt_table, staging_dir=staging_dir
+            )
+            if success and not _transfer_context["rejected_rows"].get(
+                str(src_table.table_pointer)
+            ):
+                complete_loads[src_table.target_pointer] = (
+                    complete_loads.get(src_table.target_pointer, 0) + 1
+                )
+            if success and lookup_columns:
+                pending_loads[src_table.target_pointer] -= 1
+                if (
+                    pending_loads[src_table.target_pointer] == 0
+                    and pending_lookups.get(src_table.target_pointer)
+                    and src_table.target_pointer in lookup_columns
+                ):
+                    # the table is fully loaded and the tables that look it up are still to come
+                    await create_lookup_indexes(
+                        config, tgt_table, lookup_columns[src_table.target_pointer]
+                    )
+                for lookup_pointer in lookup.get_lookup_tables(src_table):
+                    pending_lookups[lookup_pointer] -= 1
+                    if (
+                        pending_lookups[lookup_pointer] == 0
+                        and lookup_indexes == "drop"
+                    ):
+                        await drop_lookup_indexes(
+                            config, config.targets[lookup_pointer]
+                        )
             if not success:
                 logger.warning(f"transfer from {src_table} to {tgt_table} failed")
+                if tgt_table not in failed_tgt_tables:
+                    failed_tgt_tables.append(tgt_table)
                 if allow_prompts:
                     user_input = input("skip table? (y/N)")
                     if user_input.lower() == "y":
                         logger.warning(f"skipping {src_table}")
                     else:
                         logger.warning("cancelling transfer")
+                        cancelled = True
                         break
                 else:
                     logger.warning("cancelling transfer")
+                    cancelled = True
                     break
+
+        if lookup_indexes == "drop":
+            # tables that were never looked up because the transfer stopped early
+            for tgt_table in loaded_tgt_tables + skipped_tgt_tables:
+                await drop_lookup_indexes(config, tgt_table)
+
+        await _set_tables_logged(config, loaded_tgt_tables)
+
+        finished = True
+        if config.shadow_load and cancelled:
+            logger.warning(
+                "keeping the current tables, shadow tables are not swapped in"
+            )
+            finished = False
+        elif config.shadow_load:
+            # the shared target connection would hold locks the swap waits on
+            await close_tgt_connection()
+            if not await finish_shadow_load(
+                config, loaded_tgt_tables, failed_tgt_tables
+            ):
+                logger.warning("some shadow tables could not be swapped in")
+                finished = False
+        elif config.bulk_load:
+            # the shared target connection is not needed while constraints are added
+            await close_tgt_connection()
+            if not await finish_bulk_load(config, loaded_tgt_tables):
+                logger.warning("some constraints could not be added")
+                finished = False
+
+        if run_manifest is not None and finished:
+            for pointer, fingerprints in table_fingerprints.items():
+                if pointer not in skipped_targets and complete_loads.get(
+                    pointer
+                ) == len(fingerprints):
+                    run_manifest.set_table(config.targets[pointer].name, fingerprints)
+            run_manifest.save(manifest_path)
+        if skipped_targets:
+            logger.info(
+                "skipped %d unchanged target tables, %d were loaded",
+                len(skipped_targets),
+                len(loaded_tgt_tables),
+            )
+        if watchdog is not None:
+            await watchdog.stop()
+            logger.info(
+                "event loop was blocked %d times for %.2fs in total",
+                len(watchdog.stalls),
+                sum(lag for lag, _ in watchdog.stalls),
+            )
+        for line in get_metrics().get_summary_lines():
+            logger.info(line)
+        slow_log = _transfer_context.get("slow_log")
+        if slow_log is not None and slow_log.offenders:
+            logger.info("slowest operations by total time:")
+            for line in slow_log.get_summary_lines():
+                logger.info(line)
+        run_status = "cancelled" if cancelled else "ok"
     finally:
+        run_history: history.RunHistory | None = _transfer_context.get("run_history")
+        if run_history is not None:
+            try:
+                run_history.finish_run(run_status)
+            except sqlite3.Error as e:
+                logger.warning("could not record run history - %s", e)
+            run_history.close()
+        if watchdog is not None:
+            await watchdog.stop()
+        if renderer is not None:
+            await renderer.stop()
+        _shutdown_transform_executor()
+        if _transfer_context.get("dead_letter") is not None:
+            _transfer_context["dead_letter"].close()
+        if _transfer_context.get("slow_log") is not None:
+            _transfer_context["slow_log"].close()
         # close connections
         logger.info("closing connections")
         await close_connections()
 
 
+async def extract_table(
+    config: ac.Config,
+    src_table: ac.SourceTableBlock,
+    staging_dir: str,
+    force: bool = False,
+) -> bool:
+    """Extracts one source table to a staging file.
+    The staging file is reused if the source database file has not changed since it was written.
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param staging_dir: staging directory
+    :type staging_dir: str
+    :param force: extract even if the staging file is current, defaults to False
+    :type force: bool, optional
+    :return: whether the extract succeeded
+    :rtype: bool
+    """
+    global _src_cur
+
+    logger = logging.getLogger("process.extract_table")
+    start_time = time.time()
+
+    src_table_name = src_table.table_pointer.table_name
+    src_dsn_params = get_src_dsn_params(config, src_table)
+    src_columns = list(src_table.columns.keys())
+    staging_path = staging.get_staging_path(staging_dir, src_table.table_pointer)
+    source_fingerprint = staging.get_source_fingerprint(src_dsn_params)
+
+    if not force and staging.is_staging_current(
+        staging_path, src_columns, source_fingerprint
+    ):
+        logger.info(f"staging file for [{src_table_name}] is current, skipping")
+        return True
+
+    source = None
+    try:
+        source = _create_source(config, src_table)
+        logger.info("opening source table [%s]", src_table_name)
+        await source.open()
+        await source.validate()
+
+        header = {
+            "table": str(src_table.table_pointer),
+            "columns": src_columns,
+            "source_fingerprint": source_fingerprint,
+            "created": time.time(),
+        }
+        with staging.StagingWriter(staging_path, header) as writer:
+            async for src_rows in source.chunks(staging.STAGING_CHUNK_ROWS):
+                writer.write_rows(src_rows)
+        logger.info(
+            f"extracted {writer.row_count} rows from [{src_table_name}] to {staging_path} in {time.time() - start_time:.2f}s"
+        )
+        return True
+    except ac.ValidationError as e:
+        logger.error("validation failed - %s", e)
+        return False
+    except Exception as e:
+        logger.error("unhandled exception - %s", e)
+        return False
+    finally:
+        if source is not None:
+            await source.close()
+
+
+async def extract(config: ac.Config, staging_dir: str, force: bool = False) -> bool:
+    """Extracts all source tables in the config to staging files, which can be loaded with ``transfer(config, staging_dir=...)``
+
+    :param config: config
+    :type config: ac.Config
+    :param staging_dir: staging directory
+    :type staging_dir: str
+    :param force: extract even if the staging files are current, defaults to False
+    :type force: bool, optional
+    :return: whether all tables were extracted
+    :rtype: bool
+    """
+    logger = logging.getLogger("process.extract")
+
+    try:
+        logger.info("validating config")
+        config.validate()
+    except ac.ValidationError as e:
+        logger.error("config failed validation - %s", e)
+        return False
+
+    success = True
+    try:
+        reset_transfer_context(config)
+        for src_table in config.sources:
+            if not await extract_table(config, src_table, staging_dir, force):
+                logger.warning(f"extract from {src_table} failed")
+                success = False
+    finally:
+        logger.info("closing connections")
+        await close_connections()
+    return success
+
+
+def get_inspection_sources(config: ac.Config) -> dict[str, tuple[dict, str, str]]:
+    """Gets the distinct source databases referenced by the config
+
+    :param config: config
+    :type config: ac.Config
+    :return: DSN params, connection string and backend by database key
+    :rtype: dict[str, tuple[dict, str, str]]
+    """
+    sources = {}
+    for src_table in config.sources:
+        src_dsn_params = get_src_dsn_params(config, src_table)
+        key = inspection.get_database_key(src_dsn_params)
+        if key not in sources:
+            sources[key] = (
+                src_dsn_params,
+                create_conn_str(src_dsn_params),
+                get_src_backend(config, src_table),
+            )
+    return sources
+
+
+async def inspect(
+    config: ac.Config, inspection_path: str, force: bool = False
+) -> inspection.SourceInspection:
+    """Inspects every source database referenced by the config concurrently and stores the result in a snapshot.
+    Databases whose file has not changed since the last inspection are kept as they are.
+
+    :param config: config
+    :type config: ac.Config
+    :param inspection_path: snapshot path
+    :type inspection_path: str
+    :param force: inspect all databases again, defaults to False
+    :type force: bool, optional
+    :return: inspection
+    :rtype: inspection.SourceInspection
+    """
+    logger = logging.getLogger("process.inspect")
+    start_time = time.time()
+    source_inspection = inspection.SourceInspection.load(inspection_path)
+    refreshed = await source_inspection.refresh(get_inspection_sources(config), force)
+    if refreshed:
+        source_inspection.save(inspection_path)
+    logger.info(
+        f"inspected {len(refreshed)} databases in {time.time() - start_time:.2f}s, snapshot at {inspection_path}"
+    )
+    return source_inspection
+
+
+async def validate_live(config: ac.Config) -> list[str]:
+    """Validates the config against the live source and target databases without moving any data.
+    Every source database and target connection is checked concurrently, and all problems are collected.
+
+    Source tables must exist and have every mapped and map function column, with types that fit the target columns.
+    Sources whose file is unchanged since ``accex inspect`` are checked against the inspection snapshot instead.
+    Target tables and their constraints are created in a scratch schema that is rolled back.
+
+    :param config: config
+    :type config: ac.Config
+    :return: problems, empty if the config can be transferred
+    :rtype: list[str]
+    """
+    logger = logging.getLogger("process.validate")
+    start_time = time.time()
+
+    try:
+        config.validate()
+    except ac.ValidationError as e:
+        return [f"config failed validation - {e}"]
+
+    problems = []
+    for tgt_table in config.targets.values():
+        problems += preflight.check_target_definitions(tgt_table)
+    if problems:
+        return problems
+
+    source_inspection = None
+    if config.inspection_path:
+        try:
+            source_inspection = inspection.SourceInspection.load(config.inspection_path)
+        except inspection.InspectionError as e:
+            logger.warning("not using inspection snapshot - %s", e)
+
+    src_databases: dict[str, list[ac.SourceTableBlock]] = {}
+    for src_table in config.sources:
+        key = inspection.get_database_key(get_src_dsn_params(config, src_table))
+        src_databases.setdefault(key, []).append(src_table)
+    src_sources = get_inspection_sources(config)
+
+    async def check_src_database(key: str, src_tables: list[ac.SourceTableBlock]):
+        dsn_params, conn_str, backend = src_sources[key]
+        table_names = [t.table_pointer.table_name for t in src_tables]
+        try:
+            if source_inspection is not None and source_inspection.is_current(
+                dsn_params
+            ):
+                tables = source_inspection.databases[key]["tables"]
+            elif backend == "native":
+                tables = await asyncio.to_thread(
+                    inspection.inspect_native_database,
+                    str(get_dsn_param(dsn_params, "DBQ")),
+                    table_names,
+                    False,
+                )
+            else:
+                tables = await inspection.inspect_odbc_database(
+                    conn_str, table_names, False
+                )
+        except Exception as e:
+            return [f"[{key}] could not read source database - {e}"]
+        database_problems = []
+        for src_table in src_tables:
+            database_problems += preflight.check_source_table(
+                config,
+                src_table,
+                inspection.find_table(tables, src_table.table_pointer.table_name),
+            )
+        return database_problems
+
+    tgt_connections: dict[str, list[ac.TargetTableBlock]] = {}
+    for tgt_table in config.targets.values():
+        tgt_conn_str = create_conn_str(get_tgt_dsn_params(config, tgt_table))
+        tgt_connections.setdefault(tgt_conn_str, []).append(tgt_table)
+
+    async def check_tgt_connection(
+        tgt_conn_str: str, tgt_tables: list[ac.TargetTableBlock]
+    ):
+        # constraints are added after all tables exist, so tables can be created in any order
+        statements = [
+            (t.name, get_create_table_sql(t, bulk_load=True)) for t in tgt_tables
+        ]
+        foreign_key_statements = []
+        for tgt_table in tgt_tables:
+            key_sql, foreign_key_sql, _ = get_deferred_constraint_sql(tgt_table)
+            statements += [(tgt_table.name, sql) for sql in key_sql]
+            foreign_key_statements += [(tgt_table.name, sql) for sql in foreign_key_sql]
+        try:
+            async with aioodbc.connect(dsn=tgt_conn_str, autocommit=False) as conn:
+                return await preflight.check_target_ddl(
+                    conn, statements + foreign_key_statements
+                )
+        except Exception as e:
+            return [
+                f"[{', '.join(t.name for t in tgt_tables)}] could not check target tables - {e}"
+            ]
+
+    results = await asyncio.gather(
+        *(check_src_database(k, v) for k, v in src_databases.items()),
+        *(check_tgt_connection(k, v) for k, v in tgt_connections.items()),
+    )
+    for result in results:
+        problems += result
+    logger.info(
+        f"validated {len(config.sources)} source tables and {len(config.targets)} target tables in {time.time() - start_time:.2f}s"
+    )
+    return problems
+
+
+_COMMANDS = {
+    "transfer": "transfer tables from the sources to the targets",
+    "extract": "extract source tables to staging files",
+    "load": "load target tables from staging files",
+    "inspect": "inspect source databases and store their schema and row counts",
+    "validate": "validate the config, and with --live the source and target databases",
+    "report": "compare the latest run with earlier runs and flag tables whose throughput dropped",
+}
+
+
+def populate_arg_parser(
+    parser: argparse.ArgumentParser, command: str = "transfer"
+) -> argparse.ArgumentParser:
+    ac.populate_arg_parser(parser)
+    if command in ("extract", "load"):
+        parser.add_argument(
+            "--staging-dir",
+            type=str,
+            help=f"directory for staging files, defaults to STAGING_DIR in the config or {staging.STAGING_DIR_DEFAULT}",
+        )
+    if command in ("transfer", "extract"):
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="read source database files from local copies, same as SOURCE_SNAPSHOT in the config",
+        )
+        parser.add_argument(
+            "--snapshot-dir",
+            type=str,
+            help=f"directory for local copies of source database files, defaults to SNAPSHOT_DIR in the config or {snapshot.SNAPSHOT_DIR_DEFAULT}",
+        )
+    if command in ("transfer", "load"):
+        parser.add_argument(
+            "--shadow-load",
+            action="store_true",
+            help="load into shadow tables and swap them in after all tables are loaded, same as SHADOW_LOAD in the config",
+        )
+        parser.add_argument(
+            "--bulk-load",
+            action="store_true",
+            help="create target tables without constraints and add them after all tables are loaded, same as BULK_LOAD in the config",
+        )
+        parser.add_argument(
+            "--source-count",
+            choices=ac.source_count_modes,
+            help=f"how source rows are counted for progress, same as SOURCE_COUNT in the config, defaults to {ac.source_default_count_mode}",
+        )
+        parser.add_argument(
+            "--verify-counts",
+            action="store_true",
+            help="count the rows of each target table after loading it, same as VERIFY_COUNTS in the config",
+        )
+        parser.add_argument(
+            "--loop-watchdog",
+            type=float,
+            nargs="?",
+            const=ac.loop_default_stall_threshold,
+            metavar="SECONDS",
+            help="report callbacks that block the event loop for longer than SECONDS (0.1 by default) with a stack sample, same as LOOP_WATCHDOG in the config",
+        )
+        parser.add_argument(
+            "--slow-log-path",
+            type=str,
+            help="write fetches, lookups and inserts slower than the threshold to this rotating JSON lines file, same as SLOW_LOG_PATH in the config",
+        )
+        parser.add_argument(
+            "--slow-log-threshold",
+            type=float,
+            metavar="SECONDS",
+            help=f"seconds an operation may take before it is written to the slow log, defaults to SLOW_LOG_THRESHOLD in the config or {SLOW_LOG_THRESHOLD_DEFAULT}",
+        )
+        parser.add_argument(
+            "--prevalidate",
+            action="store_true",
+            help="check chunks against the target column definitions before inserting them, same as PREVALIDATE in the config",
+        )
+        parser.add_argument(
+            "--dead-letter-path",
+            type=str,
+            help="skip rows rejected by the target database and write them to this JSON lines file, same as DEAD_LETTER_PATH in the config",
+        )
+    if command in ("transfer", "load", "report"):
+        parser.add_argument(
+            "--history-path",
+            type=str,
+            help=f"path of the run history database, defaults to HISTORY_PATH in the config or {history.HISTORY_PATH_DEFAULT}",
+        )
+    if command in ("transfer", "load"):
+        parser.add_argument(
+            "--record-history",
+            action="store_true",
+            help="record the run in the run history, same as RECORD_HISTORY: true in the config",
+        )
+        parser.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help="skip target tables whose source tables and config blocks are unchanged since their last load, same as SKIP_UNCHANGED in the config",
+        )
+        parser.add_argument(
+            "--manifest-path",
+            type=str,
+            help=f"path of the run manifest used by --skip-unchanged, defaults to MANIFEST_PATH in the config or {manifest.MANIFEST_PATH_DEFAULT}",
+        )
+    if command in ("transfer", "load", "inspect", "validate"):
+        parser.add_argument(
+            "--inspection-path",
+            type=str,
+            help=f"path of the source inspection snapshot, defaults to INSPECTION_PATH in the config"
+            + (
+                f" or {inspection.INSPECTION_PATH_DEFAULT}"
+                if command == "inspect"
+                else ""
+            ),
+        )
+    if command == "extract":
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="extract tables even if their staging files are current",
+        )
+    if command == "validate":
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="check source columns, types and target DDL against the databases",
+        )
+    if command == "report":
+        parser.add_argument(
+            "--run",
+            type=int,
+            metavar="ID",
+            help="run to report, defaults to the latest run",
+        )
+        parser.add_argument(
+            "--baseline-runs",
+            type=int,
+            default=history.HISTORY_BASELINE_RUNS_DEFAULT,
+            metavar="N",
+            help=f"amount of earlier transfers of each table in the baseline, defaults to {history.HISTORY_BASELINE_RUNS_DEFAULT}",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=history.HISTORY_DROP_THRESHOLD_DEFAULT,
+            help=f"fraction the throughput may drop below the baseline before a table is flagged, defaults to {history.HISTORY_DROP_THRESHOLD_DEFAULT}",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="exit with status 1 if a table is flagged",
+        )
+    if command == "inspect":
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="inspect databases even if their files have not changed",
+        )
+        parser.add_argument(
+            "--gencols",
+            nargs="+",
+            metavar="TABLE",
+            help="print source and target config blocks for inspected tables",
+        )
+    return parser
+
+
+def generate_config_columns(
+    config: ac.Config,
+    source_inspection: inspection.SourceInspection,
+    table_names: list[str],
+) -> str:
+    """Generates config blocks for inspected tables of the config's source databases
+
+    :param config: config
+    :type config: ac.Config
+    :param source_inspection: inspection
+    :type source_inspection: inspection.SourceInspection
+    :param table_names: source table names
+    :type table_names: list[str]
+    :raises ValueError: if a table was not inspected
+    :return: YAML with ``SOURCES`` and ``TARGETS``
+    :rtype: str
+    """
+    sources = []
+    targets = []
+    for table_name in table_names:
+        for src_dsn_params, _, _ in get_inspection_sources(config).values():
+            table = source_inspection.get_table(src_dsn_params, table_name)
+            if table is not None:
+                break
+        else:
+            raise ValueError(
+                f"no inspected source database has a table named [{table_name}]"
+            )
+        dbq = get_dsn_param(src_dsn_params, "DBQ")
+        source, target = inspection.generate_table_config(
+            table_name, table, {"DBQ": dbq} if dbq else None
+        )
+        sources.append(source)
+        targets.append(target)
+    return yaml.safe_dump(
+        {"SOURCES": sources, "TARGETS": targets}, sort_keys=False, allow_unicode=True
+    )
+
+
 async def _main():
-    arg_parser = argparse.ArgumentParser(prog="accex")
-    ac.populate_arg_parser(arg_parser)
-    args = arg_parser.parse_args()
-    logging.basicConfig(level=logging.getLevelNamesMapping()[args.log_level])
+    argv = sys.argv[1:]
+    command = "transfer"
+    if argv and argv[0] in _COMMANDS:
+        command = argv.pop(0)
+
+    arg_parser = argparse.ArgumentParser(
+        prog=f"accex {command}", description=_COMMANDS[command]
+    )
+    populate_arg_parser(arg_parser, command)
+    args = arg_parser.parse_args(argv)
+    # handlers write on a background thread, so slow output does not stall the transfer
+    listener = setup_queue_logging(logging.getLevelNamesMapping()[args.log_level])
+    try:
+        await _run_command(command, args)
+    finally:
+        # writes the records still in the queue
+        listener.stop()
+
+
+async def _run_command(command: str, args: argparse.Namespace):
     config_path = ac.resolve_config_path(args.config_path)
 
     if not config_path:
         raise ValueError("no config file could be found")
 
     config = ac.parse_config_file(config_path)
+    if getattr(args, "snapshot", False):
+        config["SOURCE_SNAPSHOT"] = True
+    if getattr(args, "snapshot_dir", None):
+        config["SNAPSHOT_DIR"] = args.snapshot_dir
+    if getattr(args, "bulk_load", False):
+        config["BULK_LOAD"] = True
+    if getattr(args, "shadow_load", False):
+        config["SHADOW_LOAD"] = True
+    if getattr(args, "inspection_path", None):
+        config["INSPECTION_PATH"] = args.inspection_path
+    if getattr(args, "source_count", None):
+        config["SOURCE_COUNT"] = args.source_count
+    if getattr(args, "verify_counts", False):
+        config["VERIFY_COUNTS"] = True
+    if getattr(args, "loop_watchdog", None) is not None:
+        config["LOOP_WATCHDOG"] = args.loop_watchdog
+    if getattr(args, "slow_log_path", None):
+        config["SLOW_LOG_PATH"] = args.slow_log_path
+    if getattr(args, "slow_log_threshold", None) is not None:
+        config["SLOW_LOG_THRESHOLD"] = args.slow_log_threshold
+    if getattr(args, "prevalidate", False):
+        config["PREVALIDATE"] = True
+    if getattr(args, "dead_letter_path", None):
+        config["DEAD_LETTER_PATH"] = args.dead_letter_path
+    if getattr(args, "history_path", None):
+        config["HISTORY_PATH"] = args.history_path
+    if getattr(args, "record_history", False):
+        config["RECORD_HISTORY"] = True
+    if getattr(args, "skip_unchanged", False):
+        config["SKIP_UNCHANGED"] = True
+    if getattr(args, "manifest_path", None):
+        config["MANIFEST_PATH"] = args.manifest_path
 
     logger = logging.getLogger("process")
 
-    logger.info("transfering tables")
-
-    await transfer(config)
+    if command == "extract":
+        logger.info("extracting tables")
+        await extract(
+            config,
+            args.staging_dir or config.staging_dir or staging.STAGING_DIR_DEFAULT,
+            args.force,
+        )
+    elif command == "validate":
+        if args.live:
+            problems = await validate_live(config)
+        else:
+            try:
+                config.validate()
+                problems = []
+            except ac.ValidationError as e:
+                problems = [f"config failed validation - {e}"]
+        for problem in problems:
+            logger.error(problem)
+        if problems:
+            logger.error(f"found {len(problems)} problems")
+            sys.exit(1)
+        logger.info("config is valid")
+    elif command == "inspect":
+        logger.info("inspecting source databases")
+        source_inspection = await inspect(
+            config,
+            config.inspection_path or inspection.INSPECTION_PATH_DEFAULT,
+            args.force,
+        )
+        if args.gencols:
+            print(generate_config_columns(config, source_inspection, args.gencols))
+    elif command == "report":
+        history_path = config.history_path or history.HISTORY_PATH_DEFAULT
+        if not os.path.exists(history_path):
+            logger.error(f"no run history at {history_path}")
+            sys.exit(1)
+        run_history = history.RunHistory(history_path)
+        try:
+            run = run_history.get_run(args.run)
+            if run is None:
+                logger.error(f"no run to report in {history_path}")
+                sys.exit(1)
+            comparisons = run_history.compare_run(
+                run["id"], args.baseline_runs, args.threshold
+            )
+        finally:
+            run_history.close()
+        print(history.format_report(run, comparisons))
+        regressed = [c for c in comparisons if c.regressed]
+        for c in regressed:
+            logger.warning(
+                f"throughput of [{c.stats.source}] to [{c.stats.target}] dropped {-100 * c.change:.0f}% "
+                f"below the median of its last {c.baseline_runs} transfers"
+            )
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+    elif command == "load":
+        logger.info("loading tables")
+        await transfer(
+            config,
+            staging_dir=args.staging_dir
+            or config.staging_dir
+            or staging.STAGING_DIR_DEFAULT,
+        )
+    else:
+        logger.info("transfering tables")
+        await transfer(config)
 
     logger.info("finished")
@@ -0,0 +1,105 @@
+import pyodbc
+
+
+class EncodingError(Exception):
+    pass
+
+
+_SQL_TYPES = {
+    "SQL_CHAR": pyodbc.SQL_CHAR,
+    "SQL_WCHAR": pyodbc.SQL_WCHAR,
+    "SQL_WMETADATA": pyodbc.SQL_WMETADATA,
+}
+
+
+class ConnectionEncoding:
+    """Character encoding settings of a connection.
+
+    ``decodings`` maps ``SQL_CHAR``, ``SQL_WCHAR`` or ``SQL_WMETADATA`` to the encoding used to decode text the driver returns.
+    ``encoding`` and ``ctype`` are used for text parameters, ``SQL_CHAR`` binds narrow strings and ``SQL_WCHAR`` binds wide strings.
+    """
+
+    def __init__(
+        self,
+        decodings: dict[str, str] | None = None,
+        encoding: str | None = None,
+        ctype: str | None = None,
+    ) -> None:
+        self.decodings = decodings or dict()
+        self.encoding = encoding
+        self.ctype = ctype
+        for sql_type in list(self.decodings) + ([ctype] if ctype else []):
+            if sql_type not in _SQL_TYPES:
+                raise EncodingError(
+                    f"unknown SQL type {sql_type}, must be one of [{', '.join(_SQL_TYPES)}]"
+                )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(decodings={self.decodings}, encoding={self.encoding}, ctype={self.ctype})"
+
+    def __eq__(self, __value: object) -> bool:
+        if not isinstance(__value, ConnectionEncoding):
+            return False
+        return (self.decodings, self.encoding, self.ctype) == (
+            __value.decodings,
+            __value.encoding,
+            __value.ctype,
+        )
+
+    def apply(self, conn: pyodbc.Connection) -> None:
+        """Applies the settings to a newly created connection
+
+        :param conn: connection
+        :type conn: pyodbc.Connection
+        """
+        for sql_type, encoding in self.decodings.items():
+            conn.setdecoding(_SQL_TYPES[sql_type], encoding=encoding)
+        if self.encoding:
+            if self.ctype:
+                conn.setencoding(encoding=self.encoding, ctype=_SQL_TYPES[self.ctype])
+            else:
+                conn.setencoding(encoding=self.encoding)
+
+
+ENCODING_PRESETS = {
+    "default": ConnectionEncoding(),
+    "utf8": ConnectionEncoding(
+        {"SQL_CHAR": "utf-8", "SQL_WCHAR": "utf-8"}, "utf-8", "SQL_CHAR"
+    ),
+    "utf8_narrow": ConnectionEncoding({"SQL_CHAR": "utf-8"}, "utf-8", "SQL_CHAR"),
+    "utf16_wide": ConnectionEncoding(
+        {"SQL_WCHAR": "utf-16le"}, "utf-16le", "SQL_WCHAR"
+    ),
+    "latin1_narrow": ConnectionEncoding(
+        {"SQL_CHAR": "latin-1", "SQL_WCHAR": "utf-16le"}, "latin-1", "SQL_CHAR"
+    ),
+}
+"""
+Named encoding settings that can be selected with ``SOURCE_ENCODING``, ``TARGET_ENCODING`` or a table's ``ENCODING``.
+"""
+
+
+def parse_connection_encoding(value: str | dict | None) -> ConnectionEncoding | None:
+    """Parses encoding settings from a config, either a preset name or a mapping such as
+    ``{"SQL_CHAR": "utf-8", "ENCODING": "utf-8", "CTYPE": "SQL_CHAR"}``
+
+    :param value: preset name or settings
+    :type value: str | dict | None
+    :raises EncodingError: if the preset or a SQL type is unknown
+    :return: encoding settings, or None if not set
+    :rtype: ConnectionEncoding | None
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value not in ENCODING_PRESETS:
+            raise EncodingError(
+                f"unknown encoding preset {value}, must be one of [{', '.join(ENCODING_PRESETS)}]"
+            )
+        return ENCODING_PRESETS[value]
+    value = dict((str(k).upper(), v) for k, v in value.items())
+    return ConnectionEncoding(
+        dict((k, v) for k, v in value.items() if k in _SQL_TYPES),
+        value.get("ENCODING"),
+        value.get("CTYPE"),
+    )
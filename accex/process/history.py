@@ -0,0 +1,429 @@
+import time
+import sqlite3
+import logging
+import statistics
+from .slowlog import get_value_size
+
+HISTORY_VERSION = 1
+"""
+Version of the run history schema.
+"""
+
+HISTORY_PATH_DEFAULT = "accex_history.sqlite"
+"""
+Default path of the run history database, relative to the working directory.
+"""
+
+HISTORY_BASELINE_RUNS_DEFAULT = 5
+"""
+Default amount of earlier runs the latest run of a table is compared against.
+"""
+
+HISTORY_DROP_THRESHOLD_DEFAULT = 0.2
+"""
+Default fraction the throughput of a table may drop below its baseline before it is flagged.
+"""
+
+HISTORY_SIZE_SAMPLE_ROWS = 16
+"""
+Amount of rows of each chunk that are sized for the bytes of a table, the size of the other rows is estimated from them.
+"""
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        command TEXT NOT NULL,
+        status TEXT NOT NULL,
+        started REAL NOT NULL,
+        finished REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS table_runs (
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        source TEXT NOT NULL,
+        target TEXT NOT NULL,
+        status TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        rejected INTEGER NOT NULL,
+        bytes INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        chunk_size INTEGER NOT NULL,
+        chunk_count INTEGER NOT NULL,
+        source_backend TEXT,
+        lookup_strategy TEXT,
+        load_mode TEXT,
+        reconnects INTEGER NOT NULL,
+        error TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS table_runs_table ON table_runs (source, target, run_id)",
+)
+
+_TABLE_RUN_COLUMNS = (
+    "source",
+    "target",
+    "status",
+    "rows",
+    "rejected",
+    "bytes",
+    "duration",
+    "chunk_size",
+    "chunk_count",
+    "source_backend",
+    "lookup_strategy",
+    "load_mode",
+    "reconnects",
+    "error",
+)
+
+
+def get_rows_size(rows: list[list], sample_rows: int = HISTORY_SIZE_SAMPLE_ROWS) -> int:
+    """Gets the approximate size of rows in bytes, estimated from evenly spaced rows when there are more than ``sample_rows``
+
+    :param rows: rows
+    :type rows: list[list]
+    :param sample_rows: amount of rows that are sized, defaults to HISTORY_SIZE_SAMPLE_ROWS
+    :type sample_rows: int, optional
+    :return: size
+    :rtype: int
+    """
+    if len(rows) <= sample_rows:
+        return sum(get_value_size(v) for row in rows for v in row)
+    step = len(rows) / sample_rows
+    sample_size = sum(
+        get_value_size(v) for i in range(sample_rows) for v in rows[int(i * step)]
+    )
+    return round(sample_size * len(rows) / sample_rows)
+
+
+class TableStats:
+    """Stats of one source table transferred in a run"""
+
+    def __init__(self, source: str, target: str) -> None:
+        """Constructs new stats
+
+        :param source: source table name
+        :type source: str
+        :param target: target table name
+        :type target: str
+        """
+        self.source = source
+        self.target = target
+        self.status = "failed"
+        self.rows = 0
+        self.rejected = 0
+        self.bytes = 0
+        self.duration = 0.0
+        self.chunk_size = 0
+        self.chunk_count = 0
+        self.source_backend: str | None = None
+        self.lookup_strategy: str | None = None
+        self.load_mode: str | None = None
+        self.reconnects = 0
+        self.error: str | None = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.source} -> {self.target}, {self.status}, {self.rows} rows)"
+
+    @property
+    def throughput(self) -> float | None:
+        """Inserted rows per second"""
+        return self.rows / self.duration if self.duration > 0 else None
+
+    def to_dict(self) -> dict:
+        return dict((k, getattr(self, k)) for k in _TABLE_RUN_COLUMNS)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TableStats":
+        stats = cls(d["source"], d["target"])
+        for k in _TABLE_RUN_COLUMNS:
+            if k in d:
+                setattr(stats, k, d[k])
+        return stats
+
+
+class TableComparison:
+    """Throughput of a table in the latest run compared with its baseline"""
+
+    def __init__(
+        self,
+        stats: TableStats,
+        baseline: float | None,
+        baseline_runs: int,
+        threshold: float,
+    ) -> None:
+        self.stats = stats
+        self.baseline = baseline
+        self.baseline_runs = baseline_runs
+        self.threshold = threshold
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.stats.source} -> {self.stats.target}, change={self.change})"
+
+    @property
+    def change(self) -> float | None:
+        """Fraction the throughput changed by, negative if it dropped"""
+        throughput = self.stats.throughput
+        if throughput is None or not self.baseline:
+            return None
+        return throughput / self.baseline - 1
+
+    @property
+    def regressed(self) -> bool:
+        change = self.change
+        return change is not None and change < -self.threshold
+
+
+class RunHistory:
+    """Stats of every run and its tables in a SQLite database, which is created when it is opened.
+
+    .. code-block:: python
+
+        history = RunHistory("accex_history.sqlite")
+        history.start_run("transfer")
+        history.add_table(stats)
+        history.finish_run("ok")
+        history.close()
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.run_id: int | None = None
+        self._conn: sqlite3.Connection | None = None
+
+    def open(self) -> None:
+        if self._conn is not None:
+            return
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > HISTORY_VERSION:
+            self.close()
+            raise sqlite3.DatabaseError(
+                f"run history {self.path} has version {version}, expected at most {HISTORY_VERSION}"
+            )
+        with self._conn:
+            for sql in _SCHEMA:
+                self._conn.execute(sql)
+            self._conn.execute(f"PRAGMA user_version = {HISTORY_VERSION}")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def start_run(self, command: str) -> int:
+        """Starts recording a run
+
+        :param command: command of the run, such as ``transfer`` or ``load``
+        :type command: str
+        :return: run id
+        :rtype: int
+        """
+        self.open()
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (command, status, started) VALUES (?, ?, ?)",
+                (command, "running", time.time()),
+            )
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def add_table(self, stats: TableStats) -> None:
+        """Records the stats of a table in the current run, committed right away so they survive a crash
+
+        :param stats: table stats
+        :type stats: TableStats
+        """
+        if self.run_id is None:
+            raise ValueError("no run was started")
+        with self._conn:
+            self._conn.execute(
+                f"INSERT INTO table_runs (run_id, {', '.join(_TABLE_RUN_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(_TABLE_RUN_COLUMNS))})",
+                (self.run_id, *(getattr(stats, k) for k in _TABLE_RUN_COLUMNS)),
+            )
+
+    def finish_run(self, status: str) -> None:
+        """Finishes recording the current run
+
+        :param status: status of the run, such as ``ok`` or ``cancelled``
+        :type status: str
+        """
+        if self.run_id is None:
+            return
+        with self._conn:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished = ? WHERE id = ?",
+                (status, time.time(), self.run_id),
+            )
+        self.run_id = None
+
+    def get_runs(self, limit: int | None = None) -> list[dict]:
+        """Gets runs, newest first
+
+        :param limit: maximum amount of runs, defaults to None for all runs
+        :type limit: int | None, optional
+        :return: runs with ``id``, ``command``, ``status``, ``started`` and ``finished``
+        :rtype: list[dict]
+        """
+        self.open()
+        rows = self._conn.execute(
+            "SELECT * FROM runs ORDER BY id DESC LIMIT ?",
+            (-1 if limit is None else limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_run(self, run_id: int | None = None) -> dict | None:
+        """Gets a run
+
+        :param run_id: run id, defaults to None for the latest run
+        :type run_id: int | None, optional
+        :return: run, or None if there is no such run
+        :rtype: dict | None
+        """
+        if run_id is None:
+            runs = self.get_runs(1)
+            return runs[0] if runs else None
+        self.open()
+        row = self._conn.execute(
+            "SELECT * FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        return None if row is None else dict(row)
+
+    def get_table_stats(self, run_id: int) -> list[TableStats]:
+        """Gets the stats of the tables of a run, in the order they were transferred
+
+        :param run_id: run id
+        :type run_id: int
+        :return: table stats
+        :rtype: list[TableStats]
+        """
+        self.open()
+        rows = self._conn.execute(
+            "SELECT * FROM table_runs WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ).fetchall()
+        return [TableStats.from_dict(dict(row)) for row in rows]
+
+    def get_table_history(
+        self,
+        source: str,
+        target: str,
+        before_run_id: int | None = None,
+        limit: int = HISTORY_BASELINE_RUNS_DEFAULT,
+    ) -> list[TableStats]:
+        """Gets the stats of the successful transfers of a table, newest first.
+        Schedulers and ETA estimates can use these to predict how long a table takes.
+
+        :param source: source table name
+        :type source: str
+        :param target: target table name
+        :type target: str
+        :param before_run_id: only runs before this run, defaults to None for all runs
+        :type before_run_id: int | None, optional
+        :param limit: maximum amount of transfers, defaults to HISTORY_BASELINE_RUNS_DEFAULT
+        :type limit: int, optional
+        :return: table stats
+        :rtype: list[TableStats]
+        """
+        self.open()
+        rows = self._conn.execute(
+            "SELECT * FROM table_runs WHERE source = ? AND target = ? AND status = 'ok' "
+            "AND run_id < ? ORDER BY run_id DESC LIMIT ?",
+            (
+                source,
+                target,
+                before_run_id if before_run_id is not None else 2**63 - 1,
+                limit,
+            ),
+        ).fetchall()
+        return [TableStats.from_dict(dict(row)) for row in rows]
+
+    def compare_run(
+        self,
+        run_id: int | None = None,
+        baseline_runs: int = HISTORY_BASELINE_RUNS_DEFAULT,
+        threshold: float = HISTORY_DROP_THRESHOLD_DEFAULT,
+    ) -> list[TableComparison]:
+        """Compares the throughput of each table in a run with the median throughput of its earlier transfers
+
+        :param run_id: run id, defaults to None for the latest run
+        :type run_id: int | None, optional
+        :param baseline_runs: amount of earlier transfers in the baseline, defaults to HISTORY_BASELINE_RUNS_DEFAULT
+        :type baseline_runs: int, optional
+        :param threshold: fraction the throughput may drop before a table is flagged, defaults to HISTORY_DROP_THRESHOLD_DEFAULT
+        :type threshold: float, optional
+        :return: comparisons, in the order the tables were transferred
+        :rtype: list[TableComparison]
+        """
+        if run_id is None:
+            run = self.get_run()
+            if run is None:
+                return []
+            run_id = run["id"]
+        comparisons = []
+        for stats in self.get_table_stats(run_id):
+            history = [
+                s.throughput
+                for s in self.get_table_history(
+                    stats.source, stats.target, run_id, baseline_runs
+                )
+                if s.throughput is not None
+            ]
+            comparisons.append(
+                TableComparison(
+                    stats,
+                    statistics.median(history) if history else None,
+                    len(history),
+                    threshold,
+                )
+            )
+        return comparisons
+
+
+def format_report(run: dict, comparisons: list[TableComparison]) -> str:
+    """Formats the comparison of a run with its baseline as a table
+
+    :param run: run, as returned by ``RunHistory.get_runs``
+    :type run: dict
+    :param comparisons: comparisons of the tables of the run
+    :type comparisons: list[TableComparison]
+    :return: report
+    :rtype: str
+    """
+    lines = [
+        f"run {run['id']} ({run['command']}, {run['status']}) started "
+        + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"])),
+        f"{'table':<40} {'status':<8} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'baseline':>10} {'change':>8}",
+    ]
+    for c in comparisons:
+        throughput = c.stats.throughput
+        change = c.change
+        lines.append(
+            f"{(c.stats.source + ' -> ' + c.stats.target)[:40]:<40} {c.stats.status:<8} {c.stats.rows:>10} "
+            f"{c.stats.duration:>9.2f} {'' if throughput is None else f'{throughput:,.0f}':>10} "
+            f"{'' if c.baseline is None else f'{c.baseline:,.0f}':>10} "
+            f"{'' if change is None else f'{100 * change:+.0f}%':>8}"
+            + ("  SLOWER" if c.regressed else "")
+        )
+    return "\n".join(lines)
+
+
+def open_run_history(path: str, command: str) -> RunHistory | None:
+    """Opens the run history and starts recording a run, logging a warning if it cannot be opened
+
+    :param path: path of the run history database
+    :type path: str
+    :param command: command of the run
+    :type command: str
+    :return: run history, or None if it cannot be opened
+    :rtype: RunHistory | None
+    """
+    history = RunHistory(path)
+    try:
+        history.start_run(command)
+    except sqlite3.Error as e:
+        logging.getLogger("process.history").warning(
+            f"not recording run history in {path} - {e}"
+        )
+        history.close()
+        return None
+    return history
@@ -0,0 +1,369 @@
+import os
+import re
+import json
+import time
+import hashlib
+import asyncio
+import logging
+import aioodbc
+from .. import access
+from .catalog import CatalogCache
+from .staging import get_source_fingerprint
+from .util import get_dsn_param
+
+
+class InspectionError(Exception):
+    pass
+
+
+INSPECTION_VERSION = 1
+"""
+Version of the inspection snapshot format, snapshots of other versions are inspected again.
+"""
+INSPECTION_PATH_DEFAULT = "accex_inspection.json"
+"""
+Default path of the inspection snapshot, relative to the working directory.
+"""
+
+_POSTGRES_TYPES = {
+    "counter": "int",
+    "long": "int",
+    "integer": "int",
+    "smallint": "smallint",
+    "byte": "smallint",
+    "bigint": "bigint",
+    "single": "real",
+    "real": "real",
+    "double": "double precision",
+    "float": "double precision",
+    "currency": "numeric(19, 4)",
+    "decimal": "numeric",
+    "numeric": "numeric",
+    "bit": "boolean",
+    "boolean": "boolean",
+    "datetime": "timestamp",
+    "char": "text",
+    "varchar": "text",
+    "text": "text",
+    "longchar": "text",
+    "memo": "text",
+    "guid": "uuid",
+    "binary": "bytea",
+    "varbinary": "bytea",
+    "longbinary": "bytea",
+    "ole": "bytea",
+}
+"""
+Maps Access type names, as reported by the ODBC driver or the native reader, to PostgreSQL types.
+"""
+
+
+def get_database_key(dsn_params: dict) -> str:
+    """Gets the key identifying a source database in an inspection snapshot
+
+    :param dsn_params: source DSN params
+    :type dsn_params: dict
+    :return: absolute ``DBQ`` path, or a digest of the DSN params if there is no database file
+    :rtype: str
+    """
+    dbq = get_dsn_param(dsn_params, "DBQ")
+    if dbq:
+        return os.path.abspath(str(dbq))
+    params = ";".join(f"{k}={v}" for k, v in sorted(dsn_params.items()))
+    # the params may contain credentials, which should not be written to the snapshot
+    return "dsn:" + hashlib.sha1(params.encode()).hexdigest()
+
+
+def _select_table_names(names: list[str], table_names: list[str] | None) -> list[str]:
+    if table_names is None:
+        return list(names)
+    # Access ignores case in table names
+    names_by_lower = dict((name.lower(), name) for name in names)
+    return [
+        names_by_lower[name.lower()]
+        for name in table_names
+        if name.lower() in names_by_lower
+    ]
+
+
+async def inspect_odbc_database(
+    conn_str: str, table_names: list[str] | None = None, row_counts: bool = True
+) -> dict:
+    """Inspects the tables of a database through its ODBC driver, on a connection of its own
+
+    :param conn_str: connection string
+    :type conn_str: str
+    :param table_names: tables to inspect, defaults to all tables
+    :type table_names: list[str] | None, optional
+    :param row_counts: count the rows of each table, defaults to True
+    :type row_counts: bool, optional
+    :return: table info by table name, tables that do not exist are left out
+    :rtype: dict
+    """
+    tables = {}
+    async with aioodbc.connect(dsn=conn_str) as conn:
+        catalog = CatalogCache(await conn.cursor())
+        cur = await conn.cursor()
+        try:
+            for table_name in _select_table_names(
+                await catalog.get_tables(), table_names
+            ):
+                columns = await catalog.get_columns(table_name)
+                key_candidates = [await catalog.get_primary_keys(table_name)]
+                key_candidates += (
+                    await catalog.get_unique_indexes(table_name)
+                ).values()
+                row_count = None
+                if row_counts:
+                    await cur.execute(f"SELECT COUNT(*) FROM [{table_name}]")
+                    row_count = (await cur.fetchone())[0]
+                tables[table_name] = {
+                    "columns": [
+                        {
+                            "name": row.column_name,
+                            "type_name": row.type_name,
+                            "sql_type": row.data_type,
+                            "size": row.column_size,
+                            "nullable": bool(row.nullable),
+                        }
+                        for row in columns.values()
+                    ],
+                    "key_candidates": _unique_key_candidates(key_candidates),
+                    "row_count": row_count,
+                }
+        finally:
+            await cur.close()
+            await catalog.cur.close()
+    return tables
+
+
+def inspect_native_database(
+    path: str, table_names: list[str] | None = None, row_counts: bool = True
+) -> dict:
+    """Inspects the tables of an Access database file by reading it directly.
+    The native reader does not parse indexes, so autonumber columns are the only key candidates.
+
+    :param path: database file path
+    :type path: str
+    :param table_names: tables to inspect, defaults to all tables
+    :type table_names: list[str] | None, optional
+    :param row_counts: count the rows of each table, defaults to True
+    :type row_counts: bool, optional
+    :return: table info by table name, tables that do not exist are left out
+    :rtype: dict
+    """
+    tables = {}
+    with access.AccessDatabase(path) as db:
+        for table_name in _select_table_names(db.table_names(), table_names):
+            table = db.get_table(table_name)
+            tables[table_name] = {
+                "columns": [
+                    {
+                        "name": column.name,
+                        "type_name": column.type_name,
+                        "sql_type": None,
+                        "size": column.length,
+                        "nullable": column.nullable,
+                    }
+                    for column in table.columns
+                ],
+                "key_candidates": [
+                    [column.name] for column in table.columns if column.is_autonumber
+                ],
+                "row_count": db.count_rows(table) if row_counts else None,
+            }
+    return tables
+
+
+def _unique_key_candidates(key_candidates: list[list[str]]) -> list[list[str]]:
+    unique = []
+    for columns in key_candidates:
+        if columns and columns not in unique:
+            unique.append(columns)
+    return unique
+
+
+def find_table(tables: dict, table_name: str) -> dict | None:
+    """Finds inspected table info by name, ignoring case like Access does
+
+    :param tables: table info by table name
+    :type tables: dict
+    :param table_name: table name
+    :type table_name: str
+    :return: table info, or None if there is no such table
+    :rtype: dict | None
+    """
+    if table_name in tables:
+        return tables[table_name]
+    for name, table in tables.items():
+        if name.lower() == table_name.lower():
+            return table
+    return None
+
+
+class SourceInspection:
+    """Inspected tables, columns, types, key candidates and row counts of source databases,
+    stored with the fingerprint of each database file so stale entries can be detected.
+    """
+
+    def __init__(self, databases: dict | None = None) -> None:
+        """Constructs a new inspection
+
+        :param databases: inspected databases by database key, defaults to None
+        :type databases: dict | None, optional
+        """
+        self.databases: dict[str, dict] = databases or dict()
+
+    @classmethod
+    def load(cls, path: str) -> "SourceInspection":
+        """Loads an inspection snapshot. A missing file or a snapshot of another version loads as empty.
+
+        :param path: snapshot path
+        :type path: str
+        :raises InspectionError: if the file is not a valid snapshot
+        :return: inspection
+        :rtype: SourceInspection
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError) as e:
+            raise InspectionError(f"could not read inspection snapshot {path} - {e}")
+        if data.get("version") != INSPECTION_VERSION:
+            logging.getLogger("process.inspection").warning(
+                f"inspection snapshot {path} has version {data.get('version')}, expected {INSPECTION_VERSION}, ignoring it"
+            )
+            return cls()
+        return cls(data.get("databases"))
+
+    def save(self, path: str) -> None:
+        """Writes the inspection snapshot, replacing the previous file at once
+
+        :param path: snapshot path
+        :type path: str
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": INSPECTION_VERSION, "databases": self.databases},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, path)
+
+    def is_current(self, dsn_params: dict) -> bool:
+        """Checks whether a database was inspected and its file has not changed since.
+        Databases without a file are never current.
+
+        :param dsn_params: source DSN params
+        :type dsn_params: dict
+        :return: whether the stored entry can be used
+        :rtype: bool
+        """
+        database = self.databases.get(get_database_key(dsn_params))
+        if database is None or database.get("fingerprint") is None:
+            return False
+        return database["fingerprint"] == get_source_fingerprint(dsn_params)
+
+    def get_table(self, dsn_params: dict, table_name: str) -> dict | None:
+        """Gets an inspected table, ignoring case like Access does
+
+        :param dsn_params: source DSN params
+        :type dsn_params: dict
+        :param table_name: table name
+        :type table_name: str
+        :return: table info, or None if the database is not current or has no such table
+        :rtype: dict | None
+        """
+        if not self.is_current(dsn_params):
+            return None
+        return find_table(
+            self.databases[get_database_key(dsn_params)]["tables"], table_name
+        )
+
+    async def refresh(
+        self, sources: dict[str, tuple[dict, str, str]], force: bool = False
+    ) -> list[str]:
+        """Inspects the databases whose file changed since they were last inspected, concurrently
+
+        :param sources: DSN params, connection string and backend by database key
+        :type sources: dict[str, tuple[dict, str, str]]
+        :param force: inspect all databases again, defaults to False
+        :type force: bool, optional
+        :return: keys of the databases that were inspected
+        :rtype: list[str]
+        """
+        logger = logging.getLogger("process.inspection")
+
+        async def refresh_database(
+            key: str, dsn_params: dict, conn_str: str, backend: str
+        ):
+            if not force and self.is_current(dsn_params):
+                logger.info(f"[{key}] has not changed, keeping inspection")
+                return False
+            fingerprint = get_source_fingerprint(dsn_params)
+            start_time = time.time()
+            logger.info(f"inspecting [{key}]")
+            if backend == "native":
+                tables = await asyncio.to_thread(
+                    inspect_native_database, str(get_dsn_param(dsn_params, "DBQ"))
+                )
+            else:
+                tables = await inspect_odbc_database(conn_str)
+            self.databases[key] = {
+                "fingerprint": fingerprint,
+                "backend": backend,
+                "inspected_at": time.time(),
+                "tables": tables,
+            }
+            logger.info(
+                f"inspected {len(tables)} tables of [{key}] in {time.time() - start_time:.2f}s"
+            )
+            return True
+
+        keys = list(sources.keys())
+        refreshed = await asyncio.gather(
+            *(refresh_database(key, *sources[key]) for key in keys)
+        )
+        return [key for key, was_refreshed in zip(keys, refreshed) if was_refreshed]
+
+
+def _pascal_to_snake(s: str) -> str:
+    return re.sub(r"(?<!^)(?<![A-Z])(?=[A-Z])", "_", s).lower()
+
+
+def generate_table_config(
+    table_name: str, table: dict, dsn_params: dict | None = None
+) -> tuple[dict, dict]:
+    """Generates source and target table blocks for a config from an inspected table
+
+    :param table_name: source table name
+    :type table_name: str
+    :param table: inspected table info
+    :type table: dict
+    :param dsn_params: DSN params of the source table, defaults to None
+    :type dsn_params: dict | None, optional
+    :return: source and target table blocks
+    :rtype: tuple[dict, dict]
+    """
+    key = table["key_candidates"][0] if table["key_candidates"] else []
+    target_columns = {}
+    for column in table["columns"]:
+        data_type = _POSTGRES_TYPES.get(column["type_name"].lower(), "text")
+        if key == [column["name"]]:
+            data_type += " primary key"
+        target_columns[_pascal_to_snake(column["name"])] = data_type
+    source = {"TABLE": table_name}
+    if dsn_params:
+        source["DSN_PARAMS"] = dsn_params
+    source["TARGET_TABLE"] = _pascal_to_snake(table_name)
+    source["COLUMNS"] = dict(
+        (column["name"], _pascal_to_snake(column["name"]))
+        for column in table["columns"]
+    )
+    target = {"TABLE": _pascal_to_snake(table_name), "COLUMNS": target_columns}
+    return source, target
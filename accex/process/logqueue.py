@@ -0,0 +1,54 @@
+import queue
+import logging
+import logging.handlers
+
+
+def setup_queue_logging(
+    level: int, handlers: list[logging.Handler] | None = None
+) -> logging.handlers.QueueListener:
+    """Routes log records of the root logger through a queue, so handlers write them on a background thread
+    and a slow handler does not stall the event loop. Stop the returned listener to flush the queue.
+
+    :param level: root logger level
+    :type level: int
+    :param handlers: handlers that write the records, defaults to a stream handler on stderr like ``logging.basicConfig``
+    :type handlers: list[logging.Handler] | None, optional
+    :return: started listener
+    :rtype: logging.handlers.QueueListener
+    """
+    if handlers is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        handlers = [handler]
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    record_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(record_queue)
+    listener = logging.handlers.QueueListener(
+        record_queue, *handlers, respect_handler_level=True
+    )
+    # lets filters be added to the handlers that write, see get_output_handlers
+    queue_handler.listener = listener
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    listener.start()
+    return listener
+
+
+def get_output_handlers(logger: logging.Logger | None = None) -> list[logging.Handler]:
+    """Gets the handlers that write the records of a logger, looking through queue handlers to their listener
+
+    :param logger: logger, defaults to the root logger
+    :type logger: logging.Logger | None, optional
+    :return: handlers
+    :rtype: list[logging.Handler]
+    """
+    handlers = []
+    for handler in (logger or logging.getLogger()).handlers:
+        listener = getattr(handler, "listener", None)
+        if isinstance(handler, logging.handlers.QueueHandler) and listener is not None:
+            handlers += listener.handlers
+        else:
+            handlers.append(handler)
+    return handlers
@@ -0,0 +1,199 @@
+from typing import Callable
+from ..config import core as ac
+
+LOOKUP_INDEX_PROBE_SIZE = 100
+"""
+Amount of lookup values used to time a lookup before and after its index is built.
+"""
+
+_SERIAL_TYPES = {
+    "smallserial": "smallint",
+    "serial2": "smallint",
+    "serial": "int",
+    "serial4": "int",
+    "bigserial": "bigint",
+    "serial8": "bigint",
+}
+
+
+def get_staging_column_type(data_type: str) -> str:
+    """Gets the type of a staging column holding values for a target column.
+    Serial types become their integer types, so staging does not create sequences.
+
+    :param data_type: target column data type
+    :type data_type: str
+    :return: staging column type
+    :rtype: str
+    """
+    return _SERIAL_TYPES.get(data_type.lower(), data_type)
+
+
+class JoinLookupPlan:
+    """Statements that resolve the map function columns of a source table inside the target database.
+
+    Each chunk is inserted as is into a temporary staging table, then moved to the target table with one
+    ``INSERT ... SELECT`` that joins every lookup table. Lookups take the first matching row, like the client strategy.
+    """
+
+    def __init__(
+        self,
+        config: ac.Config,
+        src_table: ac.SourceTableBlock,
+        load_table_name: str,
+        get_lookup_table_name: Callable[[ac.TargetTablePointer], str],
+    ) -> None:
+        """Constructs the plan of a source table
+
+        :param config: config
+        :type config: ac.Config
+        :param src_table: source table
+        :type src_table: ac.SourceTableBlock
+        :param load_table_name: table the rows are inserted into
+        :type load_table_name: str
+        :param get_lookup_table_name: gets the table holding the rows of a lookup target table
+        :type get_lookup_table_name: Callable[[ac.TargetTablePointer], str]
+        """
+        self.staging_table = f"accex_stage_{load_table_name.replace('.', '_')}"
+        staging_columns = []
+        target_columns = []
+        select_columns = []
+        joins = []
+        for col_index, column in enumerate(src_table.columns.values()):
+            staging_column = f"c{col_index}"
+            if isinstance(column, ac.SourceColumnMapFunction):
+                select_column = column.from_row.select_column
+                data_type = self._get_data_type(config, select_column)
+                target_columns.append(column.to_column.column_name)
+                match = f"m{col_index}"
+                select_columns.append(f"{match}.{column.with_column.column_name}")
+                joins.append(
+                    f"LEFT JOIN LATERAL (SELECT l.{column.with_column.column_name} "
+                    f"FROM {get_lookup_table_name(column.with_column.table)} l "
+                    f"WHERE l.{select_column.column_name} = s.{staging_column} LIMIT 1) {match} ON true"
+                )
+            else:
+                data_type = self._get_data_type(config, column)
+                target_columns.append(column.column_name)
+                select_columns.append(f"s.{staging_column}")
+            staging_columns.append(
+                f"{staging_column} {get_staging_column_type(data_type)}"
+            )
+        self.column_count = len(staging_columns)
+        self.create_sql = (
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging_table} "
+            f"({', '.join(staging_columns)})"
+        )
+        self.clear_sql = f"DELETE FROM {self.staging_table}"
+        self.insert_sql = (
+            f"INSERT INTO {load_table_name} ({', '.join(target_columns)}) "
+            f"SELECT {', '.join(select_columns)} FROM {self.staging_table} s"
+            + "".join(f" {join}" for join in joins)
+        )
+        self.drop_sql = f"DROP TABLE IF EXISTS {self.staging_table}"
+
+    @staticmethod
+    def _get_data_type(config: ac.Config, column: ac.TargetColumnPointer) -> str:
+        definition = config.targets[column.table].columns.definitions[
+            column.column_name
+        ]
+        return definition.data_type
+
+    def get_stage_sql(self, row_count: int) -> str:
+        """Gets the statement that inserts a chunk into the staging table
+
+        :param row_count: amount of rows in the chunk
+        :type row_count: int
+        :return: statement
+        :rtype: str
+        """
+        return f"INSERT INTO {self.staging_table} VALUES " + ",".join(
+            f"({','.join('?' * self.column_count)})" for _ in range(row_count)
+        )
+
+    def get_chunk_statements(self, rows: list[list]) -> list[tuple[str, list]]:
+        """Gets the statements that load one chunk through the staging table
+
+        :param rows: chunk rows in source column order, with raw values in map function columns
+        :type rows: list[list]
+        :return: statements and their parameters
+        :rtype: list[tuple[str, list]]
+        """
+        return [
+            (self.clear_sql, []),
+            (self.get_stage_sql(len(rows)), [value for row in rows for value in row]),
+            (self.insert_sql, []),
+        ]
+
+
+def get_lookup_columns(config: ac.Config) -> dict[ac.TargetTablePointer, list[str]]:
+    """Gets the target columns that map functions match source values against
+
+    :param config: config
+    :type config: ac.Config
+    :return: column names by target table
+    :rtype: dict[ac.TargetTablePointer, list[str]]
+    """
+    lookup_columns: dict[ac.TargetTablePointer, list[str]] = {}
+    for src_table in config.sources:
+        for column in src_table.columns.values():
+            if not isinstance(column, ac.SourceColumnMapFunction):
+                continue
+            select_column = column.from_row.select_column
+            columns = lookup_columns.setdefault(select_column.table, [])
+            if select_column.column_name not in columns:
+                columns.append(select_column.column_name)
+    return lookup_columns
+
+
+def get_lookup_tables(src_table: ac.SourceTableBlock) -> set[ac.TargetTablePointer]:
+    """Gets the target tables the map functions of a source table look up
+
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :return: target tables
+    :rtype: set[ac.TargetTablePointer]
+    """
+    return set(
+        column.from_row.select_column.table
+        for column in src_table.columns.values()
+        if isinstance(column, ac.SourceColumnMapFunction)
+    )
+
+
+def is_column_indexed(
+    tgt_table: ac.TargetTableBlock, column_name: str, deferred: bool = False
+) -> bool:
+    """Checks whether a target column already has an index from a key constraint
+
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :param column_name: column name
+    :type column_name: str
+    :param deferred: key constraints are added after loading, defaults to False
+    :type deferred: bool, optional
+    :return: whether the column is indexed while the table is loaded
+    :rtype: bool
+    """
+    if deferred:
+        return False
+    definition = tgt_table.columns.definitions.get(column_name)
+    return definition is not None and any(
+        c.kind in ("PRIMARY KEY", "UNIQUE") for c in definition.constraints
+    )
+
+
+def get_lookup_index_name(table_name: str, column_name: str) -> str:
+    """Gets the name of the index on a lookup column.
+    The name starts with the table name, so indexes of shadow tables are renamed when they are swapped in.
+
+    :param table_name: table name, optionally schema qualified
+    :type table_name: str
+    :param column_name: column name
+    :type column_name: str
+    :return: schema qualified index name
+    :rtype: str
+    """
+    schema, _, name = table_name.rpartition(".")
+    # PostgreSQL truncates identifiers to 63 bytes
+    index_name = f"{name}_accex_lookup_{column_name}"[:63]
+    return f"{schema}.{index_name}" if schema else index_name
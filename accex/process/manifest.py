@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import hashlib
+from typing import Callable
+from ..config import core as ac
+
+
+class ManifestError(Exception):
+    pass
+
+
+MANIFEST_VERSION = 1
+"""
+Version of the run manifest format, manifests of other versions are ignored and every table is transferred.
+"""
+MANIFEST_PATH_DEFAULT = "accex_manifest.json"
+"""
+Default path of the run manifest, relative to the working directory.
+"""
+
+
+def get_table_fingerprint(
+    config: ac.Config,
+    src_table: ac.SourceTableBlock,
+    source_fingerprint: dict | None,
+    tgt_dsn_params: dict | None = None,
+) -> str | None:
+    """Gets the fingerprint of a source table load, a digest of the source and target table blocks,
+    the settings that change the loaded rows, and the fingerprint of the file the rows are read from
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param source_fingerprint: fingerprint of the source database file or staging file
+    :type source_fingerprint: dict | None
+    :param tgt_dsn_params: target DSN params, so loading into another database is not skipped, defaults to None
+    :type tgt_dsn_params: dict | None, optional
+    :return: fingerprint, or None if there is no file to tell whether the source rows changed
+    :rtype: str | None
+    """
+    if not source_fingerprint:
+        return None
+    fingerprint = {
+        "source": src_table.to_dict(config),
+        "target": config.targets[src_table.target_pointer].to_dict(config),
+        "source_file": source_fingerprint,
+        "coercion": config.coercion,
+        "transform_modules": config.transform_modules,
+        "target_dsn_params": tgt_dsn_params,
+    }
+    # the DSN params may contain credentials, which are only part of the digest
+    return hashlib.sha256(
+        json.dumps(fingerprint, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_target_dependencies(
+    config: ac.Config,
+    tgt_table: ac.TargetTableBlock,
+    src_tables: list[ac.SourceTableBlock],
+) -> set[ac.TargetTablePointer]:
+    """Gets the target tables a target table depends on, through map function lookups of its sources
+    or ``REFERENCES`` constraints. Reloading a dependency changes the looked up values,
+    and drops the foreign keys that reference it.
+
+    :param config: config
+    :type config: ac.Config
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :param src_tables: source tables loaded into the target table
+    :type src_tables: list[ac.SourceTableBlock]
+    :return: target tables in the config, without the target table itself
+    :rtype: set[ac.TargetTablePointer]
+    """
+    dependencies = set()
+    for src_table in src_tables:
+        dependencies |= src_table.target_table_deps
+    for definition in tgt_table.columns.definitions.values():
+        for constraint in definition.constraints:
+            if constraint.references is not None:
+                dependencies.add(constraint.references)
+    return set(
+        pointer
+        for pointer in dependencies
+        if pointer in config.targets and config.targets[pointer] is not tgt_table
+    )
+
+
+class RunManifest:
+    """Fingerprints of the source tables of each target table at its last successful load.
+
+    A target table is current when the fingerprints of all its source tables match.
+    Entries are removed before their tables are loaded again, so a table whose load was interrupted is never current.
+    """
+
+    def __init__(self, tables: dict[str, dict] | None = None) -> None:
+        """Constructs a new manifest
+
+        :param tables: entries by target table name, defaults to None
+        :type tables: dict[str, dict] | None, optional
+        """
+        self.tables = tables if tables is not None else dict()
+
+    @classmethod
+    def load(cls, path: str) -> "RunManifest":
+        """Loads a manifest, an empty manifest if the file does not exist
+
+        :param path: manifest path
+        :type path: str
+        :raises ManifestError: if the file is invalid or of another version
+        :return: manifest
+        :rtype: RunManifest
+        """
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ManifestError(f"could not read run manifest {path} - {e}")
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            raise ManifestError(
+                f"run manifest {path} is not version {MANIFEST_VERSION}"
+            )
+        return cls(data.get("tables") or dict())
+
+    def save(self, path: str) -> None:
+        """Writes the manifest, replacing the file once it is fully written
+
+        :param path: manifest path
+        :type path: str
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "tables": self.tables}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def is_current(self, table_name: str, fingerprints: dict[str, str | None]) -> bool:
+        """Checks whether a target table was loaded from the same source tables with the same fingerprints
+
+        :param table_name: target table name
+        :type table_name: str
+        :param fingerprints: fingerprint by source table
+        :type fingerprints: dict[str, str | None]
+        :return: whether the table is current
+        :rtype: bool
+        """
+        entry = self.tables.get(table_name)
+        if entry is None or not fingerprints:
+            return False
+        if any(fingerprint is None for fingerprint in fingerprints.values()):
+            return False
+        return entry.get("sources") == fingerprints
+
+    def set_table(self, table_name: str, fingerprints: dict[str, str | None]) -> None:
+        """Records the load of a target table, or removes its entry if a fingerprint is unknown
+
+        :param table_name: target table name
+        :type table_name: str
+        :param fingerprints: fingerprint by source table
+        :type fingerprints: dict[str, str | None]
+        """
+        if any(fingerprint is None for fingerprint in fingerprints.values()):
+            self.remove_table(table_name)
+            return
+        self.tables[table_name] = {"sources": fingerprints, "loaded": time.time()}
+
+    def remove_table(self, table_name: str) -> None:
+        self.tables.pop(table_name, None)
+
+    def get_loaded_time(self, table_name: str) -> float | None:
+        entry = self.tables.get(table_name)
+        return None if entry is None else entry.get("loaded")
+
+    def get_unchanged_targets(
+        self,
+        config: ac.Config,
+        src_tables: list[ac.SourceTableBlock],
+        get_fingerprint: Callable[[ac.SourceTableBlock], str | None],
+    ) -> tuple[set[ac.TargetTablePointer], dict[ac.TargetTablePointer, dict]]:
+        """Finds the target tables that can be skipped. A target table is skipped when all of its source tables are
+        unchanged since its last load, and none of the target tables it depends on are loaded again.
+
+        :param config: config
+        :type config: ac.Config
+        :param src_tables: source tables to transfer
+        :type src_tables: list[ac.SourceTableBlock]
+        :param get_fingerprint: gets the fingerprint of a source table load
+        :type get_fingerprint: Callable[[ac.SourceTableBlock], str | None]
+        :return: target tables to skip, and the fingerprints of the source tables of each target table
+        :rtype: tuple[set[ac.TargetTablePointer], dict[ac.TargetTablePointer, dict]]
+        """
+        src_tables_by_target: dict[ac.TargetTablePointer, list] = {}
+        for src_table in src_tables:
+            src_tables_by_target.setdefault(src_table.target_pointer, []).append(
+                src_table
+            )
+        fingerprints = dict(
+            (
+                pointer,
+                dict((str(s.table_pointer), get_fingerprint(s)) for s in tables),
+            )
+            for pointer, tables in src_tables_by_target.items()
+        )
+        unchanged = set(
+            pointer
+            for pointer in src_tables_by_target
+            if self.is_current(config.targets[pointer].name, fingerprints[pointer])
+        )
+        dependencies = dict(
+            (
+                pointer,
+                get_target_dependencies(config, config.targets[pointer], tables),
+            )
+            for pointer, tables in src_tables_by_target.items()
+        )
+        # tables depending on a table that is loaded again are loaded again too, until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for pointer in list(unchanged):
+                if any(
+                    d in src_tables_by_target and d not in unchanged
+                    for d in dependencies[pointer]
+                ):
+                    unchanged.discard(pointer)
+                    changed = True
+        return unchanged, fingerprints
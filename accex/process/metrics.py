@@ -0,0 +1,87 @@
+import time
+import contextlib
+from typing import Iterator
+
+
+class Metric:
+    """Summary of the values recorded under one name"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={self.count}, total={self.total:.6f})"
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Durations and other values recorded during a transfer, summarized by name"""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def record(self, name: str, value: float) -> None:
+        """Records a value
+
+        :param name: metric name, such as ``lookup.customers.old_id``
+        :type name: str
+        :param value: value, durations are in seconds
+        :type value: float
+        """
+        self.metrics.setdefault(name, Metric()).add(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Records the duration of the block, also when it raises
+
+        .. code-block:: python
+
+            with metrics.timer("lookup_index.build.customers.old_id"):
+                await cur.execute(sql)
+
+        :param name: metric name
+        :type name: str
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def get(self, name: str) -> Metric | None:
+        return self.metrics.get(name)
+
+    def to_dict(self) -> dict[str, dict]:
+        return dict((name, metric.to_dict()) for name, metric in self.metrics.items())
+
+    def get_summary_lines(self) -> list[str]:
+        """Gets one line per metric, sorted by name
+
+        :return: lines
+        :rtype: list[str]
+        """
+        return [
+            f"{name:<48} count {metric.count:>8} total {metric.total:>10.4f} mean {metric.mean:>10.6f} max {metric.max:>10.6f}"
+            for name, metric in sorted(self.metrics.items())
+        ]
@@ -0,0 +1,188 @@
+import os
+import aioodbc
+from ..config import core as ac
+from .coercion import get_coercion_kind
+
+SOURCE_TYPE_KINDS = {
+    "number": (
+        "counter",
+        "long",
+        "integer",
+        "smallint",
+        "byte",
+        "bigint",
+        "single",
+        "real",
+        "double",
+        "float",
+        "currency",
+        "decimal",
+        "numeric",
+    ),
+    "text": ("char", "varchar", "text", "longchar", "memo"),
+    "datetime": ("datetime",),
+    "bool": ("bit", "boolean"),
+    "binary": ("binary", "varbinary", "longbinary", "ole"),
+    "guid": ("guid",),
+}
+"""
+Groups Access type names, as reported by the ODBC driver or the native reader, into kinds of values.
+"""
+
+_SOURCE_TYPE_KINDS = dict(
+    (type_name, kind)
+    for kind, type_names in SOURCE_TYPE_KINDS.items()
+    for type_name in type_names
+)
+
+INCOMPATIBLE_KINDS = {
+    "number": ("date", "time", "timestamp"),
+    "datetime": ("int", "float", "numeric", "bool"),
+    "bool": ("date", "time", "timestamp"),
+    "binary": ("int", "float", "numeric", "text", "date", "time", "timestamp", "bool"),
+    "guid": ("int", "float", "numeric", "date", "time", "timestamp", "bool"),
+}
+"""
+Maps a kind of source value to the target coercion kinds it cannot be inserted into or compared with.
+Text is left out, the target database decides whether text can be cast.
+"""
+
+
+def get_source_type_kind(type_name: str | None) -> str | None:
+    """Gets the kind of values of a source column type
+
+    :param type_name: Access type name
+    :type type_name: str | None
+    :return: kind, or None if the type is unknown
+    :rtype: str | None
+    """
+    if not type_name:
+        return None
+    return _SOURCE_TYPE_KINDS.get(type_name.lower())
+
+
+def _get_target_data_type(
+    config: ac.Config, column: ac.TargetColumnPointer
+) -> str | None:
+    if column.table not in config.targets:
+        return None
+    definition = config.targets[column.table].columns.definitions.get(
+        column.column_name
+    )
+    return definition.data_type if definition is not None else None
+
+
+def _check_kinds(
+    source_column: dict, data_type: str | None, description: str
+) -> str | None:
+    if data_type is None:
+        return None
+    source_kind = get_source_type_kind(source_column.get("type_name"))
+    target_kind = get_coercion_kind(data_type)
+    if target_kind is not None and target_kind in INCOMPATIBLE_KINDS.get(
+        source_kind, ()
+    ):
+        return f"source column {source_column['name']} ({source_column['type_name']}) cannot be used for {description} ({data_type})"
+    return None
+
+
+def check_source_table(
+    config: ac.Config, src_table: ac.SourceTableBlock, table: dict | None
+) -> list[str]:
+    """Checks a source table against its inspected table info.
+    Every mapped column and every map function source column must exist and have a type that fits the target column,
+    or the lookup column it is matched against.
+
+    :param config: config
+    :type config: ac.Config
+    :param src_table: source table
+    :type src_table: ac.SourceTableBlock
+    :param table: inspected table info, or None if the table does not exist
+    :type table: dict | None
+    :return: problems
+    :rtype: list[str]
+    """
+    src_table_name = src_table.table_pointer.table_name
+    if table is None:
+        return [f"[{src_table_name}] source table does not exist"]
+    source_columns = dict((c["name"].lower(), c) for c in table["columns"])
+    problems = []
+    for column_name, column in src_table.columns.items():
+        source_column = source_columns.get(column_name.lower())
+        if source_column is None:
+            problems.append(
+                f"[{src_table_name}.{column_name}] source column does not exist"
+            )
+            continue
+        if isinstance(column, ac.TargetColumnPointer):
+            if column.transforms:
+                # transforms may change the type of the values
+                continue
+            problem = _check_kinds(
+                source_column,
+                _get_target_data_type(config, column),
+                f"target column {column}",
+            )
+        elif isinstance(column, ac.SourceColumnMapFunction):
+            problem = _check_kinds(
+                source_column,
+                _get_target_data_type(config, column.from_row.select_column),
+                f"lookup column {column.from_row.select_column}",
+            )
+        else:
+            problem = None
+        if problem is not None:
+            problems.append(f"[{src_table_name}.{column_name}] {problem}")
+    return problems
+
+
+def check_target_definitions(tgt_table: ac.TargetTableBlock) -> list[str]:
+    """Checks that every column definition of a target table can be parsed
+
+    :param tgt_table: target table
+    :type tgt_table: ac.TargetTableBlock
+    :return: problems
+    :rtype: list[str]
+    """
+    problems = []
+    for column_name, ddl in tgt_table.columns.items():
+        try:
+            ac.parse_column_definition(ddl)
+        except ValueError as e:
+            problems.append(f"[{tgt_table.name}.{column_name}] {e}")
+    return problems
+
+
+async def check_target_ddl(
+    conn: aioodbc.Connection, statements: list[tuple[str, str]]
+) -> list[str]:
+    """Runs ``CREATE TABLE`` and ``ALTER TABLE`` statements in a scratch schema and rolls them back.
+    Each statement runs in a savepoint, so one failing statement does not hide problems in the others.
+
+    :param conn: target connection, must not be in autocommit mode
+    :type conn: aioodbc.Connection
+    :param statements: statements and the table they belong to, in the order they run
+    :type statements: list[tuple[str, str]]
+    :return: problems
+    :rtype: list[str]
+    """
+    problems = []
+    schema = f"accex_preflight_{os.getpid()}"
+    cur = await conn.cursor()
+    try:
+        await cur.execute("SELECT current_setting('search_path')")
+        search_path = (await cur.fetchone())[0]
+        await cur.execute(f"CREATE SCHEMA {schema}")
+        # unqualified tables and references resolve to the scratch schema, types still resolve as usual
+        await cur.execute(f"SET LOCAL search_path TO {schema}, {search_path}")
+        for table_name, statement in statements:
+            await cur.execute("SAVEPOINT accex_preflight")
+            try:
+                await cur.execute(statement)
+            except Exception as e:
+                await cur.execute("ROLLBACK TO SAVEPOINT accex_preflight")
+                problems.append(f"[{table_name}] {statement} - {e}")
+    finally:
+        await conn.rollback()
+        await cur.close()
+    return problems
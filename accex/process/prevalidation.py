@@ -0,0 +1,263 @@
+import re
+import decimal
+import datetime
+from typing import Callable
+from ..config import core as ac
+from .coercion import get_coercion_kind
+
+
+class RuleViolation(Exception):
+    """A value that the target database would reject. Raised with a SQLSTATE first, like driver errors."""
+
+
+INT_RANGES = {
+    "smallint": (-(2**15), 2**15 - 1),
+    "int2": (-(2**15), 2**15 - 1),
+    "smallserial": (-(2**15), 2**15 - 1),
+    "serial2": (-(2**15), 2**15 - 1),
+    "integer": (-(2**31), 2**31 - 1),
+    "int": (-(2**31), 2**31 - 1),
+    "int4": (-(2**31), 2**31 - 1),
+    "serial": (-(2**31), 2**31 - 1),
+    "serial4": (-(2**31), 2**31 - 1),
+    "bigint": (-(2**63), 2**63 - 1),
+    "int8": (-(2**63), 2**63 - 1),
+    "bigserial": (-(2**63), 2**63 - 1),
+    "serial8": (-(2**63), 2**63 - 1),
+}
+"""
+Maps integer data types to the smallest and largest values they hold.
+"""
+
+_LENGTH_TYPES = ("varchar", "character varying", "char", "character", "bpchar")
+
+_ISO_DATE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+
+_TYPE_ARGS = re.compile(r"^\s*([a-z ]+?)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*$")
+
+
+def _parse_data_type(data_type: str) -> tuple[str, int | None, int | None]:
+    # numeric(10, 2) -> ("numeric", 10, 2)
+    match = _TYPE_ARGS.match(data_type.lower())
+    if match is None:
+        return " ".join(data_type.lower().split()), None, None
+    name, first, second = match.groups()
+    return (
+        " ".join(name.split()),
+        None if first is None else int(first),
+        None if second is None else int(second),
+    )
+
+
+def _is_number(v) -> bool:
+    # NaN is never out of range
+    return (
+        isinstance(v, (int, float, decimal.Decimal))
+        and not isinstance(v, bool)
+        and v == v
+    )
+
+
+def _get_date_sqlstate(v: str) -> str | None:
+    # only the date part is checked, times and time zones are left to the database.
+    # the database reads unpadded, 2 digit year and DateStyle dependent dates too,
+    # so only values no date form can match are rejected
+    date_part = v.strip().replace("T", " ", 1).split(" ", 1)[0]
+    if not any(c.isalnum() for c in date_part):
+        return "22007"
+    match = _ISO_DATE.match(date_part)
+    if match is not None:
+        try:
+            datetime.date(*(int(g) for g in match.groups()))
+        except ValueError:
+            return "22008"
+    return None
+
+
+def create_column_check(
+    column_name: str, definition: ac.ColumnDefinition
+) -> Callable[[list], list[tuple[int, RuleViolation]]] | None:
+    """Creates a function that checks all values of one column of a chunk against the rules of its target column:
+    ``NOT NULL``, the length of ``varchar(n)`` and ``char(n)``, the range of integer and ``numeric(p, s)`` types,
+    and date and timestamp strings that cannot hold a date, such as empty strings or ISO dates with an invalid day.
+
+    :param column_name: target column name
+    :type column_name: str
+    :param definition: target column definition
+    :type definition: ac.ColumnDefinition
+    :return: check returning the row index and violation of each rejected value,
+        or None if the column has no rules
+    :rtype: Callable[[list], list[tuple[int, RuleViolation]]] | None
+    """
+    not_null = any(
+        c.kind in ("NOT NULL", "PRIMARY KEY") for c in definition.constraints
+    )
+    name, first, second = _parse_data_type(definition.data_type)
+    max_length = first if name in _LENGTH_TYPES else None
+    int_range = INT_RANGES.get(name)
+    numeric_limit = None
+    numeric_scale = 0
+    if name in ("numeric", "decimal") and first is not None:
+        numeric_scale = second or 0
+        numeric_limit = 10 ** (first - numeric_scale)
+    check_dates = get_coercion_kind(definition.data_type) in ("date", "timestamp")
+    if not (
+        not_null
+        or max_length is not None
+        or int_range is not None
+        or numeric_limit is not None
+        or check_dates
+    ):
+        return None
+
+    def check(values: list) -> list[tuple[int, RuleViolation]]:
+        violations = []
+        if not_null:
+            violations += [
+                (
+                    i,
+                    RuleViolation(
+                        "23502",
+                        f'null value in column "{column_name}" violates not-null constraint',
+                    ),
+                )
+                for i, v in enumerate(values)
+                if v is None
+            ]
+        if max_length is not None:
+            # trailing spaces are cut off by the database instead
+            violations += [
+                (
+                    i,
+                    RuleViolation(
+                        "22001",
+                        f'value too long for type {definition.data_type} in column "{column_name}"',
+                    ),
+                )
+                for i, v in enumerate(values)
+                if isinstance(v, str)
+                and len(v) > max_length
+                and len(v.rstrip(" ")) > max_length
+            ]
+        if int_range is not None:
+            low, high = int_range
+            violations += [
+                (
+                    i,
+                    RuleViolation(
+                        "22003",
+                        f'value {v} out of range for type {definition.data_type} in column "{column_name}"',
+                    ),
+                )
+                for i, v in enumerate(values)
+                if v is not None and _is_number(v) and (v < low or v > high)
+            ]
+        if numeric_limit is not None:
+            violations += [
+                (
+                    i,
+                    RuleViolation(
+                        "22003",
+                        f'numeric field overflow, value {v} does not fit {definition.data_type} in column "{column_name}"',
+                    ),
+                )
+                for i, v in enumerate(values)
+                if v is not None
+                and _is_number(v)
+                and abs(round(v, numeric_scale)) >= numeric_limit
+            ]
+        if check_dates:
+            for i, v in enumerate(values):
+                sqlstate = _get_date_sqlstate(v) if isinstance(v, str) else None
+                if sqlstate is None:
+                    continue
+                message = (
+                    f"invalid input syntax for type {definition.data_type}"
+                    if sqlstate == "22007"
+                    else "date/time field value out of range"
+                )
+                violations.append(
+                    (
+                        i,
+                        RuleViolation(
+                            sqlstate, f'{message}: "{v}" in column "{column_name}"'
+                        ),
+                    )
+                )
+        return violations
+
+    return check
+
+
+class ChunkValidator:
+    """Checks the columns of chunks against the rules of their target columns before they are inserted,
+    so rows the target database would reject are found without a failed insert.
+    """
+
+    def __init__(
+        self,
+        checks: list[tuple[int, Callable[[list], list[tuple[int, RuleViolation]]]]],
+    ) -> None:
+        self.checks = checks
+
+    def __bool__(self) -> bool:
+        return len(self.checks) > 0
+
+    @classmethod
+    def from_tables(
+        cls,
+        src_table: ac.SourceTableBlock,
+        tgt_table: ac.TargetTableBlock,
+        check_map_functions: bool = True,
+    ) -> "ChunkValidator":
+        """Creates the validator for a source table from the target column definitions
+
+        :param src_table: source table
+        :type src_table: ac.SourceTableBlock
+        :param tgt_table: target table
+        :type tgt_table: ac.TargetTableBlock
+        :param check_map_functions: check the looked up values of map function columns,
+            disable when lookups are resolved in the target database, defaults to True
+        :type check_map_functions: bool, optional
+        :return: validator
+        :rtype: ChunkValidator
+        """
+        definitions = tgt_table.columns.definitions
+        checks = []
+        for col_index, v in enumerate(src_table.columns.values()):
+            if isinstance(v, ac.TargetColumnPointer):
+                column_name = v.column_name
+            elif isinstance(v, ac.SourceColumnMapFunction) and check_map_functions:
+                column_name = v.to_column.column_name
+            else:
+                continue
+            if column_name not in definitions:
+                continue
+            check = create_column_check(column_name, definitions[column_name])
+            if check is not None:
+                checks.append((col_index, check))
+        return cls(checks)
+
+    def split(
+        self, rows: list[list]
+    ) -> tuple[list[list], list[tuple[list, RuleViolation]]]:
+        """Splits a chunk into the rows that pass every check and the rows that do not
+
+        :param rows: rows
+        :type rows: list[list]
+        :return: valid rows, and each rejected row with its first violation
+        :rtype: tuple[list[list], list[tuple[list, RuleViolation]]]
+        """
+        violations: dict[int, RuleViolation] = {}
+        for col_index, check in self.checks:
+            for row_index, violation in check([row[col_index] for row in rows]):
+                violations.setdefault(row_index, violation)
+        if not violations:
+            return rows, []
+        return (
+            [row for row_index, row in enumerate(rows) if row_index not in violations],
+            [
+                (rows[row_index], violations[row_index])
+                for row_index in sorted(violations)
+            ],
+        )
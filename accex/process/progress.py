@@ -0,0 +1,245 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+from typing import TextIO
+from .logqueue import get_output_handlers
+
+
+class TableProgress:
+    """Counters of one table being transferred. The transfer only updates the counters, renderers read them."""
+
+    def __init__(self, name: str, total: int | None = None) -> None:
+        """Constructs new table progress
+
+        :param name: name shown for the table, such as ``Customer -> customers``
+        :type name: str
+        :param total: amount of source rows, defaults to None if unknown
+        :type total: int | None, optional
+        """
+        self.name = name
+        self.total = total
+        self.inserted = 0
+        self.rejected = 0
+        self.start_time = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, {self.inserted}/{self.total})"
+
+    @property
+    def done(self) -> int:
+        return self.inserted + self.rejected
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def rate(self) -> float:
+        """Rows per second since the table started"""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> float | None:
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds until the table is done at the current rate, None if the total or rate is unknown"""
+        rate = self.rate
+        if not self.total or rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+
+class ProgressTracker:
+    """Progress of the tables that are being transferred"""
+
+    def __init__(self) -> None:
+        self.tables: dict[str, TableProgress] = {}
+
+    def start_table(
+        self, key: str, name: str, total: int | None = None
+    ) -> TableProgress:
+        """Starts tracking a table
+
+        :param key: key of the table, such as the source table pointer
+        :type key: str
+        :param name: name shown for the table
+        :type name: str
+        :param total: amount of source rows, defaults to None if unknown
+        :type total: int | None, optional
+        :return: progress to update
+        :rtype: TableProgress
+        """
+        progress = TableProgress(name, total)
+        self.tables[key] = progress
+        return progress
+
+    def finish_table(self, key: str) -> None:
+        self.tables.pop(key, None)
+
+
+def _format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02}s"
+    return f"{seconds}s"
+
+
+def format_progress_line(progress: TableProgress, width: int = 20) -> str:
+    """Formats one line of the live display
+
+    :param progress: table progress
+    :type progress: TableProgress
+    :param width: width of the bar, defaults to 20
+    :type width: int, optional
+    :return: line
+    :rtype: str
+    """
+    fraction = progress.fraction
+    if fraction is None:
+        counts = f"{progress.done} rows"
+        bar = ""
+    else:
+        counts = f"{progress.done:>{len(str(progress.total))}} / {progress.total}"
+        bar = f" {'█' * int(fraction * width):<{width}} {int(100 * fraction):3}%"
+    return (
+        f"{progress.name}  {counts}{bar}  {progress.rate:,.0f} rows/s"
+        f"  eta {_format_duration(progress.eta)}"
+    )
+
+
+def format_progress_record(progress: TableProgress) -> str:
+    """Formats the ``key=value`` log line of a table, for output that is not a terminal
+
+    :param progress: table progress
+    :type progress: TableProgress
+    :return: line
+    :rtype: str
+    """
+    fields = {
+        "table": progress.name.replace(" ", ""),
+        "inserted": progress.inserted,
+        "rejected": progress.rejected,
+        "total": "?" if progress.total is None else progress.total,
+        "rate": f"{progress.rate:.1f}",
+        "elapsed": f"{progress.elapsed:.1f}",
+        "eta": "?" if progress.eta is None else f"{progress.eta:.1f}",
+    }
+    return "progress " + " ".join(f"{k}={v}" for k, v in fields.items())
+
+
+class _ClearProgressFilter(logging.Filter):
+    def __init__(self, renderer: "ProgressRenderer") -> None:
+        super().__init__()
+        self.renderer = renderer
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # log lines are written above the live display, which is drawn again on the next refresh
+        self.renderer.clear()
+        return True
+
+
+class ProgressRenderer:
+    """Draws the progress of active tables from a task of its own, at most once per ``interval`` seconds.
+
+    On a terminal, one line per active table is redrawn in place. Otherwise a ``key=value`` log line
+    per active table is logged every ``log_interval`` seconds, which suits log collectors.
+    """
+
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        stream: TextIO | None = None,
+        interval: float = 0.5,
+        log_interval: float = 10.0,
+    ) -> None:
+        """Constructs a new renderer
+
+        :param tracker: tracked tables
+        :type tracker: ProgressTracker
+        :param stream: stream the live display is drawn to, defaults to stdout
+        :type stream: TextIO | None, optional
+        :param interval: seconds between redraws of the live display, defaults to 0.5
+        :type interval: float, optional
+        :param log_interval: seconds between log lines when the stream is not a terminal, defaults to 10.0
+        :type log_interval: float, optional
+        """
+        self.tracker = tracker
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self.log_interval = log_interval
+        self.live = self.stream.isatty()
+        self._drawn_lines = 0
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._filter = _ClearProgressFilter(self)
+        self._logger = logging.getLogger("process.progress")
+
+    def start(self) -> None:
+        """Starts drawing in a task on the running event loop"""
+        if self._task is not None:
+            return
+        if self.live:
+            # with queue logging, the display is cleared on the thread that writes the record
+            for handler in get_output_handlers():
+                handler.addFilter(self._filter)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops drawing and clears the live display"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for handler in get_output_handlers():
+            handler.removeFilter(self._filter)
+        self.clear()
+
+    async def _run(self) -> None:
+        interval = self.interval if self.live else self.log_interval
+        while True:
+            await asyncio.sleep(interval)
+            if self.live:
+                self.render()
+            else:
+                self.log()
+
+    def render(self) -> None:
+        """Redraws the live display in place"""
+        lines = [format_progress_line(p) for p in list(self.tracker.tables.values())]
+        with self._lock:
+            self._clear()
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            self._drawn_lines = len(lines)
+
+    def log(self) -> None:
+        """Logs one line per active table"""
+        for progress in list(self.tracker.tables.values()):
+            self._logger.info(format_progress_record(progress))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        if self._drawn_lines:
+            # move to the first drawn line and erase to the end of the screen
+            self.stream.write(f"\x1b[{self._drawn_lines}F\x1b[J")
+            self.stream.flush()
+            self._drawn_lines = 0
@@ -0,0 +1,123 @@
+import json
+import time
+import logging
+
+TRANSIENT_SQLSTATES = (
+    "08",
+    "40001",
+    "40P01",
+    "53300",
+    "57P01",
+    "57P02",
+    "57P03",
+    "HYT00",
+    "HYT01",
+)
+"""
+SQLSTATE classes and codes of errors that may not happen again on a new connection,
+such as lost connections, deadlocks, serialization failures and timeouts.
+"""
+DATA_SQLSTATES = ("22", "23")
+"""
+SQLSTATE classes of errors caused by the inserted values, data exceptions and integrity constraint violations.
+"""
+
+
+def get_sqlstate(e: BaseException) -> str | None:
+    """Gets the SQLSTATE of a driver error
+
+    :param e: error
+    :type e: BaseException
+    :return: SQLSTATE, or None if the error does not have one
+    :rtype: str | None
+    """
+    # pyodbc errors are raised with the SQLSTATE as their first argument
+    if e.args and isinstance(e.args[0], str) and len(e.args[0]) == 5:
+        return e.args[0]
+    return None
+
+
+def is_transient_error(e: BaseException) -> bool:
+    sqlstate = get_sqlstate(e)
+    return sqlstate is not None and sqlstate.startswith(TRANSIENT_SQLSTATES)
+
+
+def is_data_error(e: BaseException) -> bool:
+    sqlstate = get_sqlstate(e)
+    return sqlstate is not None and sqlstate.startswith(DATA_SQLSTATES)
+
+
+class RetryPolicy:
+    """Decides how often and after how long a chunk that failed with a transient error is retried.
+    The delay doubles with each retry, up to ``max_backoff`` seconds.
+    """
+
+    def __init__(
+        self, retries: int = 3, backoff: float = 1.0, max_backoff: float = 30.0
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(retries={self.retries}, backoff={self.backoff})"
+        )
+
+    def get_delay(self, attempt: int) -> float:
+        """Gets the seconds to wait before a retry
+
+        :param attempt: retry number, starting at 1
+        :type attempt: int
+        :return: delay
+        :rtype: float
+        """
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+
+class DeadLetterWriter:
+    """Appends rows rejected by the target database to a JSON lines file, with the error that rejected them.
+    The file is opened when the first row is written.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.row_count = 0
+        self._file = None
+
+    def write(
+        self, src_table_name: str, tgt_table_name: str, row: dict, error: BaseException
+    ) -> None:
+        """Writes a rejected row
+
+        :param src_table_name: source table name
+        :type src_table_name: str
+        :param tgt_table_name: target table name
+        :type tgt_table_name: str
+        :param row: row values by source column name
+        :type row: dict
+        :param error: error the row was rejected with
+        :type error: BaseException
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        record = {
+            "time": time.time(),
+            "source": src_table_name,
+            "target": tgt_table_name,
+            "sqlstate": get_sqlstate(error),
+            "error": str(error),
+            "row": row,
+        }
+        # values such as decimals, datetimes and bytes are written as their string form
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        self.row_count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logging.getLogger("process.recovery").warning(
+                f"{self.row_count} rejected rows were written to {self.path}"
+            )
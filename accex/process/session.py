@@ -0,0 +1,88 @@
+import logging
+import pyodbc
+
+
+class SessionProfile:
+    """Session settings applied to a target connection when it is created"""
+
+    def __init__(
+        self, settings: dict[str, str] | None = None, unlogged_tables: bool = False
+    ) -> None:
+        """Constructs a new session profile
+
+        :param settings: session variables to set, such as ``{"synchronous_commit": "off"}``, defaults to None
+        :type settings: dict[str, str] | None, optional
+        :param unlogged_tables: create target tables as ``UNLOGGED`` and set them ``LOGGED`` after loading, defaults to False
+        :type unlogged_tables: bool, optional
+        """
+        self.settings = settings or dict()
+        self.unlogged_tables = unlogged_tables
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(settings={self.settings}, unlogged_tables={self.unlogged_tables})"
+
+    def get_apply_statements(self) -> list[str]:
+        return [f"SET {name} = '{value}'" for name, value in self.settings.items()]
+
+    def get_restore_statements(self) -> list[str]:
+        return [f"RESET {name}" for name in self.settings]
+
+
+_POSTGRES_SESSION_PROFILES = {
+    "default": SessionProfile(),
+    "bulk": SessionProfile(
+        {
+            "synchronous_commit": "off",
+            "work_mem": "256MB",
+            "maintenance_work_mem": "1GB",
+        }
+    ),
+    "bulk_unlogged": SessionProfile(
+        {
+            "synchronous_commit": "off",
+            "work_mem": "256MB",
+            "maintenance_work_mem": "1GB",
+        },
+        unlogged_tables=True,
+    ),
+}
+
+SESSION_PROFILES: dict[str, dict[str, SessionProfile]] = {
+    "PostgreSQL Unicode": _POSTGRES_SESSION_PROFILES,
+    "PostgreSQL ANSI": _POSTGRES_SESSION_PROFILES,
+}
+"""
+Maps the driver name to the named session profiles that can be selected with ``TARGET_SESSION_PROFILE``.
+"""
+
+
+def get_session_profile(driver_name: str, profile_name: str) -> SessionProfile | None:
+    """Gets a session profile for a driver
+
+    :param driver_name: name of the driver
+    :type driver_name: str
+    :param profile_name: name of the profile
+    :type profile_name: str
+    :return: profile, or None if the driver does not have the profile
+    :rtype: SessionProfile | None
+    """
+    if not profile_name:
+        return None
+    profile = SESSION_PROFILES.get(driver_name, dict()).get(profile_name)
+    if profile is None:
+        logging.getLogger("process.session").warning(
+            f"driver [{driver_name}] has no session profile named [{profile_name}]"
+        )
+    return profile
+
+
+def apply_session_profile(conn: pyodbc.Connection, profile: SessionProfile) -> None:
+    """Applies a session profile to a newly created connection
+
+    :param conn: connection
+    :type conn: pyodbc.Connection
+    :param profile: profile
+    :type profile: SessionProfile
+    """
+    for statement in profile.get_apply_statements():
+        conn.execute(statement)
@@ -0,0 +1,172 @@
+import logging
+import aioodbc
+
+SHADOW_SUFFIX = "__accex_new"
+"""
+Suffix of the shadow table a target table is loaded into before it is swapped in.
+"""
+
+
+class SwapError(Exception):
+    pass
+
+
+def get_shadow_table_name(table_name: str) -> str:
+    """Gets the name of the shadow table of a target table
+
+    :param table_name: target table name, optionally schema qualified
+    :type table_name: str
+    :return: shadow table name, in the same schema
+    :rtype: str
+    """
+    return table_name + SHADOW_SUFFIX
+
+
+def _unqualified(table_name: str) -> str:
+    return table_name.rsplit(".", 1)[-1]
+
+
+def _qualify(table_name: str, relation_name: str) -> str:
+    # indexes and sequences live in the schema of their table
+    if "." in table_name:
+        return f'{table_name.rsplit(".", 1)[0]}."{relation_name}"'
+    return f'"{relation_name}"'
+
+
+async def _fetchall(cur: aioodbc.Cursor, sql: str, params: list) -> list:
+    await cur.execute(sql, params)
+    return await cur.fetchall()
+
+
+async def _get_oid(cur: aioodbc.Cursor, table_name: str) -> int | None:
+    rows = await _fetchall(cur, "SELECT to_regclass(?)::oid", [table_name])
+    return rows[0][0] if rows else None
+
+
+async def _rename_shadow_relations(cur: aioodbc.Cursor, table_name: str) -> None:
+    """Renames the indexes, constraints and owned sequences of a swapped in table,
+    so the next shadow table can be created with the same names.
+    """
+    shadow_prefix = _unqualified(get_shadow_table_name(table_name))
+    prefix = _unqualified(table_name)
+
+    def rename(name: str) -> str:
+        return prefix + name[len(shadow_prefix) :]
+
+    # renaming an index also renames the constraint it backs
+    for (index_name,) in await _fetchall(
+        cur,
+        "SELECT i.relname FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid WHERE x.indrelid = to_regclass(?)",
+        [table_name],
+    ):
+        if index_name.startswith(shadow_prefix):
+            await cur.execute(
+                f'ALTER INDEX {_qualify(table_name, index_name)} RENAME TO "{rename(index_name)}"'
+            )
+    for (constraint_name,) in await _fetchall(
+        cur,
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(?)",
+        [table_name],
+    ):
+        if constraint_name.startswith(shadow_prefix):
+            await cur.execute(
+                f'ALTER TABLE {table_name} RENAME CONSTRAINT "{constraint_name}" TO "{rename(constraint_name)}"'
+            )
+    for (sequence_name,) in await _fetchall(
+        cur,
+        "SELECT s.relname FROM pg_class s JOIN pg_depend d ON d.objid = s.oid "
+        "WHERE s.relkind = 'S' AND d.refobjid = to_regclass(?) AND d.deptype IN ('a', 'i')",
+        [table_name],
+    ):
+        if sequence_name.startswith(shadow_prefix):
+            await cur.execute(
+                f'ALTER SEQUENCE {_qualify(table_name, sequence_name)} RENAME TO "{rename(sequence_name)}"'
+            )
+
+
+async def swap_shadow_tables(
+    conn: aioodbc.Connection,
+    table_names: list[str],
+    foreign_key_statements: list[str],
+) -> list[str]:
+    """Replaces target tables with their loaded shadow tables in one transaction.
+    Readers see either the old tables or the new tables.
+
+    Foreign keys of other tables that reference a replaced table are dropped and added again referencing the new table,
+    and ``foreign_key_statements`` add the foreign keys of the loaded tables. Foreign keys are added ``NOT VALID``
+    so the transaction does not scan the tables, use the returned statements to validate them after it commits.
+    The old tables are dropped without ``CASCADE``, so the swap fails instead of dropping views or other dependents.
+
+    :param conn: target connection, must not be in autocommit mode
+    :type conn: aioodbc.Connection
+    :param table_names: target tables to replace
+    :type table_names: list[str]
+    :param foreign_key_statements: ``ALTER TABLE ... ADD FOREIGN KEY`` statements of the target tables
+    :type foreign_key_statements: list[str]
+    :raises SwapError: if the swap failed, the transaction is rolled back and the shadow tables are kept
+    :return: statements that validate the added foreign keys
+    :rtype: list[str]
+    """
+    logger = logging.getLogger("process.shadow")
+    validate_statements = []
+    cur = await conn.cursor()
+    try:
+        old_oids = dict()
+        for table_name in table_names:
+            if await _get_oid(cur, get_shadow_table_name(table_name)) is None:
+                raise SwapError(f"shadow table of {table_name} does not exist")
+            oid = await _get_oid(cur, table_name)
+            if oid is not None:
+                old_oids[table_name] = oid
+
+        # foreign keys of tables outside of the load would keep pointing at the old tables
+        dependent_foreign_keys = []
+        for table_name, oid in old_oids.items():
+            for fk_table, fk_name, fk_def, fk_table_oid in await _fetchall(
+                cur,
+                "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid), conrelid::oid "
+                "FROM pg_constraint WHERE contype = 'f' AND confrelid = ?::oid",
+                [oid],
+            ):
+                if fk_table_oid not in old_oids.values():
+                    dependent_foreign_keys.append((fk_table, fk_name, fk_def))
+        for fk_table, fk_name, _ in dependent_foreign_keys:
+            await cur.execute(f'ALTER TABLE {fk_table} DROP CONSTRAINT "{fk_name}"')
+
+        if old_oids:
+            await cur.execute(f"DROP TABLE {', '.join(old_oids)}")
+        for table_name in table_names:
+            await cur.execute(
+                f"ALTER TABLE {get_shadow_table_name(table_name)} RENAME TO {_unqualified(table_name)}"
+            )
+            await _rename_shadow_relations(cur, table_name)
+
+        for statement in foreign_key_statements:
+            await cur.execute(statement + " NOT VALID")
+        for fk_table, fk_name, fk_def in dependent_foreign_keys:
+            fk_def = fk_def.removesuffix(" NOT VALID")
+            await cur.execute(
+                f'ALTER TABLE {fk_table} ADD CONSTRAINT "{fk_name}" {fk_def} NOT VALID'
+            )
+            validate_statements.append(
+                f'ALTER TABLE {fk_table} VALIDATE CONSTRAINT "{fk_name}"'
+            )
+        for table_name in table_names:
+            for (fk_name,) in await _fetchall(
+                cur,
+                "SELECT conname FROM pg_constraint WHERE contype = 'f' AND NOT convalidated AND conrelid = to_regclass(?)",
+                [table_name],
+            ):
+                validate_statements.append(
+                    f'ALTER TABLE {table_name} VALIDATE CONSTRAINT "{fk_name}"'
+                )
+        await conn.commit()
+    except Exception as e:
+        await conn.rollback()
+        raise SwapError(f"could not swap in {', '.join(table_names)} - {e}")
+    finally:
+        await cur.close()
+    logger.info(
+        f"swapped in {', '.join(table_names)}, re-pointed {len(dependent_foreign_keys)} dependent foreign keys"
+    )
+    return validate_statements
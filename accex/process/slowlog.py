@@ -0,0 +1,213 @@
+import re
+import json
+import time
+import logging
+import logging.handlers
+from typing import AsyncIterator
+
+SLOW_LOG_THRESHOLD_DEFAULT = 1.0
+"""
+Default seconds a fetch, lookup or insert may take before it is written to the slow log.
+"""
+
+SLOW_LOG_MAX_BYTES = 10 * 1024 * 1024
+"""
+Size of a slow log file before it is rotated.
+"""
+
+SLOW_LOG_BACKUP_COUNT = 5
+"""
+Amount of rotated slow log files that are kept.
+"""
+
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"(\(\?(?:\.\.\.)?\))(?:\s*,\s*\(\?(?:\.\.\.)?\))+")
+
+
+def get_statement_shape(sql: str) -> str:
+    """Gets the shape of a statement, with lists of placeholders collapsed,
+    so chunks of different sizes have the same shape
+
+    ``INSERT INTO t (a,b) VALUES (?,?),(?,?)`` becomes ``INSERT INTO t (a,b) VALUES (?...), ...``
+
+    :param sql: statement
+    :type sql: str
+    :return: shape
+    :rtype: str
+    """
+    shape = _PLACEHOLDER_LIST.sub("?...", sql)
+    return _ROW_LIST.sub(r"\1, ...", shape)
+
+
+def get_value_size(value) -> int:
+    """Gets the approximate size of a value in bytes, as sent to or received from a database
+
+    :param value: value
+    :type value: Any
+    :return: size
+    :rtype: int
+    """
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        # ASCII strings are not encoded, their length is their size
+        if value.isascii():
+            return len(value)
+        return len(value.encode("utf-8", errors="replace"))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    # decimals, dates and other values are sized by their string form
+    return len(str(value))
+
+
+class SlowLog:
+    """Writes fetches, lookups and inserts that take longer than a threshold to a rotating JSON lines file,
+    and keeps a summary of the slowest statement shapes per table.
+    The file is opened when the first operation is written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = SLOW_LOG_THRESHOLD_DEFAULT,
+        max_bytes: int = SLOW_LOG_MAX_BYTES,
+        backup_count: int = SLOW_LOG_BACKUP_COUNT,
+    ) -> None:
+        """Constructs a new slow log
+
+        :param path: path of the JSON lines file
+        :type path: str
+        :param threshold: seconds an operation may take before it is written, defaults to SLOW_LOG_THRESHOLD_DEFAULT
+        :type threshold: float, optional
+        :param max_bytes: size of the file before it is rotated, defaults to SLOW_LOG_MAX_BYTES
+        :type max_bytes: int, optional
+        :param backup_count: amount of rotated files that are kept, defaults to SLOW_LOG_BACKUP_COUNT
+        :type backup_count: int, optional
+        """
+        self.path = path
+        self.threshold = threshold
+        self.entry_count = 0
+        # (kind, table, shape) -> [count, total, max]
+        self.offenders: dict[tuple[str, str, str | None], list] = {}
+        self._handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+
+    def record(
+        self,
+        kind: str,
+        table_name: str,
+        elapsed: float,
+        chunk_index: int | None = None,
+        sql: str | None = None,
+        params: list | None = None,
+        row_count: int | None = None,
+        rows: list[list] | None = None,
+    ) -> bool:
+        """Records an operation if it took longer than the threshold.
+        Sizes are only computed for operations that are written.
+
+        :param kind: kind of operation, such as ``fetch``, ``lookup`` or ``insert``
+        :type kind: str
+        :param table_name: source table being transferred
+        :type table_name: str
+        :param elapsed: seconds the operation took
+        :type elapsed: float
+        :param chunk_index: index of the chunk, starting at 1, defaults to None
+        :type chunk_index: int | None, optional
+        :param sql: statement, defaults to None
+        :type sql: str | None, optional
+        :param params: statement parameters, defaults to None
+        :type params: list | None, optional
+        :param row_count: amount of rows, defaults to None
+        :type row_count: int | None, optional
+        :param rows: fetched rows, used for the row count and size when there are no parameters, defaults to None
+        :type rows: list[list] | None, optional
+        :return: whether the operation was written
+        :rtype: bool
+        """
+        if elapsed < self.threshold:
+            return False
+        shape = None if sql is None else get_statement_shape(sql)
+        if rows is not None:
+            row_count = len(rows)
+            byte_count = sum(get_value_size(v) for row in rows for v in row)
+        else:
+            byte_count = sum(get_value_size(v) for v in params or ())
+        entry = {
+            "time": time.time(),
+            "kind": kind,
+            "table": table_name,
+            "chunk": chunk_index,
+            "shape": shape,
+            "params": len(params) if params is not None else None,
+            "rows": row_count,
+            "bytes": byte_count,
+            "elapsed": round(elapsed, 6),
+        }
+        self._handler.handle(logging.makeLogRecord({"msg": json.dumps(entry)}))
+        self.entry_count += 1
+        offender = self.offenders.setdefault((kind, table_name, shape), [0, 0.0, 0.0])
+        offender[0] += 1
+        offender[1] += elapsed
+        offender[2] = max(offender[2], elapsed)
+        return True
+
+    async def time_chunks(
+        self, chunks: AsyncIterator[list[list]], table_name: str
+    ) -> AsyncIterator[list[list]]:
+        """Passes chunks through, recording how long each one took to fetch
+
+        :param chunks: chunks of a source
+        :type chunks: AsyncIterator[list[list]]
+        :param table_name: source table name
+        :type table_name: str
+        :yield: chunks
+        :rtype: AsyncIterator[list[list]]
+        """
+        chunk_index = 0
+        while True:
+            start_time = time.perf_counter()
+            try:
+                rows = await anext(chunks)
+            except StopAsyncIteration:
+                return
+            chunk_index += 1
+            self.record(
+                "fetch",
+                table_name,
+                time.perf_counter() - start_time,
+                chunk_index,
+                rows=rows,
+            )
+            yield rows
+
+    def get_summary_lines(self, count: int = 10) -> list[str]:
+        """Gets one line per offender with the most total time, an offender being a statement shape of a table
+
+        :param count: amount of offenders, defaults to 10
+        :type count: int, optional
+        :return: lines
+        :rtype: list[str]
+        """
+        offenders = sorted(self.offenders.items(), key=lambda item: -item[1][1])
+        return [
+            f"{kind:<6} {table_name:<24} count {n:>6} total {total:>10.4f} max {max_elapsed:>10.4f}"
+            + ("" if shape is None else f" {shape[:120]}")
+            for (kind, table_name, shape), (n, total, max_elapsed) in offenders[:count]
+        ]
+
+    def close(self) -> None:
+        self._handler.close()
+        if self.entry_count:
+            logging.getLogger("process.slowlog").warning(
+                f"{self.entry_count} slow operations were written to {self.path}"
+            )
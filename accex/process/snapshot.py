@@ -0,0 +1,183 @@
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+from .util import get_dsn_param
+from .staging import get_file_fingerprint
+
+
+class SnapshotError(Exception):
+    """Raised when a source file could not be copied consistently"""
+
+
+SNAPSHOT_DIR_DEFAULT = os.path.join(tempfile.gettempdir(), "accex_snapshots")
+"""
+Default directory for local copies of source database files.
+"""
+SNAPSHOT_BUFFER_SIZE = 16 * 1024 * 1024
+"""
+Size of each sequential read when copying a source file.
+Large reads are much faster than the small random reads the Access driver makes over a network share.
+"""
+SNAPSHOT_RETRIES = 3
+"""
+Amount of times a copy is attempted when the source file changes while it is being copied.
+"""
+
+
+def get_snapshot_path(snapshot_dir: str, source_path: str) -> str:
+    """Gets the path of the local copy of a source file.
+    Files with the same name in different directories get different copies.
+
+    :param snapshot_dir: snapshot directory
+    :type snapshot_dir: str
+    :param source_path: source file path
+    :type source_path: str
+    :return: snapshot file path
+    :rtype: str
+    """
+    source_path = os.path.abspath(source_path)
+    digest = hashlib.sha1(os.path.normcase(source_path).encode()).hexdigest()[:12]
+    name, extension = os.path.splitext(os.path.basename(source_path))
+    return os.path.join(snapshot_dir, f"{name}-{digest}{extension}")
+
+
+def _read_snapshot_info(snapshot_path: str) -> dict | None:
+    try:
+        with open(snapshot_path + ".json", "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_snapshot_current(snapshot_path: str, source_fingerprint: dict | None) -> bool:
+    """Checks if a snapshot was copied from the current version of the source file
+
+    :param snapshot_path: snapshot file path
+    :type snapshot_path: str
+    :param source_fingerprint: fingerprint of the source file
+    :type source_fingerprint: dict | None
+    :return: whether the snapshot can be reused
+    :rtype: bool
+    """
+    if not source_fingerprint:
+        return False
+    info = _read_snapshot_info(snapshot_path)
+    snapshot_fingerprint = get_file_fingerprint(snapshot_path)
+    return (
+        info is not None
+        and snapshot_fingerprint is not None
+        and info.get("source_fingerprint") == source_fingerprint
+        and snapshot_fingerprint["size"] == source_fingerprint["size"]
+    )
+
+
+def create_snapshot(
+    source_path: str, snapshot_dir: str, force: bool = False
+) -> tuple[str, bool]:
+    """Copies a source file into the snapshot directory with large sequential reads.
+    The copy is verified against the size and modification time of the source, and is reused while they do not change.
+
+    :param source_path: source file path
+    :type source_path: str
+    :param snapshot_dir: snapshot directory
+    :type snapshot_dir: str
+    :param force: copy even if the existing snapshot is current, defaults to False
+    :type force: bool, optional
+    :raises SnapshotError: if the source file is missing or keeps changing while it is copied
+    :return: snapshot file path, and whether it was reused
+    :rtype: tuple[str, bool]
+    """
+    snapshot_path = get_snapshot_path(snapshot_dir, source_path)
+    source_fingerprint = get_file_fingerprint(source_path)
+    if source_fingerprint is None:
+        raise SnapshotError(f"source file [{source_path}] does not exist")
+    if not force and is_snapshot_current(snapshot_path, source_fingerprint):
+        return snapshot_path, True
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_path = snapshot_path + ".tmp"
+    for _ in range(SNAPSHOT_RETRIES):
+        with open(source_path, "rb") as src, open(tmp_path, "wb") as dst:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            shutil.copyfileobj(src, dst, SNAPSHOT_BUFFER_SIZE)
+        copied_fingerprint = get_file_fingerprint(source_path)
+        if (
+            copied_fingerprint == source_fingerprint
+            and os.path.getsize(tmp_path) == source_fingerprint["size"]
+        ):
+            break
+        # the source changed while copying, try again with the new version
+        source_fingerprint = copied_fingerprint
+        if source_fingerprint is None:
+            break
+    else:
+        os.remove(tmp_path)
+        raise SnapshotError(
+            f"source file [{source_path}] changed during {SNAPSHOT_RETRIES} copy attempts"
+        )
+    if source_fingerprint is None:
+        os.remove(tmp_path)
+        raise SnapshotError(f"source file [{source_path}] was removed while copying")
+
+    os.replace(tmp_path, snapshot_path)
+    with open(snapshot_path + ".json", "w") as file:
+        json.dump({"source_fingerprint": source_fingerprint}, file)
+    return snapshot_path, False
+
+
+class SnapshotManager:
+    """Copies each distinct source file once per run and shares the copy between the tables that read it"""
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR_DEFAULT) -> None:
+        self.snapshot_dir = snapshot_dir
+        self._snapshots: dict[str, str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._logger = logging.getLogger("process.snapshot")
+
+    async def get_snapshot(self, source_path: str) -> str:
+        """Gets the local copy of a source file, copying it on first use
+
+        :param source_path: source file path
+        :type source_path: str
+        :return: snapshot file path
+        :rtype: str
+        """
+        key = os.path.normcase(os.path.abspath(source_path))
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._snapshots:
+                snapshot_path, reused = await asyncio.to_thread(
+                    create_snapshot, source_path, self.snapshot_dir
+                )
+                if reused:
+                    self._logger.info(
+                        f"reusing snapshot of [{source_path}] at {snapshot_path}"
+                    )
+                else:
+                    self._logger.info(
+                        f"copied snapshot of [{source_path}] to {snapshot_path}"
+                    )
+                self._snapshots[key] = snapshot_path
+        return self._snapshots[key]
+
+    async def apply(self, dsn_params: dict) -> dict:
+        """Rewrites the ``DBQ`` param to point at the local copy of the source file
+
+        :param dsn_params: source DSN params
+        :type dsn_params: dict
+        :return: DSN params reading from the snapshot
+        :rtype: dict
+        """
+        dbq = get_dsn_param(dsn_params, "DBQ")
+        if not dbq:
+            return dsn_params
+        snapshot_path = await self.get_snapshot(str(dbq))
+        return {
+            **{k: v for k, v in dsn_params.items() if k.lower() != "dbq"},
+            "DBQ": snapshot_path,
+        }
@@ -0,0 +1,305 @@
+import os
+import mmap
+import json
+import zlib
+import uuid
+import base64
+import struct
+import decimal
+import datetime
+from typing import Iterator
+from ..config import core as ac
+from .util import get_dsn_param
+
+
+class StagingError(Exception):
+    """Raised when a staging file is missing, invalid or out of date"""
+
+
+STAGING_MAGIC = b"ACCEXSTG"
+STAGING_VERSION = 2
+STAGING_EXTENSION = ".accexs"
+STAGING_DIR_DEFAULT = "accex_staging"
+"""
+Default directory for staging files, relative to the working directory.
+"""
+STAGING_CHUNK_ROWS = 10000
+"""
+Amount of rows stored per compressed chunk in a staging file.
+Chunks are regrouped to the insert chunk size when loading.
+"""
+STAGING_COMPRESS_LEVEL = 6
+
+# magic, version, header length
+_PREFIX = struct.Struct("<8sHI")
+# index length, magic
+_SUFFIX = struct.Struct("<I8s")
+
+# key of the type of a tagged value, values JSON cannot hold are stored as tagged objects
+_TAG = "__accex__"
+_DECODERS = {
+    "decimal": decimal.Decimal,
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+    "bytes": base64.b64decode,
+    "uuid": uuid.UUID,
+}
+
+
+def _encode_value(value) -> dict:
+    if isinstance(value, decimal.Decimal):
+        return {_TAG: "decimal", "value": str(value)}
+    # datetimes are dates too
+    if isinstance(value, datetime.datetime):
+        return {_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {_TAG: "time", "value": value.isoformat()}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_TAG: "bytes", "value": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, uuid.UUID):
+        return {_TAG: "uuid", "value": str(value)}
+    raise TypeError(f"values of type {type(value).__name__} cannot be staged")
+
+
+def _decode_value(obj: dict):
+    # source values are never objects, so every object is a tagged value
+    decode = _DECODERS.get(obj.get(_TAG))
+    if decode is None or not isinstance(obj.get("value"), str):
+        raise StagingError(f"invalid staged value {obj}")
+    try:
+        return decode(obj["value"])
+    except (ValueError, decimal.InvalidOperation) as e:
+        raise StagingError(f"invalid staged value {obj} - {e}")
+
+
+def get_file_fingerprint(path: str) -> dict | None:
+    """Gets a cheap fingerprint of a file from its size and modification time
+
+    :param path: file path
+    :type path: str
+    :return: fingerprint, or None if the file does not exist
+    :rtype: dict | None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def get_source_fingerprint(dsn_params: dict) -> dict | None:
+    """Gets the fingerprint of the source database file referenced by ``DBQ``
+
+    :param dsn_params: source DSN params
+    :type dsn_params: dict
+    :return: fingerprint, or None if there is no database file
+    :rtype: dict | None
+    """
+    dbq = get_dsn_param(dsn_params, "DBQ")
+    if not dbq:
+        return None
+    return get_file_fingerprint(str(dbq))
+
+
+def get_staging_path(
+    staging_dir: str, source_table_pointer: ac.SourceTablePointer
+) -> str:
+    """Gets the path of the staging file for a source table
+
+    :param staging_dir: staging directory
+    :type staging_dir: str
+    :param source_table_pointer: source table
+    :type source_table_pointer: ac.SourceTablePointer
+    :return: staging file path
+    :rtype: str
+    """
+    return os.path.join(staging_dir, str(source_table_pointer) + STAGING_EXTENSION)
+
+
+class StagingWriter:
+    """Writes rows of a source table to a compressed columnar staging file.
+
+    The file is a small JSON schema header, followed by zlib compressed JSON chunks that each hold
+    a list of columns, followed by an index of chunk offsets.
+    Decimals, dates, times, bytes and UUIDs are stored as tagged objects, so reading a file never runs code from it.
+    Data is written to a temporary file that replaces the staging file on ``close()``.
+    """
+
+    def __init__(self, path: str, header: dict) -> None:
+        self.path = path
+        self.header = {**header, "version": STAGING_VERSION}
+        self.row_count = 0
+        self._index: list[tuple[int, int, int]] = []
+        self._buffer: list = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        header_bytes = json.dumps(self.header).encode()
+        self._file.write(
+            _PREFIX.pack(STAGING_MAGIC, STAGING_VERSION, len(header_bytes))
+        )
+        self._file.write(header_bytes)
+
+    def __enter__(self) -> "StagingWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_rows(self, rows: list) -> None:
+        self._buffer.extend(rows)
+        while len(self._buffer) >= STAGING_CHUNK_ROWS:
+            self._write_chunk(self._buffer[:STAGING_CHUNK_ROWS])
+            del self._buffer[:STAGING_CHUNK_ROWS]
+
+    def _write_chunk(self, rows: list) -> None:
+        columns = [list(c) for c in zip(*rows)]
+        data = zlib.compress(
+            json.dumps(columns, separators=(",", ":"), default=_encode_value).encode(),
+            STAGING_COMPRESS_LEVEL,
+        )
+        self._index.append((self._file.tell(), len(data), len(rows)))
+        self._file.write(data)
+        self.row_count += len(rows)
+
+    def close(self) -> None:
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._buffer = []
+        index_bytes = json.dumps(
+            {"row_count": self.row_count, "chunks": self._index}
+        ).encode()
+        self._file.write(index_bytes)
+        self._file.write(_SUFFIX.pack(len(index_bytes), STAGING_MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def read_staging_header(path: str) -> dict:
+    """Reads only the schema header of a staging file
+
+    :param path: staging file path
+    :type path: str
+    :raises StagingError: if the file is not a staging file
+    :return: header
+    :rtype: dict
+    """
+    with open(path, "rb") as file:
+        prefix = file.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise StagingError(f"[{path}] is not a staging file")
+        magic, version, header_len = _PREFIX.unpack(prefix)
+        if magic != STAGING_MAGIC or version != STAGING_VERSION:
+            raise StagingError(
+                f"[{path}] is not a version {STAGING_VERSION} staging file"
+            )
+        return json.loads(file.read(header_len))
+
+
+class StagingReader:
+    """Reads a staging file through a memory map"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise StagingError(f"[{path}] is empty")
+        magic, version, header_len = _PREFIX.unpack_from(self._mm, 0)
+        index_len, end_magic = _SUFFIX.unpack_from(
+            self._mm, len(self._mm) - _SUFFIX.size
+        )
+        if STAGING_MAGIC != magic or STAGING_MAGIC != end_magic:
+            self.close()
+            raise StagingError(f"[{path}] is not a complete staging file")
+        if version != STAGING_VERSION:
+            self.close()
+            raise StagingError(
+                f"[{path}] is not a version {STAGING_VERSION} staging file"
+            )
+        self.header: dict = json.loads(
+            self._mm[_PREFIX.size : _PREFIX.size + header_len]
+        )
+        index_end = len(self._mm) - _SUFFIX.size
+        index = json.loads(self._mm[index_end - index_len : index_end])
+        self.row_count: int = index["row_count"]
+        self._chunks: list = index["chunks"]
+
+    def __enter__(self) -> "StagingReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def columns(self) -> list[str]:
+        return self.header["columns"]
+
+    def iter_chunks(self) -> Iterator[list[list]]:
+        """Iterates stored chunks as lists of rows"""
+        for offset, length, _ in self._chunks:
+            columns = json.loads(
+                zlib.decompress(self._mm[offset : offset + length]),
+                object_hook=_decode_value,
+            )
+            yield [list(row) for row in zip(*columns)]
+
+    def iter_rows(self, chunk_size: int) -> Iterator[list[list]]:
+        """Iterates rows regrouped into chunks of ``chunk_size`` rows"""
+        buffer = []
+        for rows in self.iter_chunks():
+            buffer.extend(rows)
+            while len(buffer) >= chunk_size:
+                yield buffer[:chunk_size]
+                buffer = buffer[chunk_size:]
+        if buffer:
+            yield buffer
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+
+def is_staging_current(
+    path: str, columns: list[str], source_fingerprint: dict | None
+) -> bool:
+    """Checks if a staging file can be reused instead of extracting the table again.
+    Files are reused when the columns match and the source database file is unchanged.
+
+    :param path: staging file path
+    :type path: str
+    :param columns: source columns that will be extracted
+    :type columns: list[str]
+    :param source_fingerprint: fingerprint of the source database file
+    :type source_fingerprint: dict | None
+    :return: whether the staging file is current
+    :rtype: bool
+    """
+    if not source_fingerprint or not os.path.exists(path):
+        return False
+    try:
+        header = read_staging_header(path)
+    except (StagingError, OSError, ValueError):
+        return False
+    return (
+        header.get("columns") == columns
+        and header.get("source_fingerprint") == source_fingerprint
+    )
@@ -0,0 +1,176 @@
+import re
+import asyncio
+import hashlib
+import importlib
+from concurrent.futures import Executor
+from typing import Callable
+
+
+class TransformError(Exception):
+    pass
+
+
+class Transform:
+    """A registered column transform.
+    The function receives all values of one column of a chunk and returns the transformed values.
+    """
+
+    def __init__(
+        self, name: str, func: Callable[[list], list], heavy: bool = False
+    ) -> None:
+        """Constructs a new transform
+
+        :param name: name used with ``USING`` in the config
+        :type name: str
+        :param func: function that transforms a list of column values, must be importable by name to run in a process pool
+        :type func: Callable[[list], list]
+        :param heavy: run in a worker process instead of the event loop thread, defaults to False
+        :type heavy: bool, optional
+        """
+        self.name = name
+        self.func = func
+        self.heavy = heavy
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, heavy={self.heavy})"
+
+
+TRANSFORMS: dict[str, Transform] = {}
+"""
+Maps a transform name to a registered transform.
+"""
+
+
+def register_transform(name: str | None = None, heavy: bool = False):
+    """Decorator that registers a column transform
+
+    .. code-block:: python
+
+        @register_transform("normalize_phone")
+        def normalize_phone(values: list) -> list:
+            ...
+
+    :param name: name used with ``USING`` in the config, defaults to the function name
+    :type name: str | None, optional
+    :param heavy: run in a worker process instead of the event loop thread, defaults to False
+    :type heavy: bool, optional
+    """
+
+    def decorator(func: Callable[[list], list]) -> Callable[[list], list]:
+        transform_name = name or func.__name__
+        TRANSFORMS[transform_name] = Transform(transform_name, func, heavy)
+        return func
+
+    return decorator
+
+
+def import_transform_modules(module_names: list[str]) -> None:
+    """Imports modules so their ``register_transform`` decorators run
+
+    :param module_names: module names
+    :type module_names: list[str]
+    :raises TransformError: if a module cannot be imported
+    """
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            raise TransformError(
+                f"could not import transform module {module_name} - {e}"
+            )
+
+
+def get_transform(name: str) -> Transform:
+    """Gets a registered transform, or imports one from a ``module:function`` path
+
+    :param name: transform name or path
+    :type name: str
+    :raises TransformError: if the transform does not exist
+    :return: transform
+    :rtype: Transform
+    """
+    if name in TRANSFORMS:
+        return TRANSFORMS[name]
+    if ":" in name:
+        module_name, func_name = name.split(":", 1)
+        try:
+            func = getattr(importlib.import_module(module_name), func_name)
+        except (ImportError, AttributeError) as e:
+            raise TransformError(f"could not import transform {name} - {e}")
+        if name in TRANSFORMS:
+            # the module registered it while being imported
+            return TRANSFORMS[name]
+        transform = TRANSFORMS.get(func_name)
+        if transform is not None and transform.func is func:
+            return transform
+        return Transform(name, func)
+    raise TransformError(
+        f"unknown transform {name}, registered transforms are [{', '.join(TRANSFORMS)}]"
+    )
+
+
+async def run_transforms(
+    transforms: list[Transform], values: list, executor: Executor | None = None
+) -> list:
+    """Runs transforms on the values of one column in order.
+    Heavy transforms run in ``executor`` when it is set.
+
+    :param transforms: transforms
+    :type transforms: list[Transform]
+    :param values: column values
+    :type values: list
+    :param executor: process pool for heavy transforms, defaults to None
+    :type executor: Executor | None, optional
+    :return: transformed values
+    :rtype: list
+    """
+    for transform in transforms:
+        if transform.heavy and executor is not None:
+            values = await asyncio.get_running_loop().run_in_executor(
+                executor, transform.func, values
+            )
+        else:
+            values = transform.func(values)
+        if not isinstance(values, list):
+            values = list(values)
+    return values
+
+
+_NON_PHONE_DIGITS = re.compile(r"[^\d]")
+
+
+@register_transform()
+def strip(values: list) -> list:
+    return [v.strip() if isinstance(v, str) else v for v in values]
+
+
+@register_transform()
+def upper(values: list) -> list:
+    return [v.upper() if isinstance(v, str) else v for v in values]
+
+
+@register_transform()
+def lower(values: list) -> list:
+    return [v.lower() if isinstance(v, str) else v for v in values]
+
+
+def _normalize_phone(v: str) -> str | None:
+    digits = _NON_PHONE_DIGITS.sub("", v)
+    if not digits:
+        return None
+    return "+" + digits if v.lstrip().startswith("+") else digits
+
+
+@register_transform()
+def normalize_phone(values: list) -> list:
+    """Keeps only the digits of phone numbers, and a leading ``+``"""
+    return [_normalize_phone(v) if isinstance(v, str) else v for v in values]
+
+
+@register_transform(heavy=True)
+def sha256(values: list) -> list:
+    """Replaces values with the hex SHA-256 digest of their text"""
+    return [
+        None if v is None else hashlib.sha256(str(v).encode()).hexdigest()
+        for v in values
+    ]
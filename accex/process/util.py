@@ -1,5 +1,25 @@
 import logging
 
+
+def get_dsn_param(dsn_params: dict, key: str, default: str = "") -> str:
+    """Gets a DSN param by key, ignoring case like ODBC does
+
+    :param dsn_params: DSN params
+    :type dsn_params: dict
+    :param key: param name
+    :type key: str
+    :param default: value if the param is missing, defaults to ""
+    :type default: str, optional
+    :return: param value
+    :rtype: str
+    """
+    value = default
+    for k, v in dsn_params.items():
+        if k.lower() == key.lower():
+            value = v
+    return value
+
+
 def generate_max_param_count(conn_str: str, logger: logging.Logger = None):
     import pyodbc
     
@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from ..config import core as ac
+from .metrics import Metrics
+
+
+def get_stall_location(stack: traceback.StackSummary) -> str:
+    """Gets where a stack sample of a blocked event loop was taken,
+    the innermost frame of accex or, if there is none, the innermost frame
+
+    :param stack: stack sample
+    :type stack: traceback.StackSummary
+    :return: location, such as ``accex/process/core.py:120 in transfer``
+    :rtype: str
+    """
+    if not stack:
+        return "unknown"
+    package_dir = os.sep + "accex" + os.sep
+    frame = next(
+        (f for f in reversed(stack) if package_dir in f.filename),
+        stack[-1],
+    )
+    filename = frame.filename
+    if package_dir in filename:
+        filename = "accex" + os.sep + filename.rsplit(package_dir, 1)[1]
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class LoopWatchdog:
+    """Detects callbacks that block the event loop, and every concurrent task with it.
+
+    A heartbeat task sleeps for ``interval`` seconds at a time and measures how late it wakes up.
+    A thread watches the heartbeat, and when it is late by more than ``threshold`` seconds, samples the stack
+    of the event loop thread, which shows the code that blocks it. When the heartbeat wakes up, the stall
+    duration and location are logged and recorded in the metrics as ``loop_stall`` and ``loop_stall.<location>``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ac.loop_default_stall_threshold,
+        interval: float = 0.05,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """Constructs a new watchdog
+
+        :param threshold: seconds the loop may be blocked before a stall is reported, defaults to ac.loop_default_stall_threshold
+        :type threshold: float, optional
+        :param interval: seconds between heartbeats, defaults to 0.05
+        :type interval: float, optional
+        :param metrics: metrics the stalls are recorded in, defaults to None
+        :type metrics: Metrics | None, optional
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.metrics = metrics
+        self.stalls: list[tuple[float, str]] = []
+        self._last_beat = time.monotonic()
+        self._sample: traceback.StackSummary | None = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._logger = logging.getLogger("process.watchdog")
+
+    def start(self) -> None:
+        """Starts watching the running event loop"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(
+            target=self._watch, name="accex-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stops watching"""
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._thread.join()
+        self._thread = None
+
+    async def _beat(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - before - self.interval
+            with self._lock:
+                self._last_beat = now
+                # a sample taken while the loop was not blocked is dropped
+                sample = self._sample
+                self._sample = None
+            if lag >= self.threshold:
+                self._report(lag, sample)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if lag < self.threshold:
+                continue
+            with self._lock:
+                if self._sample is not None:
+                    # one sample per stall, taken once it passes the threshold
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                self._sample = traceback.extract_stack(frame) if frame else None
+
+    def _report(self, lag: float, sample: traceback.StackSummary | None) -> None:
+        location = get_stall_location(sample) if sample else "unknown"
+        self.stalls.append((lag, location))
+        if self.metrics is not None:
+            self.metrics.record("loop_stall", lag)
+            self.metrics.record(f"loop_stall.{location}", lag)
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._logger.warning(
+                "event loop blocked for %.3fs at %s\n%s",
+                lag,
+                location,
+                "".join(sample.format()[-8:]) if sample else "",
+            )
@@ -0,0 +1,194 @@
+import os, sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _timed(name: str, fn) -> None:
+    start = time.perf_counter()
+    row_count = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<24} {row_count:>10} rows {elapsed:>9.3f}s {row_count / max(elapsed, 1e-9):>12.0f} rows/s"
+    )
+
+
+def benchmark_accdb(args: argparse.Namespace) -> None:
+    """Compares reading a table natively (serial and parallel) and through ODBC"""
+    import accex.access as aa
+
+    def read_native(workers: int):
+        def read():
+            return sum(
+                len(rows)
+                for rows in aa.iter_table_batches(
+                    args.path, args.table, batch_size=args.batch_size, workers=workers
+                )
+            )
+
+        return read
+
+    def read_odbc():
+        import pyodbc
+
+        conn = pyodbc.connect(
+            f"Driver={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={os.path.abspath(args.path)}"
+        )
+        cur = conn.cursor()
+        cur.execute(f"SELECT * FROM [{args.table}]")
+        row_count = 0
+        while rows := cur.fetchmany(args.batch_size):
+            row_count += len(rows)
+        conn.close()
+        return row_count
+
+    for _ in range(args.repeat):
+        _timed("native", read_native(0))
+        _timed(f"native ({args.workers} workers)", read_native(args.workers))
+        if args.odbc:
+            _timed("odbc", read_odbc)
+
+
+def benchmark_encoding(args: argparse.Namespace) -> None:
+    """Measures text heavy insert and fetch throughput for each encoding preset"""
+    import pyodbc
+    from accex.process.encoding import ENCODING_PRESETS
+
+    text = ("memo text with accents éàü and symbols €→ " * args.text_length)[
+        : args.text_length
+    ]
+    rows = [(i, text) for i in range(args.rows)]
+    presets = args.presets or list(ENCODING_PRESETS.keys())
+
+    for name in presets:
+        conn = pyodbc.connect(args.conn_str, autocommit=True)
+        ENCODING_PRESETS[name].apply(conn)
+        cur = conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {args.table}")
+        cur.execute(f"CREATE TABLE {args.table} (id int, memo text)")
+
+        def insert():
+            for i in range(0, len(rows), args.batch_size):
+                batch = rows[i : i + args.batch_size]
+                cur.execute(
+                    f"INSERT INTO {args.table} (id, memo) VALUES "
+                    + ",".join("(?,?)" for _ in batch),
+                    [value for row in batch for value in row],
+                )
+            return len(rows)
+
+        def fetch():
+            cur.execute(f"SELECT id, memo FROM {args.table}")
+            row_count = 0
+            while fetched := cur.fetchmany(args.batch_size):
+                row_count += len(fetched)
+            return row_count
+
+        try:
+            _timed(f"{name} insert", insert)
+            _timed(f"{name} fetch", fetch)
+        except pyodbc.Error as e:
+            print(f"{name:<24} failed - {e}")
+        finally:
+            cur.execute(f"DROP TABLE IF EXISTS {args.table}")
+            conn.close()
+
+
+def benchmark_logging(args: argparse.Namespace) -> None:
+    """Measures the logging overhead of one chunk of the transfer loop, with direct and queued handlers"""
+    import logging
+    import tempfile
+    from accex.process.logqueue import setup_queue_logging
+
+    class SlowHandler(logging.FileHandler):
+        # stands in for a slow disk, console or network handler
+        def emit(self, record):
+            time.sleep(args.handler_delay / 1000)
+            super().emit(record)
+
+    logger = logging.getLogger("process.transfer_table")
+    columns = dict((f"Column{i}", f"column_{i}") for i in range(args.columns))
+
+    def run_chunks():
+        # the logging calls of the transfer loop for one chunk
+        for chunk_index in range(args.chunks):
+            logger.debug("finished src col check, beginning insert")
+            logger.debug("inserted [%d] %d rows", 1000, (chunk_index + 1) * 1000)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("columns [%s]", ", ".join(columns.keys()))
+        return args.chunks
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for level in (logging.INFO, logging.DEBUG):
+            for queued in (False, True):
+                handler = SlowHandler(os.path.join(tmp_dir, "benchmark.log"))
+                root = logging.getLogger()
+                listener = None
+                if queued:
+                    listener = setup_queue_logging(level, [handler])
+                else:
+                    for h in root.handlers[:]:
+                        root.removeHandler(h)
+                    root.addHandler(handler)
+                    root.setLevel(level)
+                start = time.perf_counter()
+                run_chunks()
+                elapsed = time.perf_counter() - start
+                if listener is not None:
+                    listener.stop()
+                root.removeHandler(handler)
+                handler.close()
+                name = f"{logging.getLevelName(level).lower()} {'queued' if queued else 'direct'}"
+                print(
+                    f"{name:<24} {args.chunks:>10} chunks {elapsed:>9.3f}s {elapsed / args.chunks * 1e6:>10.1f} us/chunk"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="accex micro benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    accdb_parser = subparsers.add_parser("accdb", help="source table read throughput")
+    accdb_parser.add_argument("path", help="path of the .accdb/.mdb file")
+    accdb_parser.add_argument("table", help="table to read")
+    accdb_parser.add_argument("--batch-size", type=int, default=1000)
+    accdb_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    accdb_parser.add_argument("--repeat", type=int, default=3)
+    accdb_parser.add_argument(
+        "--odbc", action="store_true", help="also read through the ODBC driver"
+    )
+    accdb_parser.set_defaults(run=benchmark_accdb)
+
+    encoding_parser = subparsers.add_parser(
+        "encoding", help="text insert and fetch throughput per encoding preset"
+    )
+    encoding_parser.add_argument("conn_str", help="ODBC connection string")
+    encoding_parser.add_argument("--table", default="accex_benchmark_encoding")
+    encoding_parser.add_argument("--rows", type=int, default=20000)
+    encoding_parser.add_argument("--text-length", type=int, default=2000)
+    encoding_parser.add_argument("--batch-size", type=int, default=1000)
+    encoding_parser.add_argument(
+        "--presets", nargs="*", help="presets to measure, defaults to all"
+    )
+    encoding_parser.set_defaults(run=benchmark_encoding)
+
+    logging_parser = subparsers.add_parser(
+        "logging", help="per chunk logging overhead of the transfer loop"
+    )
+    logging_parser.add_argument("--chunks", type=int, default=2000)
+    logging_parser.add_argument("--columns", type=int, default=20)
+    logging_parser.add_argument(
+        "--handler-delay",
+        type=float,
+        default=0.2,
+        help="milliseconds each record takes to write",
+    )
+    logging_parser.set_defaults(run=benchmark_logging)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
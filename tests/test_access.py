@@ -0,0 +1,69 @@
+import decimal
+import pytest
+import accex.access.core as aa
+
+DATABASE_A = "./tests/databases/database_a.accdb"
+DATABASE_B = "./tests/databases/database_b.accdb"
+
+
+def test_table_names():
+    with aa.AccessDatabase(DATABASE_A) as db:
+        names = db.table_names()
+        assert {"Automobile", "Customer", "Employees"} <= set(names)
+        assert not any(name.startswith("MSys") for name in names)
+        with pytest.raises(KeyError):
+            db.get_table("NotATable")
+
+
+@pytest.mark.parametrize(
+    "path,table_name,row_count",
+    [
+        (DATABASE_A, "Employees", 3),
+        (DATABASE_A, "Automobile", 9),
+        (DATABASE_A, "Customer", 9),
+        (DATABASE_B, "Tasks", 15),
+    ],
+)
+def test_count_rows(path: str, table_name: str, row_count: int):
+    with aa.AccessDatabase(path) as db:
+        table = db.get_table(table_name)
+        assert db.count_rows(table) == row_count
+        assert len(list(db.iter_table_rows(table))) == row_count
+
+
+def test_read_rows():
+    with aa.AccessDatabase(DATABASE_A) as db:
+        rows = list(db.iter_table_rows(db.get_table("employees"), ["Name"]))
+    assert rows[0] == ["Pork, John"]
+
+
+def test_parallel_batches():
+    serial = [
+        row
+        for rows in aa.iter_table_batches(DATABASE_A, "Automobile", batch_size=4)
+        for row in rows
+    ]
+    parallel = [
+        row
+        for rows in aa.iter_table_batches(
+            DATABASE_A, "Automobile", batch_size=4, workers=2
+        )
+        for row in rows
+    ]
+    assert len(serial) == 9
+    assert sorted(map(repr, serial)) == sorted(map(repr, parallel))
+
+
+def test_split_page_ranges():
+    ranges = aa.split_page_ranges(10, 3)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_decode_values():
+    assert aa.decode_text("abc".encode("utf-16le")) == "abc"
+    assert aa.decode_text(b"\xff\xfeabc") == "abc"
+    assert aa.decode_datetime(2.5).isoformat() == "1900-01-01T12:00:00"
+    assert aa.decode_numeric(
+        bytes([0x80]) + bytes(12) + (12345).to_bytes(4, "little"), 2
+    ) == decimal.Decimal("-123.45")
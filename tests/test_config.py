@@ -387,3 +387,57 @@ def test_main(capsys):
         with CWDContext(tmp_path, True):
             ac._main()
     assert e.value.code == 1
+
+
+def test_config_to_dict():
+    import json
+    import yaml
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    config_dict = yaml.load(ac.write_config(config), Loader=yaml.Loader)
+    assert config.to_dict() == config_dict
+    assert json.loads(config.to_json()) == config_dict
+    assert json.loads(ac.write_config_json(config, indent=2)) == config_dict
+    assert config.sources[0].table_pointer.to_dict() == "Automobile"
+    assert config.targets["customers"].to_dict()["TABLE"] == "customers"
+    assert ac.to_serial_obj([config.sources[0].target_pointer]) == [
+        "public.automobiles"
+    ]
+
+
+def test_write_config_stream():
+    import io
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    stream = io.StringIO()
+    assert ac.write_config(config, stream) is None
+    assert stream.getvalue() == ac.write_config(config)
+    assert ac.create_dumper(config).func is ac.create_dumper(None).func
+
+
+def test_parse_column_definition():
+    definition = ac.parse_column_definition("serial primary key")
+    assert definition.data_type == "serial"
+    assert definition.to_sql_str(deferred=False) == "serial"
+    assert [c.kind for c in definition.deferred_constraints] == ["PRIMARY KEY"]
+
+    definition = ac.parse_column_definition(
+        "int constraint fk references customers (id) on delete set null not null"
+    )
+    assert definition.data_type == "int"
+    assert definition.to_sql_str(deferred=False) == "int not null"
+    (foreign_key,) = definition.deferred_constraints
+    assert foreign_key.references == ac.TargetTablePointer.from_str("customers")
+    assert (
+        foreign_key.to_table_constraint_sql_str("customer_id")
+        == "CONSTRAINT fk FOREIGN KEY (customer_id) references customers(id) on delete set null"
+    )
+
+    definition = ac.parse_column_definition("numeric(10, 2) default 0 unique")
+    assert definition.data_type == "numeric(10, 2)"
+    assert definition.to_sql_str(deferred=False) == "numeric(10, 2) default 0"
+
+    with pytest.raises(ValueError):
+        ac.parse_column_definition("primary key")
+    with pytest.raises(ValueError):
+        ac.parse_column_definition("numeric(10, 2")
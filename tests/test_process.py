@@ -172,3 +172,963 @@ async def test_transfer_foreign_keys(shared):
 
     await ap.close_connections()
     
+
+def test_staging_file(tmp_path):
+    import datetime
+    import decimal
+    from accex.process import staging
+
+    staging_path = staging.get_staging_path(str(tmp_path), ac.SourceTablePointer("db_a.table_a"))
+    rows = [[i, f"value {i}", decimal.Decimal("1.25"), datetime.datetime(2020, 1, 1), None, datetime.date(2020, 1, 2), datetime.time(10, 30), b"\x00\xff", i % 2 == 0, 1.5] for i in range(staging.STAGING_CHUNK_ROWS + 5)]
+    columns = ["a", "b", "c", "d", "e", "f", "g", "h", "i", "j"]
+    fingerprint = {"path": "database.accdb", "size": 1, "mtime_ns": 1}
+    with staging.StagingWriter(staging_path, {"columns": columns, "source_fingerprint": fingerprint}) as writer:
+        writer.write_rows(rows[:3])
+        writer.write_rows(rows[3:])
+    with staging.StagingReader(staging_path) as reader:
+        assert reader.row_count == len(rows)
+        assert reader.columns == columns
+        assert [row for chunk in reader.iter_rows(7) for row in chunk] == rows
+    assert staging.is_staging_current(staging_path, columns, fingerprint)
+    assert not staging.is_staging_current(staging_path, columns[:-1], fingerprint)
+    assert not staging.is_staging_current(staging_path, columns, {**fingerprint, "size": 2})
+    assert not staging.is_staging_current(staging_path, columns, None)
+
+    # chunks are data only, objects other than known tagged values are rejected
+    crafted_path = str(tmp_path / "crafted.accexs")
+    for value in [{"__accex__": "pickle", "value": "x"}, {"__accex__": "decimal", "value": "x"}]:
+        with staging.StagingWriter(crafted_path, {"columns": ["a"]}) as writer:
+            writer.write_rows([[value]])
+        with staging.StagingReader(crafted_path) as reader:
+            with pytest.raises(staging.StagingError):
+                list(reader.iter_chunks())
+
+
+def test_native_source_transfer(tmp_path):
+    import asyncio
+    from accex.process import staging
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    config["SOURCE_BACKEND"] = "native"
+    config["SOURCE_WORKERS"] = 2
+    staging_dir = str(tmp_path)
+    assert asyncio.run(ap.extract(config, staging_dir))
+    src_table = next(s for s in config.sources if s.table_pointer.table_name == "Employees")
+    with staging.StagingReader(staging.get_staging_path(staging_dir, src_table.table_pointer)) as reader:
+        assert reader.row_count == 3
+        assert reader.columns == list(src_table.columns.keys())
+
+    # a transfer that stops early closes the batches, which stops the worker processes
+    source = ap._create_source(config, src_table)
+    async def run():
+        await source.open()
+        try:
+            chunks = source.chunks(1)
+            return await anext(chunks)
+        finally:
+            await source.close()
+    assert len(asyncio.run(run())) == 1
+    assert source._batches.gi_frame is None
+
+def test_snapshot(tmp_path):
+    import asyncio
+    from accex.process import snapshot
+
+    source_path = tmp_path / "source" / "database.accdb"
+    source_path.parent.mkdir()
+    source_path.write_bytes(b"a" * 1000)
+    snapshot_dir = str(tmp_path / "snapshots")
+
+    snapshot_path, reused = snapshot.create_snapshot(str(source_path), snapshot_dir)
+    assert not reused
+    with open(snapshot_path, "rb") as file:
+        assert file.read() == b"a" * 1000
+    assert snapshot.create_snapshot(str(source_path), snapshot_dir) == (snapshot_path, True)
+
+    source_path.write_bytes(b"b" * 2000)
+    assert snapshot.create_snapshot(str(source_path), snapshot_dir) == (snapshot_path, False)
+
+    async def apply():
+        manager = snapshot.SnapshotManager(snapshot_dir)
+        params = await manager.apply({"Driver": "x", "dbq": str(source_path)})
+        assert params == {"Driver": "x", "DBQ": snapshot_path}
+        assert await manager.apply({"Driver": "x"}) == {"Driver": "x"}
+    asyncio.run(apply())
+
+
+def test_bulk_load_sql():
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    automobiles = config.targets["automobiles"]
+    assert "references" in ap.get_create_table_sql(automobiles)
+    assert "references" not in ap.get_create_table_sql(automobiles, bulk_load=True)
+    key_statements, foreign_key_statements, references = ap.get_deferred_constraint_sql(automobiles)
+    assert key_statements == ["ALTER TABLE automobiles ADD primary key (id)"]
+    assert foreign_key_statements == ["ALTER TABLE automobiles ADD FOREIGN KEY (customer_id) references customers(id)"]
+    assert references == {ac.TargetTablePointer.from_str("customers")}
+
+
+def test_commit_batcher():
+    import asyncio
+    from accex.process.batching import CommitPolicy, CommitBatcher
+
+    assert not CommitPolicy().enabled
+    assert CommitPolicy(chunks=2).is_due(2, 0)
+    assert not CommitPolicy(chunks=2).is_due(1, 0)
+    assert CommitPolicy(seconds=1).is_due(1, 1.5)
+    assert not CommitPolicy(seconds=1).is_due(0, 1.5)
+
+    config = ac.Config({"COMMIT_EVERY_CHUNKS": 5})
+    src_table = ac.SourceTableBlock({"TABLE": "a", "COMMIT_EVERY_CHUNKS": 2, "COLUMNS": {}})
+    assert CommitPolicy.from_config(config).chunks == 5
+    assert CommitPolicy.from_config(config, src_table).chunks == 2
+
+    class Connection:
+        autocommit = True
+        def __init__(self):
+            self.statements = []
+        async def commit(self):
+            self.statements.append("COMMIT")
+
+    class Cursor:
+        def __init__(self, conn):
+            self.conn = conn
+        async def execute(self, sql, params=None):
+            if sql == "FAIL":
+                raise ValueError("failed chunk")
+            self.conn.statements.append(sql.split(" ")[0])
+
+    async def run():
+        conn = Connection()
+        commits = []
+        batcher = CommitBatcher(conn, Cursor(conn), CommitPolicy(chunks=2), commits.append)
+        await batcher.begin()
+        assert not conn.autocommit
+        for _ in range(3):
+            await batcher.execute_chunk("INSERT", [], 10)
+        assert commits == [20]
+        with pytest.raises(ValueError):
+            await batcher.execute_chunk("FAIL", [], 10)
+        assert commits == [20, 30]
+        assert conn.statements[-2:] == ["ROLLBACK", "COMMIT"]
+        await batcher.close()
+        assert conn.autocommit
+        assert batcher.committed_rows == 30
+    asyncio.run(run())
+
+
+def test_session_profile():
+    from accex.process import session
+
+    profile = session.get_session_profile("PostgreSQL Unicode", "bulk")
+    assert "SET synchronous_commit = 'off'" in profile.get_apply_statements()
+    assert "RESET synchronous_commit" in profile.get_restore_statements()
+    assert session.get_session_profile("PostgreSQL Unicode", "missing") is None
+    assert session.get_session_profile("Other Driver", "bulk") is None
+    assert session.get_session_profile("PostgreSQL Unicode", None) is None
+
+    config = ac.Config({"TARGET_SESSION_PROFILE": "bulk_unlogged"})
+    assert ap.get_tgt_session_profile(config, {"Driver": "PostgreSQL Unicode"}).unlogged_tables
+    tgt_table = ac.TargetTableBlock({"TABLE": "a", "COLUMNS": {"id": "int"}})
+    assert ap.get_create_table_sql(tgt_table, unlogged=True) == "CREATE UNLOGGED TABLE IF NOT EXISTS a (id int)"
+
+
+def test_connection_encoding():
+    from accex.process import encoding
+
+    assert encoding.parse_connection_encoding(None) is None
+    assert encoding.parse_connection_encoding("utf8_narrow") is encoding.ENCODING_PRESETS["utf8_narrow"]
+    parsed = encoding.parse_connection_encoding({"sql_wchar": "utf-16le", "encoding": "utf-8", "ctype": "SQL_CHAR"})
+    assert parsed == encoding.ConnectionEncoding({"SQL_WCHAR": "utf-16le"}, "utf-8", "SQL_CHAR")
+    with pytest.raises(encoding.EncodingError):
+        encoding.parse_connection_encoding("missing")
+    with pytest.raises(encoding.EncodingError):
+        encoding.parse_connection_encoding({"ctype": "SQL_BINARY"})
+
+    config = ac.Config({"TARGET_ENCODING": "utf8"})
+    tgt_table = ac.TargetTableBlock({"TABLE": "a", "COLUMNS": {}, "ENCODING": "missing"})
+    with pytest.raises(ac.ValidationError):
+        ap.get_tgt_encoding(config, tgt_table)
+    del tgt_table["ENCODING"]
+    assert ap.get_tgt_encoding(config, tgt_table) is encoding.ENCODING_PRESETS["utf8"]
+
+
+def test_chunk_coercer():
+    import datetime
+    import decimal
+    from accex.process import coercion
+
+    assert coercion.get_coercion_kind("numeric(10, 2)") == "numeric"
+    assert coercion.get_coercion_kind("double  precision") == "float"
+    assert coercion.get_coercion_kind("timestamp(3) with time zone") == "timestamp"
+    assert coercion.get_coercion_kind("int[]") is None
+
+    src_table = ac.SourceTableBlock({
+        "TABLE": "a",
+        "TARGET_TABLE": "b",
+        "COLUMNS": {"a": "id", "b": "amount", "c": "day", "d": "name", "e": "ref WITH c.id FROM ROW(c.old_id, @value)"},
+    })
+    tgt_table = ac.TargetTableBlock({
+        "TABLE": "b",
+        "COLUMNS": {"id": "int primary key", "amount": "float", "day": "date", "name": "text", "ref": "int"},
+    })
+    assert coercion.get_column_kinds(src_table, tgt_table) == ["int", "float", "date", "text", False]
+
+    coercer = coercion.ChunkCoercer.from_tables(src_table, tgt_table, trim=True, empty_as_null=True)
+    rows = [
+        [decimal.Decimal("1"), decimal.Decimal("2.5"), datetime.datetime(2020, 1, 2, 3), " a ", decimal.Decimal("7")],
+        [decimal.Decimal("2.5"), None, None, "  ", None],
+    ]
+    coercer.apply(rows)
+    assert rows == [
+        [1, 2.5, datetime.date(2020, 1, 2), "a", decimal.Decimal("7")],
+        [decimal.Decimal("2.5"), None, None, None, None],
+    ]
+
+    import pyodbc
+    sql_types = [pyodbc.SQL_DECIMAL, pyodbc.SQL_NUMERIC, pyodbc.SQL_DECIMAL]
+    assert pyodbc.SQL_DECIMAL not in coercion.get_output_converters(["float", "text", False], sql_types)
+    converters = coercion.get_output_converters(["float", "text"], sql_types[:2])
+    assert converters[pyodbc.SQL_DECIMAL](b"1.5") == 1.5
+    assert converters[pyodbc.SQL_NUMERIC](b"1.5") == "1.5"
+
+
+def test_column_transforms():
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+    from accex.process import transforms
+
+    column = ac.parse_source_column_function("phone USING strip, normalize_phone")
+    assert column.transforms == ["strip", "normalize_phone"]
+    assert column.to_dict() == "phone USING strip, normalize_phone"
+
+    config = ac.Config({})
+    src_table = ac.SourceTableBlock({"TABLE": "a", "TARGET_TABLE": "b", "COLUMNS": {"a": "id", "b": "phone USING normalize_phone", "c": "pw USING sha256"}})
+    column_transforms = ap.get_column_transforms(config, src_table)
+    assert [(i, [t.name for t in ts]) for i, ts in column_transforms] == [(1, ["normalize_phone"]), (2, ["sha256"])]
+    assert transforms.get_transform("accex.process.transforms:upper") is transforms.TRANSFORMS["upper"]
+    with pytest.raises(ac.ValidationError):
+        ap.get_column_transforms(config, ac.SourceTableBlock({"TABLE": "a", "COLUMNS": {"a": "id USING missing"}}))
+
+    async def run():
+        phones = await transforms.run_transforms(column_transforms[0][1], [" +1 (555) 010-2000", "n/a", None])
+        assert phones == ["+15550102000", None, None]
+        with ProcessPoolExecutor(1) as executor:
+            hashes = await transforms.run_transforms(column_transforms[1][1], ["secret", None], executor)
+        assert hashes[0] == "2bb80d537b1da3e38bd30361aa855686bde0eacd7162fef6a25fe97bf527a25b" and hashes[1] is None
+    asyncio.run(run())
+
+
+def test_catalog_cache():
+    import asyncio
+    from types import SimpleNamespace
+    from accex.process.catalog import CatalogCache
+
+    class Cursor:
+        def __init__(self):
+            self.calls = []
+            self.rows = []
+        async def tables(self, tableType=None):
+            self.calls.append("tables")
+            self.rows = [SimpleNamespace(table_name="a"), SimpleNamespace(table_name="b")]
+        async def columns(self, table=None, schema=None):
+            self.calls.append("columns")
+            self.rows = [SimpleNamespace(column_name="id", data_type=4), SimpleNamespace(column_name="name", data_type=12)]
+        async def primaryKeys(self, table=None, schema=None):
+            self.calls.append("primaryKeys")
+            self.rows = [SimpleNamespace(column_name="id", key_seq=1)]
+        async def statistics(self, table=None, schema=None, unique=False, quick=True):
+            self.calls.append("statistics")
+            self.rows = [SimpleNamespace(type=0, cardinality=42, index_name=None), SimpleNamespace(type=3, cardinality=42, index_name="a_pk", ordinal_position=1, column_name="id")]
+        async def fetchall(self):
+            return self.rows
+
+    async def run():
+        cur = Cursor()
+        catalog = CatalogCache(cur)
+        assert all(await asyncio.gather(*(catalog.has_table(t) for t in ["a", "b", "a"])))
+        assert not await catalog.has_table("c")
+        assert list(await catalog.get_columns("a")) == ["id", "name"]
+        assert await catalog.get_columns("a") is await catalog.get_columns("a")
+        assert await catalog.get_primary_keys("a") == ["id"]
+        assert await catalog.get_row_count_estimate("a") == 42
+        assert await catalog.get_unique_indexes("a") == {"a_pk": ["id"]}
+        assert cur.calls == ["tables", "columns", "primaryKeys", "statistics"]
+        catalog.invalidate("a")
+        await catalog.has_table("a")
+        await catalog.get_columns("a")
+        assert cur.calls[4:] == ["tables", "columns"]
+    asyncio.run(run())
+
+
+def test_inspection(tmp_path):
+    import os
+    import asyncio
+    import shutil
+    from accex.process import inspection
+
+    dbq = str(tmp_path / "database_a.accdb")
+    shutil.copyfile("./tests/databases/database_a.accdb", dbq)
+    config = ac.Config({
+        "SOURCE_BACKEND": "native",
+        "SOURCE_DSN_PARAMS": {},
+        "INSPECTION_PATH": str(tmp_path / "inspection.json"),
+        "SOURCES": [{"TABLE": "Employees", "DSN_PARAMS": {"DBQ": dbq}, "TARGET_TABLE": "employees", "COLUMNS": {"Name": "name"}}],
+    })
+
+    source_inspection = asyncio.run(ap.inspect(config, config.inspection_path))
+    employees = source_inspection.get_table({"DBQ": dbq}, "employees")
+    assert employees["row_count"] == 3
+    assert "Name" in [c["name"] for c in employees["columns"]]
+    source, target = inspection.generate_table_config("Employees", employees)
+    assert source["COLUMNS"]["Name"] == "name" and target["COLUMNS"]["name"] == "text"
+
+    # unchanged files are not inspected again, changed files are
+    loaded = inspection.SourceInspection.load(config.inspection_path)
+    assert asyncio.run(loaded.refresh(ap.get_inspection_sources(config))) == []
+    os.utime(dbq, ns=(0, 0))
+    assert loaded.get_table({"DBQ": dbq}, "Employees") is None
+    assert asyncio.run(loaded.refresh(ap.get_inspection_sources(config))) == [os.path.abspath(dbq)]
+
+    ap.reset_transfer_context(config)
+    assert ap.get_inspected_table(config, config.sources[0]) is None
+    loaded.save(config.inspection_path)
+    ap.reset_transfer_context(config)
+    ap.validate_inspected_table(config.sources[0], ap.get_inspected_table(config, config.sources[0]))
+    with pytest.raises(ac.ValidationError):
+        ap.validate_inspected_table(ac.SourceTableBlock({"TABLE": "Employees", "COLUMNS": {"Missing": "missing"}}), employees)
+
+
+def test_preflight():
+    import asyncio
+    from accex.process import inspection, preflight
+
+    config = ac.parse_config("""
+TARGETS:
+- TABLE: customers
+  COLUMNS:
+    id: serial primary key
+    old_id: int
+- TABLE: employees
+  COLUMNS:
+    id: serial primary key
+    name: text
+    start_date: int
+    customer_id: int references customers(id)
+SOURCES:
+- TABLE: Employees
+  TARGET_TABLE: employees
+  COLUMNS:
+    Name: name
+    StartDate: start_date
+    Missing: name
+    LastIn: customer_id WITH customers.id FROM ROW(customers.old_id, @value)
+""")
+    tables = inspection.inspect_native_database("./tests/databases/database_a.accdb", ["employees"], False)
+    employees = inspection.find_table(tables, "Employees")
+    employees["columns"].append({"name": "LastIn", "type_name": "datetime"})
+    problems = preflight.check_source_table(config, config.sources[0], employees)
+    assert len(problems) == 3
+    assert "[Employees.StartDate]" in problems[0] and "(int)" in problems[0]
+    assert "[Employees.Missing] source column does not exist" == problems[1]
+    assert "lookup column" in problems[2]
+    assert preflight.check_source_table(config, config.sources[0], None) == ["[Employees] source table does not exist"]
+
+    class Cursor:
+        async def execute(self, sql):
+            self.conn.statements.append(sql)
+            if "bad_type" in sql and "SAVEPOINT" not in sql:
+                raise ValueError("type does not exist")
+        async def fetchone(self):
+            return ["public"]
+        async def close(self):
+            pass
+
+    class Connection:
+        def __init__(self):
+            self.statements = []
+        async def cursor(self):
+            cur = Cursor()
+            cur.conn = self
+            return cur
+        async def rollback(self):
+            self.statements.append("ROLLBACK")
+
+    conn = Connection()
+    problems = asyncio.run(preflight.check_target_ddl(conn, [("a", "CREATE TABLE a (id int)"), ("b", "CREATE TABLE b (id bad_type)")]))
+    assert len(problems) == 1 and problems[0].startswith("[b]")
+    assert conn.statements[-3:] == ["CREATE TABLE b (id bad_type)", "ROLLBACK TO SAVEPOINT accex_preflight", "ROLLBACK"]
+    assert any(s.startswith("SET LOCAL search_path TO accex_preflight_") for s in conn.statements)
+
+
+def test_shadow_swap():
+    import asyncio
+    from accex.process import shadow
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    customers = config.targets["customers"]
+    shadow_name = shadow.get_shadow_table_name("customers")
+    assert ap.get_create_table_sql(customers, True, table_name=shadow_name).startswith("CREATE TABLE IF NOT EXISTS customers__accex_new (id serial,")
+    assert ap.get_deferred_constraint_sql(customers, shadow_name)[0] == ["ALTER TABLE customers__accex_new ADD primary key (id)"]
+    ap.reset_transfer_context()
+    assert ap.get_load_table_sql_str(config, ac.TargetTablePointer.from_str("customers")) == "public.customers"
+    ap.get_transfer_context()["created_tables"]["customers"] = shadow_name
+    assert ap.get_load_table_sql_str(config, ac.TargetTablePointer.from_str("customers")) == shadow_name
+
+    oids = {"customers": 1, "customers__accex_new": 2, "automobiles": 3, "automobiles__accex_new": 4}
+    results = {
+        "SELECT i.relname": [("customers__accex_new_pkey",)],
+        "SELECT s.relname": [("customers__accex_new_id_seq",)],
+        "SELECT conrelid::regclass::text": [("invoices", "invoices_customer_fkey", "FOREIGN KEY (customer_id) REFERENCES customers(id)", 5), ("automobiles", "automobiles_customer_id_fkey", "FOREIGN KEY (customer_id) REFERENCES customers(id)", 3)],
+        "SELECT conname FROM pg_constraint WHERE contype": [("automobiles_customer_id_fkey",)],
+    }
+
+    class Cursor:
+        def __init__(self, conn):
+            self.conn = conn
+            self.rows = []
+        async def execute(self, sql, params=None):
+            self.rows = []
+            if sql.startswith("SELECT to_regclass"):
+                self.rows = [(oids.get(params[0]),)]
+            elif sql.startswith("SELECT"):
+                self.rows = next((rows for prefix, rows in results.items() if sql.startswith(prefix)), [])
+                if "contype = 'f' AND NOT convalidated" in sql and params != ["automobiles"]:
+                    self.rows = []
+                if sql.startswith("SELECT conrelid") and params != [1]:
+                    self.rows = []
+            else:
+                self.conn.statements.append(sql)
+        async def fetchall(self):
+            return self.rows
+        async def close(self):
+            pass
+
+    class Connection:
+        def __init__(self):
+            self.statements = []
+        async def cursor(self):
+            return Cursor(self)
+        async def commit(self):
+            self.statements.append("COMMIT")
+        async def rollback(self):
+            self.statements.append("ROLLBACK")
+
+    conn = Connection()
+    validate_statements = asyncio.run(shadow.swap_shadow_tables(conn, ["customers", "automobiles"], ["ALTER TABLE automobiles ADD FOREIGN KEY (customer_id) references customers(id)"]))
+    assert conn.statements == [
+        'ALTER TABLE invoices DROP CONSTRAINT "invoices_customer_fkey"',
+        "DROP TABLE customers, automobiles",
+        "ALTER TABLE customers__accex_new RENAME TO customers",
+        'ALTER INDEX "customers__accex_new_pkey" RENAME TO "customers_pkey"',
+        'ALTER SEQUENCE "customers__accex_new_id_seq" RENAME TO "customers_id_seq"',
+        "ALTER TABLE automobiles__accex_new RENAME TO automobiles",
+        "ALTER TABLE automobiles ADD FOREIGN KEY (customer_id) references customers(id) NOT VALID",
+        'ALTER TABLE invoices ADD CONSTRAINT "invoices_customer_fkey" FOREIGN KEY (customer_id) REFERENCES customers(id) NOT VALID',
+        "COMMIT",
+    ]
+    assert validate_statements == ['ALTER TABLE invoices VALIDATE CONSTRAINT "invoices_customer_fkey"', 'ALTER TABLE automobiles VALIDATE CONSTRAINT "automobiles_customer_id_fkey"']
+
+    del oids["automobiles__accex_new"]
+    conn = Connection()
+    with pytest.raises(shadow.SwapError):
+        asyncio.run(shadow.swap_shadow_tables(conn, ["customers", "automobiles"], []))
+    assert conn.statements == ["ROLLBACK"]
+
+
+def test_shadow_load_skipped_failure(monkeypatch):
+    import asyncio
+    import builtins
+    import contextlib
+    from accex.process import shadow
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    config["SHADOW_LOAD"] = True
+    config["LOOKUP_INDEXES"] = False
+    config["RECORD_HISTORY"] = False
+
+    async def transfer_table(config, src_table, tgt_table, staging_dir=None):
+        ap.get_transfer_context()["created_tables"][tgt_table.name] = shadow.get_shadow_table_name(tgt_table.name)
+        # customers fails after some of its rows were committed to its shadow table
+        return src_table.table_pointer.table_name != "Customer"
+
+    statements = []
+    swapped = []
+
+    async def execute_statements(conn_str, sql_statements, session_profile=None):
+        statements.extend(sql_statements)
+        return True
+
+    async def swap_shadow_tables(conn, table_names, foreign_key_statements):
+        swapped.extend(table_names)
+        return []
+
+    @contextlib.asynccontextmanager
+    async def connect(**kwargs):
+        yield None
+
+    async def set_tables_logged(config, tgt_tables):
+        pass
+
+    monkeypatch.setattr(ap, "transfer_table", transfer_table)
+    monkeypatch.setattr(ap, "_execute_statements", execute_statements)
+    monkeypatch.setattr(ap, "_set_tables_logged", set_tables_logged)
+    monkeypatch.setattr(ap.aioodbc, "connect", connect)
+    monkeypatch.setattr(shadow, "swap_shadow_tables", swap_shadow_tables)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "y")
+
+    asyncio.run(ap.transfer(config, allow_prompts=True))
+    # the partial shadow table is dropped and the live customers table is kept
+    assert "customers" not in swapped and sorted(swapped) == ["automobiles", "employees", "task_types"]
+    assert "DROP TABLE IF EXISTS customers__accex_new" in statements
+    assert not any(s.startswith("ALTER TABLE customers__accex_new") for s in statements)
+
+def test_join_lookup_plan():
+    from accex.process.lookup import JoinLookupPlan
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    config["LOOKUP_STRATEGY"] = "join"
+    config.validate()
+    automobile = config.sources["Automobile"]
+    plan = JoinLookupPlan(config, automobile, "automobiles", lambda p: p.table_name + "__accex_new")
+    assert plan.create_sql.startswith("CREATE TEMPORARY TABLE IF NOT EXISTS accex_stage_automobiles (c0 text, c1 text,")
+    assert plan.create_sql.endswith("c8 text, c9 text)")
+    assert plan.insert_sql.startswith("INSERT INTO automobiles (old_id, vin, make, model, year, plate, state, mileage, notes, customer_id) SELECT s.c0,")
+    assert plan.insert_sql.endswith(
+        "m9.id FROM accex_stage_automobiles s LEFT JOIN LATERAL (SELECT l.id FROM customers__accex_new l WHERE l.old_id = s.c9 LIMIT 1) m9 ON true"
+    )
+    statements = plan.get_chunk_statements([list(range(10)), list(range(10))])
+    assert [sql for sql, _ in statements] == [plan.clear_sql, plan.get_stage_sql(2), plan.insert_sql]
+    assert statements[1][1] == list(range(10)) * 2
+
+    config["LOOKUP_STRATEGY"] = "server"
+    with pytest.raises(ac.ValidationError):
+        config.validate()
+
+
+def test_lookup_indexes():
+    from accex.process import lookup
+    from accex.process.metrics import Metrics
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    config.validate()
+    assert config.lookup_indexes == "drop"
+    customers = ac.TargetTablePointer("customers")
+    assert lookup.get_lookup_columns(config) == {customers: ["old_id"]}
+    assert lookup.get_lookup_tables(config.sources["Automobile"]) == {customers}
+    assert lookup.get_lookup_tables(config.sources["Customer"]) == set()
+    assert not lookup.is_column_indexed(config.targets[customers], "old_id")
+    assert lookup.is_column_indexed(config.targets[customers], "id")
+    assert not lookup.is_column_indexed(config.targets[customers], "id", deferred=True)
+    assert lookup.get_lookup_index_name("customers__accex_new", "old_id") == "customers__accex_new_accex_lookup_old_id"
+    assert lookup.get_lookup_index_name("sales.customers", "old_id") == "sales.customers_accex_lookup_old_id"
+    assert len(lookup.get_lookup_index_name("t" * 60, "old_id")) == 63
+
+    config["LOOKUP_INDEXES"] = "keep"
+    assert config.lookup_indexes == "keep"
+    config["LOOKUP_INDEXES"] = False
+    assert config.lookup_indexes is None
+    config["LOOKUP_INDEXES"] = "always"
+    with pytest.raises(ac.ValidationError):
+        config.validate()
+
+    metrics = Metrics()
+    with metrics.timer("lookup_index.build.customers.old_id"):
+        pass
+    metrics.record("lookup.customers.old_id", 2.0)
+    metrics.record("lookup.customers.old_id", 4.0)
+    metric = metrics.get("lookup.customers.old_id")
+    assert (metric.count, metric.total, metric.mean, metric.min, metric.max) == (2, 6.0, 3.0, 2.0, 4.0)
+    assert metrics.get("lookup_index.build.customers.old_id").count == 1
+    assert len(metrics.get_summary_lines()) == 2
+    assert metrics.to_dict()["lookup.customers.old_id"]["mean"] == 3.0
+
+
+def test_chunk_recovery(tmp_path):
+    import json
+    import asyncio
+    from accex.process.batching import CommitPolicy, CommitBatcher
+    from accex.process.recovery import RetryPolicy, DeadLetterWriter, get_sqlstate, is_data_error, is_transient_error
+
+    assert get_sqlstate(Exception("22P02", "[22P02] invalid input syntax")) == "22P02"
+    assert get_sqlstate(ValueError("failed chunk")) is None
+    assert is_data_error(Exception("23505", "duplicate key")) and not is_transient_error(Exception("23505", ""))
+    assert is_transient_error(Exception("08S01", "communication link failure"))
+    assert [RetryPolicy(5, 1, 3).get_delay(attempt) for attempt in range(1, 5)] == [1, 2, 3, 3]
+
+    class Connection:
+        autocommit = True
+        def __init__(self):
+            self.statements = []
+        async def commit(self):
+            self.statements.append("COMMIT")
+
+    class Cursor:
+        def __init__(self, conn, lose_connection=False):
+            self.conn = conn
+            self.lose_connection = lose_connection
+        async def execute(self, sql, params=None):
+            if sql == "INSERT" and self.lose_connection:
+                raise Exception("08S01", "communication link failure")
+            if sql == "INSERT" and "bad" in params:
+                raise Exception("22P02", f"invalid input syntax {params}")
+            self.conn.statements.append((sql, params) if params else sql)
+
+    async def run():
+        # data errors split the chunk until the rejected rows are found
+        conn = Connection()
+        batcher = CommitBatcher(conn, Cursor(conn), CommitPolicy())
+        rejected = []
+        rows = [[1], ["bad"], [3], [4], [5], ["bad"], [7]]
+        inserted = await batcher.execute_chunk_rows(
+            rows, lambda rows: [("INSERT", [v for row in rows for v in row])], lambda row, e: rejected.append(row)
+        )
+        assert inserted == 5
+        assert rejected == [["bad"], ["bad"]]
+        assert sorted(v for _, params in conn.statements for v in params) == [1, 3, 4, 5, 7]
+        with pytest.raises(Exception):
+            await batcher.execute_chunk_rows(rows, lambda rows: [("INSERT", [v for row in rows for v in row])])
+
+        # transient errors reconnect and insert the uncommitted chunks again
+        conn = Connection()
+        new_conn = Connection()
+        async def reconnect():
+            return new_conn, Cursor(new_conn)
+        batcher = CommitBatcher(conn, Cursor(conn), CommitPolicy(chunks=3), None, reconnect, RetryPolicy(2, 0))
+        await batcher.begin()
+        await batcher.execute_chunk("INSERT", [1], 1)
+        batcher.cur.lose_connection = True
+        await batcher.execute_chunk("INSERT", [2], 1)
+        assert new_conn.statements == [("INSERT", [1]), "SAVEPOINT accex_chunk", ("INSERT", [2]), "RELEASE SAVEPOINT accex_chunk"]
+        await batcher.close()
+        assert batcher.committed_rows == 2 and new_conn.autocommit
+
+        async def reconnect_lost():
+            return new_conn, Cursor(new_conn, True)
+        batcher = CommitBatcher(conn, Cursor(conn, True), CommitPolicy(), None, reconnect_lost, RetryPolicy(2, 0))
+        with pytest.raises(Exception):
+            await batcher.execute_chunk("INSERT", [1], 1)
+    asyncio.run(run())
+
+    path = str(tmp_path / "dead_letter.jsonl")
+    dead_letter = DeadLetterWriter(path)
+    dead_letter.write("Customer", "customers", {"CustID": "bad"}, Exception("22P02", "invalid input syntax"))
+    dead_letter.close()
+    with open(path) as f:
+        record = json.loads(f.readline())
+    assert (record["source"], record["sqlstate"], record["row"]) == ("Customer", "22P02", {"CustID": "bad"})
+
+
+def test_chunk_validator():
+    import decimal
+    from accex.process.prevalidation import ChunkValidator, create_column_check
+    from accex.process.recovery import get_sqlstate
+
+    def violations(ddl, values):
+        check = create_column_check("c", ac.parse_column_definition(ddl))
+        return [(i, get_sqlstate(e)) for i, e in check(values)]
+
+    assert create_column_check("c", ac.parse_column_definition("text")) is None
+    assert violations("text not null", ["a", None]) == [(1, "23502")]
+    assert violations("varchar(3)", ["abc", "abcd", "abc  ", None]) == [(1, "22001")]
+    assert violations("smallint", [1, 40000, -40000, "40000", True]) == [(1, "22003"), (2, "22003")]
+    assert violations("numeric(4, 2)", [decimal.Decimal("99.99"), decimal.Decimal("99.999"), 100.0, decimal.Decimal("NaN")]) == [(1, "22003"), (2, "22003")]
+    assert violations("date", ["2024-01-31", "01/31/2024", "2024-02-30", "", "Jan 31, 2024", "--"]) == [(2, "22008"), (3, "22007"), (5, "22007")]
+    # unpadded, 2 digit year and DateStyle dependent dates are left to the database
+    assert violations("date", ["2020-1-5", "1/5/20", "5.1.2020", "20200105", "20-01-05", "31/31/2024", "infinity"]) == []
+    assert violations("timestamp", ["2024-01-31 10:00:00", "2024-01-31T10:00", "2024-13-01 10:00", " "]) == [(2, "22008"), (3, "22007")]
+
+    src_table = ac.SourceTableBlock({"TABLE": "a", "TARGET_TABLE": "a", "COLUMNS": {"A": "name", "B": "code", "C": "notes"}})
+    tgt_table = ac.TargetTableBlock({"TABLE": "a", "COLUMNS": {"name": "text not null", "code": "char(2)", "notes": "text"}})
+    validator = ChunkValidator.from_tables(src_table, tgt_table)
+    assert [col_index for col_index, _ in validator.checks] == [0, 1]
+    rows = [["a", "ab", None], [None, "abc", None], ["c", "abc", None], ["d", "d", None]]
+    valid_rows, rejected = validator.split(rows)
+    assert valid_rows == [["a", "ab", None], ["d", "d", None]]
+    assert [(row[0], get_sqlstate(e)) for row, e in rejected] == [(None, "23502"), ("c", "22001")]
+    assert validator.split(valid_rows) == (valid_rows, [])
+
+
+def test_source_count():
+    import asyncio
+    from accex.process.core import _NativeSource
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    assert config.source_count == ac.source_default_count_mode
+    assert not config.verify_counts
+    config["SOURCE_COUNT"] = "sometimes"
+    with pytest.raises(ac.ValidationError):
+        config.validate()
+
+    src_table = ac.SourceTableBlock({"TABLE": "Employees", "TARGET_TABLE": "employees", "COLUMNS": {"Name": "name"}})
+    source = _NativeSource(src_table, {"DBQ": "./tests/databases/database_a.accdb"})
+
+    async def run():
+        await source.open()
+        try:
+            return await source.count(), await source.count_concurrently(), await source.estimate_count()
+        finally:
+            await source.close()
+    assert asyncio.run(run()) == (3, 3, 3)
+
+
+def test_progress_tracker_in_transfer_table(monkeypatch):
+    import asyncio
+    from accex.process.progress import ProgressTracker
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    ap.reset_transfer_context()
+    tracker = ap.get_progress_tracker()
+    assert isinstance(tracker, ProgressTracker)
+    assert ap.get_progress_tracker() is tracker
+
+    started = []
+
+    class FailingSource:
+        async def open(self):
+            # the table is tracked while the transfer runs
+            started.extend(tracker.tables)
+            raise ValueError("source unavailable")
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(ap, "_create_source", lambda *args, **kwargs: FailingSource())
+    src_table = config.sources[0]
+    tgt_table = config.targets[src_table.target_pointer]
+    assert asyncio.run(ap.transfer_table(config, src_table, tgt_table)) is False
+    assert started == [str(src_table.table_pointer)]
+    assert tracker.tables == {}
+
+
+def test_progress():
+    import io
+    import asyncio
+    from accex.process.progress import ProgressTracker, ProgressRenderer, format_progress_line, format_progress_record
+
+    tracker = ProgressTracker()
+    customers = tracker.start_table("Customer", "Customer -> customers", 100)
+    automobiles = tracker.start_table("Automobile", "Automobile -> automobiles")
+    customers.inserted = 40
+    customers.rejected = 10
+    customers.start_time -= 10
+    assert customers.fraction == 0.5
+    assert round(customers.rate) == 5 and round(customers.eta) == 10
+    assert automobiles.fraction is None and automobiles.eta is None
+    assert format_progress_line(customers).startswith("Customer -> customers   50 / 100 ██████████")
+    assert format_progress_line(customers).endswith("5 rows/s  eta 10s")
+    assert format_progress_line(automobiles).startswith("Automobile -> automobiles  0 rows")
+    assert format_progress_record(customers).startswith("progress table=Customer->customers inserted=40 rejected=10 total=100 rate=5.0")
+
+    class Terminal(io.StringIO):
+        def isatty(self):
+            return True
+
+    stream = Terminal()
+    renderer = ProgressRenderer(tracker, stream)
+    assert renderer.live
+    renderer.render()
+    tracker.finish_table("Automobile")
+    renderer.render()
+    assert stream.getvalue().count("\n") == 3
+    assert "\x1b[2F\x1b[J" in stream.getvalue()
+
+    renderer = ProgressRenderer(tracker, io.StringIO(), log_interval=0.01)
+    assert not renderer.live
+    async def run():
+        renderer.start()
+        await asyncio.sleep(0.05)
+        await renderer.stop()
+    asyncio.run(run())
+    assert renderer._task is None
+
+
+def test_queue_logging():
+    import logging
+    from accex.process.logqueue import setup_queue_logging, get_output_handlers
+
+    class ListHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+        def emit(self, record):
+            self.records.append((record.threadName, record.getMessage()))
+
+    root = logging.getLogger()
+    root_handlers, root_level = root.handlers[:], root.level
+    handler = ListHandler()
+    listener = setup_queue_logging(logging.INFO, [handler])
+    try:
+        assert get_output_handlers() == [handler]
+        logging.getLogger("process.transfer_table").info("inserted [%d] %d rows", 10, 20)
+        logging.getLogger("process.transfer_table").debug("not written")
+    finally:
+        listener.stop()
+        for h in root.handlers[:]:
+            root.removeHandler(h)
+        for h in root_handlers:
+            root.addHandler(h)
+        root.setLevel(root_level)
+    assert [message for _, message in handler.records] == ["inserted [10] 20 rows"]
+
+
+def test_loop_watchdog():
+    import time
+    import asyncio
+    from accex.process.metrics import Metrics
+    from accex.process.watchdog import LoopWatchdog
+
+    def block_loop():
+        time.sleep(0.3)
+
+    async def run():
+        watchdog = LoopWatchdog(0.1, interval=0.02, metrics=metrics)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        block_loop()
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+        return watchdog
+
+    metrics = Metrics()
+    watchdog = asyncio.run(run())
+    assert len(watchdog.stalls) == 1
+    lag, location = watchdog.stalls[0]
+    assert lag >= 0.2
+    assert location.endswith("in block_loop")
+    assert metrics.get("loop_stall").count == 1
+    assert metrics.get(f"loop_stall.{location}").count == 1
+
+
+def test_slow_log(tmp_path):
+    import json
+    import asyncio
+    from accex.process.slowlog import SlowLog, get_statement_shape
+
+    assert get_statement_shape("INSERT INTO t (a,b) VALUES (?,?),(?,?),(?,?)") == "INSERT INTO t (a,b) VALUES (?...), ..."
+    assert get_statement_shape("INSERT INTO t (a) VALUES (?),(?)") == "INSERT INTO t (a) VALUES (?), ..."
+    assert get_statement_shape("SELECT a, b FROM t WHERE a IN (?,?,?)") == "SELECT a, b FROM t WHERE a IN (?...)"
+    assert get_statement_shape("DELETE FROM s") == "DELETE FROM s"
+
+    path = tmp_path / "slow.jsonl"
+    slow_log = SlowLog(str(path), 0.5, max_bytes=400, backup_count=1)
+    assert not slow_log.record("insert", "Customer", 0.1, 1, "INSERT INTO t (a) VALUES (?),(?)", [1, 2], 2)
+    assert not path.exists()
+    assert slow_log.record("insert", "Customer", 0.75, 2, "INSERT INTO t (a,b) VALUES (?,?),(?,?)", ["ab", None, "é", 5], 2)
+
+    async def chunks():
+        yield [["x", 1]]
+        await asyncio.sleep(0.6)
+        yield [["yz", 2], [None, 3]]
+
+    async def fetch():
+        return [rows async for rows in slow_log.time_chunks(chunks(), "Customer")]
+
+    assert len(asyncio.run(fetch())) == 2
+    slow_log.close()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e["kind"], e["chunk"], e["rows"]) for e in entries] == [("insert", 2, 2), ("fetch", 2, 2)]
+    assert entries[0]["shape"] == "INSERT INTO t (a,b) VALUES (?...), ..."
+    assert (entries[0]["params"], entries[0]["bytes"]) == (4, 2 + 2 + 8)
+    assert (entries[1]["shape"], entries[1]["params"], entries[1]["bytes"]) == (None, None, 2 + 8 + 8)
+
+    lines = slow_log.get_summary_lines()
+    assert len(lines) == 2 and lines[0].startswith("insert Customer")
+
+    # the file is rotated instead of growing past max_bytes
+    for i in range(10):
+        slow_log.record("lookup", "Order", 1.0, i, "SELECT a, b FROM t WHERE a IN (?,?)", [1, 2], 1)
+    slow_log.close()
+    assert (tmp_path / "slow.jsonl.1").exists()
+    assert path.stat().st_size <= 400
+
+
+def test_run_history(tmp_path):
+    from accex.process.history import RunHistory, TableStats, format_report, get_rows_size
+
+    def add_run(history, durations, status="ok"):
+        history.start_run("transfer")
+        for (source, target), duration in durations.items():
+            stats = TableStats(source, target)
+            stats.status = status
+            stats.rows = 1000
+            stats.duration = duration
+            stats.chunk_size = 100
+            stats.chunk_count = 10
+            history.add_table(stats)
+        history.finish_run("ok")
+
+    rows = [["a" * 10, 1, None], ["é", 2.5, b"xy"]] * 50
+    assert get_rows_size(rows[:2]) == 10 + 8 + 2 + 8 + 2
+    assert get_rows_size(rows) == 50 * get_rows_size(rows[:2])
+    assert get_rows_size(rows, sample_rows=100) == get_rows_size(rows)
+    assert not ac.Config({}).record_history
+
+    path = str(tmp_path / "history.sqlite")
+    history = RunHistory(path)
+    add_run(history, {("Customer", "customers"): 1.0, ("Order", "orders"): 2.0})
+    add_run(history, {("Customer", "customers"): 1.2, ("Order", "orders"): 2.0})
+    add_run(history, {("Customer", "customers"): 9.0}, status="failed")
+    add_run(history, {("Customer", "customers"): 1.1, ("Order", "orders"): 4.0, ("Item", "items"): 1.0})
+    history.close()
+
+    history = RunHistory(path)
+    run = history.get_run()
+    assert run["id"] == 4 and run["status"] == "ok"
+    assert len(history.get_runs()) == 4
+    # failed transfers are not part of the baseline
+    assert [s.duration for s in history.get_table_history("Customer", "customers", run["id"])] == [1.2, 1.0]
+
+    comparisons = dict(((c.stats.source, c.stats.target), c) for c in history.compare_run(baseline_runs=5, threshold=0.2))
+    assert not comparisons[("Customer", "customers")].regressed
+    assert comparisons[("Order", "orders")].regressed
+    assert round(comparisons[("Order", "orders")].change, 2) == -0.5
+    assert comparisons[("Item", "items")].baseline is None
+    assert not comparisons[("Item", "items")].regressed
+
+    report = format_report(run, list(comparisons.values()))
+    assert [line.endswith("SLOWER") for line in report.splitlines()[2:]] == [False, True, False]
+    history.close()
+
+
+def test_run_manifest(tmp_path):
+    from accex.process.manifest import RunManifest, ManifestError, get_target_dependencies
+
+    config = ac.parse_config_file("./tests/configs/config.accex")
+    customers = ac.TargetTablePointer.from_str("customers")
+    automobiles = ac.TargetTablePointer.from_str("automobiles")
+    assert get_target_dependencies(config, config.targets[automobiles], [s for s in config.sources if s.target_pointer == automobiles]) == {customers}
+
+    fingerprint = ap.get_load_fingerprint(config, config.sources[0])
+    assert fingerprint is not None and fingerprint == ap.get_load_fingerprint(config, config.sources[0])
+    # tables loaded from staging files are fingerprinted by the staging file, which does not exist yet
+    assert ap.get_load_fingerprint(config, config.sources[0], str(tmp_path)) is None
+
+    fingerprints = dict((str(s.table_pointer), ap.get_load_fingerprint(config, s)) for s in config.sources)
+    run_manifest = RunManifest()
+    skipped, table_fingerprints = run_manifest.get_unchanged_targets(config, config.sources, lambda s: fingerprints[str(s.table_pointer)])
+    assert skipped == set()
+    for pointer, table_fingerprint in table_fingerprints.items():
+        run_manifest.set_table(config.targets[pointer].name, table_fingerprint)
+
+    path = str(tmp_path / "manifest.json")
+    run_manifest.save(path)
+    run_manifest = RunManifest.load(path)
+    skipped, _ = run_manifest.get_unchanged_targets(config, config.sources, lambda s: fingerprints[str(s.table_pointer)])
+    assert skipped == set(table_fingerprints)
+
+    # automobiles looks up customers, so it is loaded again with it
+    fingerprints["Customer"] = "changed"
+    skipped, _ = run_manifest.get_unchanged_targets(config, config.sources, lambda s: fingerprints[str(s.table_pointer)])
+    assert customers not in skipped and automobiles not in skipped
+    assert skipped == set(table_fingerprints) - {customers, automobiles}
+
+    # sources without a file fingerprint are always loaded
+    skipped, _ = run_manifest.get_unchanged_targets(config, config.sources, lambda s: None)
+    assert skipped == set()
+
+    with open(path, "w") as f:
+        f.write('{"version": 0}')
+    with pytest.raises(ManifestError):
+        RunManifest.load(path)
+    assert RunManifest.load(str(tmp_path / "missing.json")).tables == {}